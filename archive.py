@@ -0,0 +1,236 @@
+import os
+import re
+import pandas as pd
+from utils import format_date
+
+
+ARCHIVE_COLUMNS = ['shift_date', 'shift_name', 'S_ID', 'team_order', 'day_order']
+DEFAULT_ARCHIVE_PATH = 'archive'
+ARCHIVE_COMPRESSION = 'zstd'
+MAX_PARTITION = 'pmax'
+ARCHIVE_FILE = re.compile(r'^shift_(\d{4})\.parquet$')
+
+
+def _require_pyarrow():
+    """
+    確認已安裝讀寫封存檔所需的 pyarrow
+
+    pyarrow 只在讀寫封存檔時載入，未安裝時不影響啟動與未封存年份的查詢。
+
+    Raises:
+        ImportError: 未安裝 pyarrow
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as err:
+        raise ImportError("讀寫排班封存檔需要 pyarrow，請先執行 pip install pyarrow") from err
+
+
+def list_partitions(cursor):
+    """
+    列出 Shift 表的年度分割區
+
+    Args:
+        cursor: 資料庫游標
+
+    Returns:
+        list: [(分割區名稱, 上限年份(不含)，pmax 為 None), ...]，依範圍排序
+    """
+    cursor.execute("""
+    SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Shift' AND PARTITION_NAME IS NOT NULL
+    ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    return [(name, None if bound == 'MAXVALUE' else int(bound)) for name, bound in cursor.fetchall()]
+
+
+def add_partitions(cursor, through_year):
+    """
+    從 pmax 切出到指定年份為止的年度分割區
+
+    Args:
+        cursor: 資料庫游標
+        through_year: 最後一個要建立的年份
+
+    Returns:
+        list: 新建立的年份
+    """
+    partitions = list_partitions(cursor)
+    if not partitions or partitions[-1] != (MAX_PARTITION, None):
+        raise ValueError("Shift 表尚未依年份分割")
+    bounds = [bound for _, bound in partitions if bound is not None]
+    if not bounds:
+        raise ValueError("Shift 表至少需要一個年度分割區")
+
+    years = list(range(max(bounds), through_year + 1))
+    if years:
+        definitions = [f"PARTITION p{year} VALUES LESS THAN ({year + 1})" for year in years]
+        cursor.execute(f"""
+        ALTER TABLE Shift REORGANIZE PARTITION {MAX_PARTITION} INTO (
+            {', '.join(definitions)},
+            PARTITION {MAX_PARTITION} VALUES LESS THAN MAXVALUE
+        )
+        """)
+    return years
+
+
+class ShiftArchive:
+    """
+    已結束年度的排班封存檔
+
+    每年一個以 zstd 壓縮的 Parquet 檔(shift_YYYY.parquet)，欄位同 Shift 表。
+    讀取時只開啟期間涵蓋的年份，並以日期條件過濾。
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        """
+        初始化封存檔目錄
+
+        Args:
+            path: 封存檔目錄
+        """
+        self.path = path
+        self._years = None
+        self._stamp = None
+
+    def file_for(self, year):
+        """年份對應的封存檔路徑"""
+        return os.path.join(self.path, f"shift_{year}.parquet")
+
+    def years(self):
+        """
+        列出已封存的年份
+
+        年份清單會快取，寫入封存檔時清除；其他程序(如 archive_job.py)新增封存檔會改變目錄修改時間，
+        每次只需檢查目錄的修改時間，不必列出目錄。
+
+        Returns:
+            list: 年份，由小到大
+        """
+        try:
+            stamp = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        if self._years is None or stamp != self._stamp:
+            self._years = sorted(int(match.group(1))
+                                 for match in map(ARCHIVE_FILE.match, os.listdir(self.path)) if match)
+            self._stamp = stamp
+        return self._years
+
+    def invalidate(self):
+        """清除年份快取"""
+        self._years = None
+
+    def covers(self, start_date, end_date):
+        """
+        期間內是否有已封存的年份
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+
+        Returns:
+            bool: 是否需要讀取封存檔
+        """
+        start_year, end_year = format_date(start_date).year, format_date(end_date).year
+        return any(start_year <= year <= end_year for year in self.years())
+
+    def is_archived(self, shift_date):
+        """
+        日期所在年份是否已封存，已封存年份的排班不能再寫入 Shift 表
+
+        Args:
+            shift_date: 日期
+
+        Returns:
+            bool: 是否已封存
+        """
+        return format_date(shift_date).year in self.years()
+
+    def read(self, start_date, end_date):
+        """
+        讀取期間內已封存的排班
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+
+        Returns:
+            DataFrame: 欄位同 ARCHIVE_COLUMNS，依日期排序
+        """
+        start_date, end_date = format_date(start_date), format_date(end_date)
+        years = [year for year in self.years() if start_date.year <= year <= end_date.year]
+        if not years:
+            return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+
+        _require_pyarrow()
+        frames = [
+            pd.read_parquet(self.file_for(year), engine='pyarrow', columns=ARCHIVE_COLUMNS,
+                            filters=[('shift_date', '>=', start_date), ('shift_date', '<=', end_date)])
+            for year in years
+        ]
+        shifts = pd.concat(frames, ignore_index=True)
+        return shifts.sort_values('shift_date', kind='stable').reset_index(drop=True)
+
+    def write(self, year, shifts):
+        """
+        將一年的排班併入封存檔，同日同班別以新資料為準
+
+        先寫入暫存檔再取代原檔，寫入失敗時原檔不變。
+
+        Args:
+            year: 年份
+            shifts: 排班DataFrame，欄位同 ARCHIVE_COLUMNS
+
+        Returns:
+            int: 封存檔中該年的總筆數
+        """
+        _require_pyarrow()
+        os.makedirs(self.path, exist_ok=True)
+        path = self.file_for(year)
+        shifts = shifts[ARCHIVE_COLUMNS]
+        if os.path.exists(path):
+            shifts = pd.concat([pd.read_parquet(path, engine='pyarrow', columns=ARCHIVE_COLUMNS), shifts], ignore_index=True)
+            shifts = shifts.drop_duplicates(['shift_date', 'shift_name'], keep='last')
+        shifts = shifts.sort_values(['shift_date', 'shift_name']).reset_index(drop=True)
+
+        temp_path = f"{path}.tmp"
+        shifts.to_parquet(temp_path, engine='pyarrow', compression=ARCHIVE_COMPRESSION, index=False)
+        os.replace(temp_path, path)
+        self.invalidate()
+        return len(shifts)
+
+    def archive_partition(self, cursor, partition):
+        """
+        將一個分割區的排班寫入封存檔後清空該分割區
+
+        清空分割區(TRUNCATE PARTITION)為 DDL，會先提交目前的交易，
+        也不會觸發刪除觸發程序，已封存的排班不會寫入異動紀錄。
+
+        Args:
+            cursor: 資料庫游標
+            partition: 分割區名稱
+
+        Returns:
+            dict: {年份: 封存筆數}
+        """
+        cursor.execute(f"""
+        SELECT {', '.join(ARCHIVE_COLUMNS)}
+        FROM Shift PARTITION ({partition})
+        FOR UPDATE
+        """)
+        shifts = pd.DataFrame(cursor.fetchall(), columns=ARCHIVE_COLUMNS)
+        if shifts.empty:
+            return {}
+
+        counts = {}
+        for year, rows in shifts.groupby(pd.to_datetime(shifts['shift_date']).dt.year):
+            total = self.write(int(year), rows)
+            if len(self.read(rows['shift_date'].min(), rows['shift_date'].max())) < len(rows) or total < len(rows):
+                raise RuntimeError(f"{year} 年封存檔筆數不符，未清空分割區")
+            counts[int(year)] = len(rows)
+
+        cursor.execute(f"ALTER TABLE Shift TRUNCATE PARTITION {partition}")
+        self.invalidate()
+        return counts
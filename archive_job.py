@@ -0,0 +1,34 @@
+import argparse
+from shift_manager import ShiftManager
+
+
+DEFAULT_YEARS_AHEAD = 1
+DEFAULT_KEEP_YEARS = 1
+
+
+def main():
+    """年度批次：建立之後年度的分割區，並將已結束年度的排班移到封存檔"""
+    parser = argparse.ArgumentParser(description="Shift 表分割區與排班封存")
+    parser.add_argument('--years-ahead', type=int, default=DEFAULT_YEARS_AHEAD,
+                        help="今年之後再建立幾年的分割區")
+    parser.add_argument('--keep-years', type=int, default=DEFAULT_KEEP_YEARS,
+                        help="保留在資料庫的已結束年數，更早的年度移到封存檔")
+    parser.add_argument('--no-archive', action='store_true', help="只建立分割區，不封存")
+    args = parser.parse_args()
+
+    manager = ShiftManager()
+    manager.connect()
+    try:
+        success, message = manager.add_shift_partitions(args.years_ahead)
+        print(message)
+        if success and not args.no_archive:
+            success, message = manager.archive_closed_years(args.keep_years)
+            print(message)
+        if not success:
+            raise SystemExit(1)
+    finally:
+        manager.disconnect()
+
+
+if __name__ == '__main__':
+    main()
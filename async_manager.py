@@ -0,0 +1,162 @@
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from shift_manager import ShiftManager
+from word_export import render_document
+from utils import format_date
+
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_WORD_WORKERS = 2
+
+
+class AsyncShiftManager:
+    """
+    ShiftManager 的 asyncio 介面
+
+    資料庫操作在有上限的執行緒池中執行，每次呼叫都在自己的 session 內，
+    使用連線池的專用連線；Word 文件的產生交給行程池，不佔用事件迴圈與資料庫執行緒。
+    """
+
+    def __init__(self, manager=None, max_workers=None, word_workers=DEFAULT_WORD_WORKERS):
+        """
+        初始化非同步排班管理器
+
+        Args:
+            manager: ShiftManager 實例(可選，預設建立新的實例)
+            max_workers: 同時進行的資料庫操作上限(可選，預設為連線池大小)
+            word_workers: 產生Word文件的行程數
+        """
+        self.manager = manager or ShiftManager()
+        # 執行緒數不超過連線池大小，避免取連線時連線池已用盡
+        pool_size = self.manager.db.pool_size
+        if max_workers is None:
+            max_workers = pool_size or DEFAULT_MAX_WORKERS
+        elif pool_size:
+            max_workers = min(max_workers, pool_size)
+        if not pool_size:
+            self.manager.db.pool_size = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='shift-db')
+        # 以 spawn 建立行程：fork 會複製其他執行緒持有中的鎖(連線池、快取)，子行程可能因此卡死
+        self._word_executor = ProcessPoolExecutor(max_workers=word_workers,
+                                                  mp_context=multiprocessing.get_context('spawn'))
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _run(self, method, *args, **kwargs):
+        """在資料庫執行緒池中以獨立的 session 執行同步方法"""
+        def call():
+            with self.manager.session():
+                return method(*args, **kwargs)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def _render(self, days, filename):
+        """在行程池中產生Word文件"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._word_executor, functools.partial(render_document, days, filename)
+        )
+
+    async def connect(self):
+        """連接資料庫"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.manager.connect)
+
+    async def close(self):
+        """關閉資料庫連接並結束執行緒池與行程池"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.manager.disconnect)
+        self._executor.shutdown(wait=True)
+        self._word_executor.shutdown(wait=True)
+
+    # 排班
+
+    async def view_daily_shifts(self, specific_date):
+        """查看某日的所有班表，見 ShiftManager.view_daily_shifts"""
+        return await self._run(self.manager.view_daily_shifts, specific_date)
+
+    async def assign_shift(self, shift_name, s_id, shift_date):
+        """指派班別，見 ShiftManager.assign_shift"""
+        return await self._run(self.manager.assign_shift, shift_name, s_id, shift_date)
+
+    async def modify_shift(self, shift_name, old_sid, new_sid, shift_date):
+        """修改班別分配，見 ShiftManager.modify_shift"""
+        return await self._run(self.manager.modify_shift, shift_name, old_sid, new_sid, shift_date)
+
+    async def duty_status(self, s_ids, dates):
+        """批次查詢上班狀態，見 ShiftManager.duty_status"""
+        return await self._run(self.manager.duty_status, s_ids, dates)
+
+    async def generate_all_standby_groups(self, check_date, mode=None):
+        """產生備勤分組，見 ShiftManager.generate_all_standby_groups"""
+        return await self._run(self.manager.generate_all_standby_groups, check_date, mode)
+
+    async def export_to_word(self, groups, check_date):
+        """
+        將人員列表輸出為Word文件
+
+        Args:
+            groups: 分組結果
+            check_date: 日期
+
+        Returns:
+            str: 生成的檔案名稱
+        """
+        check_date = format_date(check_date)
+        duties = await self._run(self.manager.get_daily_duties, check_date)
+        filename = f"人員列表_{check_date.strftime('%Y%m%d')}.docx"
+        return await self._render([(check_date, duties, groups, 0)], filename)
+
+    async def export_month_to_word(self, year, month):
+        """
+        將整個月的值班人員與備勤分組輸出為同一份Word文件
+
+        Args:
+            year: 年
+            month: 月
+
+        Returns:
+            str: 生成的檔案名稱
+        """
+        days = await self._run(self.manager.get_month_days, year, month)
+        days = [(check_date, duties, groups, 1) for check_date, duties, groups in days]
+        return await self._render(days, f"人員列表_{year}{month:02d}.docx")
+
+    # 隊伍管理
+
+    async def view_team_orders(self, team_id, check_date):
+        """查看隊伍排序資訊，見 ShiftManager.view_team_orders"""
+        return await self._run(self.manager.view_team_orders, team_id, check_date)
+
+    async def view_team_members(self, team_id):
+        """查看隊伍成員，見 ShiftManager.view_team_members"""
+        return await self._run(self.manager.view_team_members, team_id)
+
+    async def view_team_member_order(self, team_id):
+        """查看隊內人員順序，見 ShiftManager.view_team_member_order"""
+        return await self._run(self.manager.view_team_member_order, team_id)
+
+    async def update_team_member(self, s_id, new_team=None, new_shift=None):
+        """更新隊員資料，見 ShiftManager.update_team_member"""
+        return await self._run(self.manager.update_team_member, s_id, new_team, new_shift)
+
+    async def bulk_update_team_shifts(self, team_id, shift_assignments):
+        """批次更新隊伍假檔，見 ShiftManager.bulk_update_team_shifts"""
+        return await self._run(self.manager.bulk_update_team_shifts, team_id, shift_assignments)
+
+    async def swap_member_shifts(self, team_id, s_id1, s_id2):
+        """交換兩個隊員的假檔，見 ShiftManager.swap_member_shifts"""
+        return await self._run(self.manager.swap_member_shifts, team_id, s_id1, s_id2)
+
+    async def update_member_order(self, team_id, order_changes):
+        """更新隊內人員順序，見 ShiftManager.update_member_order"""
+        return await self._run(self.manager.update_member_order, team_id, order_changes)
+
+    async def swap_member_orders(self, team_id, s_id1, s_id2):
+        """交換兩個隊員的順序，見 ShiftManager.swap_member_orders"""
+        return await self._run(self.manager.swap_member_orders, team_id, s_id1, s_id2)
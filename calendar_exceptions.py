@@ -0,0 +1,187 @@
+import threading
+from utils import format_date
+
+
+EXCEPTION_TYPES = ['國定假日', '颱風假', '特殊勤務']
+
+
+class ExceptionCalendar:
+    """
+    特殊日期(國定假日、颱風假、特殊勤務)的記憶體索引，以日期為鍵直接查詢
+
+    更新時複製一份新的字典再替換，多執行緒讀取不需加鎖，只有寫入彼此互斥。
+    """
+
+    def __init__(self):
+        """初始化空的特殊日期表"""
+        self.exceptions = {}
+        self._write_lock = threading.Lock()
+
+    def load(self, cursor):
+        """
+        從資料庫載入全部特殊日期
+
+        Args:
+            cursor: 資料庫游標
+        """
+        cursor.execute("""
+        SELECT exception_date, exception_type, description, working_shifts, standby_group_size
+        FROM Calendar_Exception
+        """)
+        self.load_rows(cursor.fetchall())
+
+    def load_rows(self, rows):
+        """
+        由資料列建立特殊日期表
+
+        Args:
+            rows: (exception_date, exception_type, description, working_shifts, standby_group_size) 的序列
+        """
+        self.exceptions = {
+            row[0]: self._to_entry(*row) for row in rows
+        }
+
+    @staticmethod
+    def _to_entry(exception_date, exception_type, description, working_shifts, standby_group_size):
+        """將資料列轉為特殊日期資訊"""
+        return {
+            'date': exception_date,
+            'type': exception_type,
+            'description': description or '',
+            # None 代表依輪休週期，否則為當日上班的假檔集合
+            'working_shifts': None if working_shifts is None else frozenset(
+                shift for shift in working_shifts.split(',') if shift
+            ),
+            'standby_group_size': standby_group_size
+        }
+
+    def get(self, date):
+        """
+        查詢指定日期的特殊設定
+
+        Args:
+            date: 查詢日期
+
+        Returns:
+            dict: 特殊日期資訊，沒有則為 None
+        """
+        return self.exceptions.get(format_date(date))
+
+    def put(self, exception_date, exception_type, description=None,
+            working_shifts=None, standby_group_size=None):
+        """更新記憶體中的特殊日期"""
+        working_text = None if working_shifts is None else ','.join(working_shifts)
+        entry = self._to_entry(exception_date, exception_type, description, working_text, standby_group_size)
+        with self._write_lock:
+            exceptions = dict(self.exceptions)
+            exceptions[exception_date] = entry
+            self.exceptions = exceptions
+
+    def remove(self, exception_date):
+        """移除記憶體中的特殊日期"""
+        with self._write_lock:
+            exceptions = dict(self.exceptions)
+            exceptions.pop(exception_date, None)
+            self.exceptions = exceptions
+
+    def is_working(self, date, shift_type, default):
+        """
+        套用特殊日期後的上班狀態
+
+        Args:
+            date: 查詢日期
+            shift_type: 假檔
+            default: 依輪休週期的上班狀態
+
+        Returns:
+            bool: 是否上班
+        """
+        entry = self.exceptions.get(date)
+        if entry is None or entry['working_shifts'] is None:
+            return default
+        return shift_type in entry['working_shifts']
+
+    def apply_day_orders(self, date, day_orders):
+        """
+        套用特殊日期後的各假檔日排序，被召回上班的假檔排在最後
+
+        Args:
+            date: 查詢日期
+            day_orders: 依輪休週期的日排序
+
+        Returns:
+            dict: 套用後的日排序
+        """
+        entry = self.exceptions.get(date)
+        if entry is None or entry['working_shifts'] is None:
+            return day_orders
+
+        working = entry['working_shifts']
+        last_order = max(day_orders.values(), default=0)
+        result = {}
+        for shift, order in day_orders.items():
+            if shift not in working:
+                result[shift] = 0
+            elif order:
+                result[shift] = order
+            else:
+                last_order += 1
+                result[shift] = last_order
+        return result
+
+    def standby_group_size(self, date, default):
+        """
+        取得指定日期的備勤每組警務員人數
+
+        Args:
+            date: 查詢日期
+            default: 預設人數
+
+        Returns:
+            int: 每組人數
+        """
+        entry = self.exceptions.get(date)
+        if entry is None or not entry['standby_group_size']:
+            return default
+        return entry['standby_group_size']
+
+    def apply_to_matrix(self, working, dates, shift_types):
+        """
+        將期間內的特殊日期覆寫到上班矩陣
+
+        Args:
+            working: 形狀為 (假檔數, 天數) 的布林陣列
+            dates: 與矩陣欄位對應的 DatetimeIndex
+            shift_types: 與矩陣列對應的假檔列表
+
+        Returns:
+            ndarray: 覆寫後的上班矩陣
+        """
+        if not self.exceptions:
+            return working
+
+        working = working.copy()
+        for col, day in enumerate(dates.date):
+            entry = self.exceptions.get(day)
+            if entry is None or entry['working_shifts'] is None:
+                continue
+            working[:, col] = [shift in entry['working_shifts'] for shift in shift_types]
+        return working
+
+    def between(self, start_date, end_date):
+        """
+        列出期間內的特殊日期
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+
+        Returns:
+            list: 依日期排序的特殊日期資訊
+        """
+        start_date, end_date = format_date(start_date), format_date(end_date)
+        exceptions = self.exceptions
+        return [
+            exceptions[day] for day in sorted(exceptions)
+            if start_date <= day <= end_date
+        ]
@@ -0,0 +1,86 @@
+from collections import Counter
+from datetime import timedelta
+from rules import change_window
+from utils import format_date, get_team_order, get_rank_restrictions
+
+
+class CandidateSearch:
+    """
+    指定日期的替補人選搜尋
+
+    建立時一次讀取當日前後的排班與近期勤務次數，
+    每個班別的候選人一次交給排班規則檢查後再排序。
+    """
+
+    def __init__(self, manager, shift_date, workload_days=30):
+        """
+        建立當日的搜尋索引
+
+        Args:
+            manager: ShiftManager 實例
+            shift_date: 日期
+            workload_days: 計算近期勤務次數的天數
+        """
+        self.shift_date = format_date(shift_date)
+        self.roster = manager.get_roster_index()
+        self.validator = manager.get_validator()
+        self.shift_orders = manager.get_current_shift_order(self.shift_date)
+        self.existing = manager.get_shifts_between(*change_window(self.shift_date))
+
+        recent = manager.get_shifts_between(self.shift_date - timedelta(days=workload_days),
+                                            self.shift_date - timedelta(days=1))
+        self.workload = Counter(recent['S_ID'])
+
+    def available(self, shift_name):
+        """
+        列出當日可擔任班別且不違反排班規則的人員，依優先順序排列
+
+        Args:
+            shift_name: 班別名稱
+
+        Returns:
+            list: 候選人資訊列表
+        """
+        rank = get_rank_restrictions().get(shift_name)
+        if rank is None:
+            raise ValueError(f"無效的班別: {shift_name}")
+
+        holder = set(self.existing.loc[(self.existing['shift_date'] == self.shift_date) &
+                                       (self.existing['shift_name'] == shift_name), 'S_ID'])
+        members = [member for member in self.roster.with_rank(rank) if member['S_ID'] not in holder]
+        messages = self.validator.check_candidates(self.existing, shift_name, self.shift_date,
+                                                   [member['S_ID'] for member in members])
+
+        month = self.shift_date.month
+        candidates = []
+        for member in members:
+            s_id = member['S_ID']
+            if messages[s_id]:
+                continue
+
+            candidates.append(dict(
+                member,
+                team_order=get_team_order(member['team'], month),
+                day_order=self.shift_orders.get(member['shift'], 0),
+                recent_shifts=self.workload[s_id]
+            ))
+
+        # 日排序優先(11、13、14隊日排序為0排最後)，其次檔排序，再來是近期勤務較少者
+        candidates.sort(key=lambda c: (c['day_order'] or float('inf'),
+                                       c['team_order'] or float('inf'),
+                                       c['recent_shifts'],
+                                       c['S_ID']))
+        return candidates
+
+    def top(self, shift_name, k=5):
+        """
+        取得班別的前k名替補人選
+
+        Args:
+            shift_name: 班別名稱
+            k: 名單數量
+
+        Returns:
+            list: 候選人資訊列表
+        """
+        return self.available(shift_name)[:k]
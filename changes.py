@@ -0,0 +1,229 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+CHANGE_COLUMNS = ['id', 'changed_at', 'entity', 'action', 'ref_id', 'ref_date', 'ref_end_date',
+                  'ref_name', 'S_ID', 'old_S_ID', 'client_id']
+CHANGE_BATCH_SIZE = 500
+CHANGE_RETENTION_DAYS = 7
+# id 有缺號時等待尚未提交的交易的秒數，超過視為已回滾
+GAP_TIMEOUT = 30
+ACTION_NAMES = {'insert': '新增', 'update': '修改', 'delete': '刪除'}
+
+
+def describe_change(change):
+    """
+    將一筆異動轉為說明文字
+
+    Args:
+        change: 異動資訊
+
+    Returns:
+        str: 說明文字
+    """
+    action = ACTION_NAMES.get(change['action'], change['action'])
+    entity = change['entity']
+    if entity == 'Shift':
+        if change['action'] == 'update' and change['S_ID'] != change['old_S_ID']:
+            return f"{change['ref_date']} {change['ref_name']} 由 {change['old_S_ID']} 改為 {change['S_ID']}"
+        if change['action'] == 'update':
+            return f"{change['ref_date']} {change['ref_name']} 排序更新"
+        return f"{action} {change['ref_date']} {change['ref_name']} ({change['S_ID'] or change['old_S_ID']})"
+    if entity == 'Employee_Shift':
+        return f"{action}人員資料 {change['S_ID'] or change['old_S_ID']}"
+    if entity == 'Leave_Record':
+        return f"{action}請假紀錄 {change['S_ID'] or change['old_S_ID']} ({change['ref_date']}起)"
+    if entity == 'Calendar_Exception':
+        return f"{action}特殊日期 {change['ref_date']}"
+    return f"{action} {entity}"
+
+
+class ChangeFeed:
+    """
+    以 Change_Log 表為來源的異動通知
+
+    記錄已讀到的最後一筆 id，每次只讀取之後的新異動，再依資料表分送給訂閱者。
+    可由呼叫端定期 poll，或以 start() 在背景執行緒輪詢。
+
+    AUTO_INCREMENT 的 id 依寫入順序配發，但交易提交順序可能不同，
+    較小的 id 可能晚一點才出現。讀取位置只推進到連續的 id 為止，
+    缺號之後已讀過的異動記在 _seen 中避免重複通知，缺號超過 GAP_TIMEOUT 秒才略過。
+    """
+
+    def __init__(self, batch_size=CHANGE_BATCH_SIZE):
+        """
+        初始化異動通知
+
+        Args:
+            batch_size: 每次查詢的最大筆數
+        """
+        self.batch_size = batch_size
+        self.last_id = 0
+        self._seen = set()
+        self._gap_since = None
+        self._subscribers = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._stop = None
+        self._thread = None
+
+    def subscribe(self, callback, entities=None):
+        """
+        訂閱異動
+
+        Args:
+            callback: 收到異動時呼叫，參數為異動列表
+            entities: 只接收這些資料表的異動(可選，預設全部)
+
+        Returns:
+            int: 取消訂閱用的代號
+        """
+        with self._lock:
+            self._next_token += 1
+            self._subscribers[self._next_token] = (callback, set(entities) if entities else None)
+            return self._next_token
+
+    def unsubscribe(self, token):
+        """取消訂閱"""
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def seek_latest(self, cursor):
+        """
+        將讀取位置移到目前最新的異動，之前的異動不再通知
+
+        Args:
+            cursor: 資料庫游標
+        """
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM Change_Log")
+        with self._fetch_lock:
+            self.last_id = cursor.fetchone()[0]
+            self._seen = set()
+            self._gap_since = None
+
+    def fetch(self, cursor):
+        """
+        讀取上次位置之後的所有異動並前進讀取位置
+
+        Args:
+            cursor: 資料庫游標
+
+        Returns:
+            list: 依 id 排序的異動資訊
+        """
+        changes = []
+        after = self.last_id
+        while True:
+            cursor.execute(f"""
+            SELECT {', '.join(CHANGE_COLUMNS)}
+            FROM Change_Log
+            WHERE id > %s
+            ORDER BY id
+            LIMIT %s
+            """, (after, self.batch_size))
+            rows = cursor.fetchall()
+            for row in rows:
+                if row[0] not in self._seen:
+                    self._seen.add(row[0])
+                    changes.append(dict(zip(CHANGE_COLUMNS, row)))
+            if len(rows) < self.batch_size:
+                break
+            after = rows[-1][0]
+
+        self._advance()
+        return changes
+
+    def _advance(self):
+        """讀取位置推進到連續讀過的最後一個 id"""
+        while self.last_id + 1 in self._seen:
+            self.last_id += 1
+            self._seen.discard(self.last_id)
+
+        if not self._seen:
+            self._gap_since = None
+        elif self._gap_since is None:
+            self._gap_since = time.monotonic()
+        elif time.monotonic() - self._gap_since > GAP_TIMEOUT:
+            # 缺號的交易已回滾，從下一個讀過的 id 繼續
+            self.last_id = min(self._seen) - 1
+            self._gap_since = None
+            self._advance()
+
+    def publish(self, changes):
+        """
+        將異動分送給訂閱者
+
+        Args:
+            changes: 異動列表
+        """
+        if not changes:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for callback, entities in subscribers:
+            selected = changes if entities is None else [c for c in changes if c['entity'] in entities]
+            if selected:
+                callback(selected)
+
+    def poll(self, cursor):
+        """
+        讀取新異動並通知訂閱者
+
+        Args:
+            cursor: 資料庫游標
+
+        Returns:
+            list: 新異動
+        """
+        with self._fetch_lock:
+            changes = self.fetch(cursor)
+        self.publish(changes)
+        return changes
+
+    def prune(self, cursor, days=CHANGE_RETENTION_DAYS):
+        """
+        刪除超過保留天數的異動紀錄
+
+        Args:
+            cursor: 資料庫游標
+            days: 保留天數
+
+        Returns:
+            int: 刪除筆數
+        """
+        cursor.execute("DELETE FROM Change_Log WHERE changed_at < %s",
+                       (datetime.now() - timedelta(days=days),))
+        return cursor.rowcount
+
+    def start(self, manager, interval=2.0):
+        """
+        在背景執行緒定期輪詢，每次輪詢使用自己的 session
+
+        Args:
+            manager: ShiftManager 實例
+            interval: 輪詢間隔秒數
+        """
+        if self._thread is not None:
+            return
+        self._stop = threading.Event()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    with manager.session():
+                        self.poll(manager.db.get_cursor())
+                except Exception as err:
+                    print(f"讀取異動失敗: {err}")
+
+        self._thread = threading.Thread(target=run, name='change-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止背景輪詢"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
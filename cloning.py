@@ -0,0 +1,152 @@
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from orders import expected_orders
+from rules import VIOLATION_COLUMNS, NIGHT_DUTY_SHIFT, NIGHT_DUTY_REST_DAYS
+
+
+CLONE_BATCH_SIZE = 500
+
+
+def clone_offset(source_start, source_end, cycle_length):
+    """
+    預設的複製位移：不小於來源期間長度的最小整數個週期
+
+    Args:
+        source_start: 來源起始日
+        source_end: 來源結束日(含)
+        cycle_length: 輪休週期天數
+
+    Returns:
+        int: 位移天數
+    """
+    days = (source_end - source_start).days + 1
+    return -(-days // cycle_length) * cycle_length
+
+
+def plan_clone(source, existing, roster, validator, rotation, calendar, offset_days):
+    """
+    決定來源排班中可以複製到目標日期的資料列
+
+    Args:
+        source: 來源期間的排班DataFrame，需包含 shift_date, shift_name, S_ID
+        existing: 目標期間(前後各多讀 NIGHT_DUTY_REST_DAYS 天)的現有排班DataFrame
+        roster: 人員DataFrame，需包含 S_ID, name, team, current_shift
+        validator: RuleValidator
+        rotation: RotationPattern
+        calendar: ExceptionCalendar(可選)
+        offset_days: 位移天數
+
+    Returns:
+        tuple: (可複製的排班DataFrame，欄位為 source_date, shift_name, S_ID, shift_date, team_order, day_order;
+                略過的排班與原因DataFrame，欄位同 rules.VIOLATION_COLUMNS)
+    """
+    offset = timedelta(days=offset_days)
+    candidates = pd.DataFrame({
+        'source_date': source['shift_date'].to_numpy(),
+        'shift_name': source['shift_name'].to_numpy(),
+        'S_ID': source['S_ID'].to_numpy(),
+        'shift_date': [shift_date + offset for shift_date in source['shift_date']],
+    })
+    existing = existing[['shift_date', 'shift_name', 'S_ID']]
+    names = roster.set_index('S_ID')['name']
+    skipped = []
+
+    # 目標日期已有人擔任的班別不覆蓋
+    filled = pd.MultiIndex.from_frame(existing[['shift_date', 'shift_name']])
+    taken = pd.MultiIndex.from_frame(candidates[['shift_date', 'shift_name']]).isin(filled)
+    if taken.any():
+        rows = candidates[taken]
+        skipped.append(pd.DataFrame({
+            'shift_date': rows['shift_date'].to_numpy(),
+            'shift_name': rows['shift_name'].to_numpy(),
+            'S_ID': rows['S_ID'].to_numpy(),
+            'name': rows['S_ID'].map(names).fillna(rows['S_ID']).to_numpy(),
+            'rule': '已排班',
+            'message': [f"{shift_date}的{shift_name}已有排班"
+                        for shift_date, shift_name in zip(rows['shift_date'], rows['shift_name'])]
+        }, columns=VIOLATION_COLUMNS))
+        candidates = candidates[~taken].reset_index(drop=True)
+
+    # 與現有排班一起檢查，只看複製的資料列與因複製而新增的違規
+    combined = pd.concat([existing, candidates[['shift_date', 'shift_name', 'S_ID']]], ignore_index=True)
+    violations = validator.validate(combined)
+    keys = ['shift_date', 'shift_name', 'S_ID']
+    candidate_keys = pd.MultiIndex.from_frame(candidates[keys])
+    on_candidates = pd.MultiIndex.from_frame(violations[keys]).isin(candidate_keys)
+    skipped.append(violations[on_candidates])
+    rejected = candidate_keys.isin(pd.MultiIndex.from_frame(violations.loc[on_candidates, keys]))
+
+    # 複製的夜值日官會讓隔天已排的班別違規，此時不複製夜值日官
+    baseline = validator.validate(existing)
+    new_rest = violations[~on_candidates & (violations['rule'] == '夜值日官休息')]
+    new_rest = new_rest[~pd.MultiIndex.from_frame(new_rest[['shift_date', 'shift_name', 'rule']])
+                        .isin(pd.MultiIndex.from_frame(baseline[['shift_date', 'shift_name', 'rule']]))]
+    if not new_rest.empty:
+        blocked = set()
+        for shift_date, s_id in zip(new_rest['shift_date'], new_rest['S_ID']):
+            for days in range(1, NIGHT_DUTY_REST_DAYS + 1):
+                blocked.add((shift_date - timedelta(days=days), s_id))
+        nights = (candidates['shift_name'] == NIGHT_DUTY_SHIFT).to_numpy() & ~rejected & np.array(
+            [(shift_date, s_id) in blocked for shift_date, s_id in zip(candidates['shift_date'], candidates['S_ID'])],
+            dtype=bool
+        )
+        if nights.any():
+            rows = candidates[nights]
+            skipped.append(pd.DataFrame({
+                'shift_date': rows['shift_date'].to_numpy(),
+                'shift_name': rows['shift_name'].to_numpy(),
+                'S_ID': rows['S_ID'].to_numpy(),
+                'name': rows['S_ID'].map(names).fillna(rows['S_ID']).to_numpy(),
+                'rule': '夜值日官休息',
+                'message': [f"{names.get(s_id, s_id)}隔天已有排班，{shift_date}不能擔任{NIGHT_DUTY_SHIFT}"
+                            for shift_date, s_id in zip(rows['shift_date'], rows['S_ID'])]
+            }, columns=VIOLATION_COLUMNS))
+            rejected |= nights
+
+    accepted = candidates[~rejected].reset_index(drop=True)
+    # 排序依目標日期重新計算
+    details = accepted.merge(roster[['S_ID', 'team', 'current_shift']], on='S_ID', how='left')
+    accepted['team_order'], accepted['day_order'] = expected_orders(details, rotation, calendar)
+
+    skipped = pd.concat(skipped, ignore_index=True) if skipped else pd.DataFrame(columns=VIOLATION_COLUMNS)
+    return accepted, skipped.sort_values(['shift_date', 'shift_name']).reset_index(drop=True)
+
+
+def insert_clones(cursor, accepted, offset_days, batch_size=CLONE_BATCH_SIZE):
+    """
+    以每批一個 INSERT ... SELECT 從來源排班複製到目標日期
+
+    來源資料列以日期、班別與警員編號比對，呼叫前應已鎖定來源期間。
+
+    Args:
+        cursor: 資料庫游標
+        accepted: plan_clone 的可複製排班
+        offset_days: 位移天數
+        batch_size: 每批筆數
+
+    Returns:
+        int: 新增筆數
+    """
+    rows = list(accepted[['source_date', 'shift_name', 'S_ID', 'team_order', 'day_order']]
+                .itertuples(index=False, name=None))
+    inserted = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        values = " UNION ALL ".join(
+            ["SELECT %s AS shift_date, %s AS shift_name, %s AS S_ID, %s AS team_order, %s AS day_order"] +
+            ["SELECT %s, %s, %s, %s, %s"] * (len(batch) - 1)
+        )
+        query = f"""
+        INSERT INTO Shift (shift_name, S_ID, shift_date, team_order, day_order)
+        SELECT s.shift_name, s.S_ID, s.shift_date + INTERVAL %s DAY, v.team_order, v.day_order
+        FROM Shift s
+        JOIN ({values}) AS v
+            ON s.shift_date = v.shift_date AND s.shift_name = v.shift_name AND s.S_ID = v.S_ID
+        """
+        cursor.execute(query, (int(offset_days),) + tuple(
+            value for shift_date, shift_name, s_id, team_order, day_order in batch
+            for value in (shift_date, shift_name, s_id, int(team_order), int(day_order))
+        ))
+        inserted += cursor.rowcount
+    return inserted
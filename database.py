@@ -1,29 +1,58 @@
 import os
+import socket
+import threading
+from contextlib import contextmanager
 import mysql.connector
+from mysql.connector import pooling
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
 class DatabaseConnection:
-    """管理資料庫連接的類"""
+    """
+    管理資料庫連接的類
 
-    def __init__(self):
-        """初始化資料庫配置"""
+    單人使用時只有一個連線；設定連線池大小後，每個請求可透過 session()
+    從連線池取得自己的連線與交易，同一執行緒內的 get_cursor()、get_connection()
+    都會回傳該請求的連線。
+    """
+
+    def __init__(self, pool_size=None):
+        """
+        初始化資料庫配置
+
+        Args:
+            pool_size: 連線池大小(可選，預設讀取 mysql_pool_size 環境變數，0代表不使用連線池)
+        """
         self.db_config = {
             'host': 'localhost',
             'user': 'root',
             'password': os.getenv("mysql_password"),
             'database': 'police_schedule_db'
         }
+        self.pool_size = int(pool_size if pool_size is not None else os.getenv("mysql_pool_size") or 0)
+        # 寫入 Change_Log 時用來辨識異動來自哪個席位
+        self.client_id = f"{socket.gethostname()}-{os.getpid()}"
         self.conn = None
         self.cursor = None
+        self.pool = None
+        self._local = threading.local()
+        # 未使用連線池時，各執行緒的請求輪流使用同一個連線
+        self._shared_lock = threading.RLock()
 
     def connect(self):
         """建立資料庫連接"""
         try:
             self.conn = mysql.connector.connect(**self.db_config)
             self.cursor = self.conn.cursor()
+            self._identify(self.cursor)
+            if self.pool_size > 0:
+                self.pool = pooling.MySQLConnectionPool(
+                    pool_name='police_schedule_pool',
+                    pool_size=self.pool_size,
+                    **self.db_config
+                )
             print("資料庫連接成功")
         except mysql.connector.Error as err:
             print(f"資料庫連接錯誤: {err}")
@@ -40,10 +69,61 @@ class DatabaseConnection:
         except mysql.connector.Error as err:
             print(f"關閉資料庫連接時發生錯誤: {err}")
 
+    @contextmanager
+    def session(self):
+        """
+        請求範圍的連線與交易
+
+        有連線池時取得一個專用連線，結束時回滾未提交的變更並歸還連線池；
+        沒有連線池時以鎖獨占共用連線。同一執行緒內巢狀呼叫會沿用外層的連線。
+
+        Yields:
+            MySQLConnection: 本次請求的連線
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            self._local.depth += 1
+            try:
+                yield self._local.conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        if self.pool is None:
+            with self._shared_lock:
+                self._local.conn, self._local.cursor, self._local.depth = self.conn, self.cursor, 0
+                try:
+                    yield self.conn
+                finally:
+                    self._local.conn = self._local.cursor = None
+            return
+
+        conn = self.pool.get_connection()
+        cursor = None
+        try:
+            cursor = conn.cursor(buffered=True)
+            # 連線歸還連線池時會重設工作階段變數，每次取出都要重新設定
+            self._identify(cursor)
+            self._local.conn, self._local.cursor, self._local.depth = conn, cursor, 0
+            yield conn
+        finally:
+            self._local.conn = self._local.cursor = None
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                if cursor is not None:
+                    cursor.close()
+            finally:
+                # 對池化連線呼叫 close() 會歸還連線池
+                conn.close()
+
+    def _identify(self, cursor):
+        """設定連線的 @client_id，供觸發程序記錄異動來源"""
+        cursor.execute("SET @client_id = %s", (self.client_id,))
+
     def get_cursor(self):
-        """獲取資料庫游標"""
-        return self.cursor
+        """獲取資料庫游標，請求範圍內為該請求的游標"""
+        return getattr(self._local, 'cursor', None) or self.cursor
 
     def get_connection(self):
-        """獲取資料庫連接"""
-        return self.conn
\ No newline at end of file
+        """獲取資料庫連接，請求範圍內為該請求的連線"""
+        return getattr(self._local, 'conn', None) or self.conn
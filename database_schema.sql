@@ -12,17 +12,138 @@ CREATE TABLE Employee_Shift (
     current_shift VARCHAR(20) NOT NULL
 );
 
+-- 建立隊內人員順序表，position 以間隔編號，移動一人只需更新一筆
+CREATE TABLE Team_Member (
+    S_ID VARCHAR(10) PRIMARY KEY,
+    team VARCHAR(10) NOT NULL,
+    position INT NOT NULL,
+    KEY idx_team_member_position (team, position),
+    FOREIGN KEY (S_ID) REFERENCES Employee_Shift(S_ID) ON DELETE CASCADE
+);
+
 -- 建立班表資料表
+-- 依年份分割，日期查詢只讀取涵蓋的分割區；已結束年度可移到封存檔(見 archive.py)
+-- 分割表的唯一鍵須包含分割欄位，且不支援外鍵，S_ID 由程式檢查
 CREATE TABLE Shift (
-    id INT AUTO_INCREMENT PRIMARY KEY,
+    id INT AUTO_INCREMENT,
     shift_name VARCHAR(20) NOT NULL,
     S_ID VARCHAR(10) NOT NULL,
     shift_date DATE NOT NULL,
     team_order INT NOT NULL,
     day_order INT NOT NULL,
+    PRIMARY KEY (id, shift_date),
+    UNIQUE KEY uq_shift_date_name (shift_date, shift_name),
+    KEY idx_shift_sid_date (S_ID, shift_date)
+)
+PARTITION BY RANGE (YEAR(shift_date)) (
+    PARTITION p2024 VALUES LESS THAN (2025),
+    PARTITION p2025 VALUES LESS THAN (2026),
+    PARTITION p2026 VALUES LESS THAN (2027),
+    PARTITION p2027 VALUES LESS THAN (2028),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- 建立特殊日期表(國定假日、颱風假、特殊勤務)
+CREATE TABLE Calendar_Exception (
+    exception_date DATE PRIMARY KEY,
+    exception_type VARCHAR(20) NOT NULL,
+    description VARCHAR(100),
+    working_shifts VARCHAR(100) NULL,   -- 當日上班的假檔(以逗號分隔)，NULL代表依輪休週期
+    standby_group_size INT NULL         -- 備勤每組警務員人數，NULL代表預設9人
+);
+
+-- 建立請假紀錄表(病假、事假、公假、受訓、出庭)
+CREATE TABLE Leave_Record (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    S_ID VARCHAR(10) NOT NULL,
+    leave_type VARCHAR(20) NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    note VARCHAR(100),
+    KEY idx_leave_sid_start (S_ID, start_date),
     FOREIGN KEY (S_ID) REFERENCES Employee_Shift(S_ID)
 );
 
+-- 建立異動紀錄表，由觸發程序寫入，供各席位以遞增的 id 取得其他席位的異動
+CREATE TABLE Change_Log (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    entity VARCHAR(30) NOT NULL,        -- 異動的資料表
+    action VARCHAR(10) NOT NULL,        -- insert、update、delete
+    ref_id INT NULL,                    -- 請假紀錄編號
+    ref_date DATE NULL,                 -- 班表日期、特殊日期或請假起始日
+    ref_end_date DATE NULL,             -- 請假結束日
+    ref_name VARCHAR(20) NULL,          -- 班別名稱
+    S_ID VARCHAR(10) NULL,              -- 異動後的警員編號
+    old_S_ID VARCHAR(10) NULL,          -- 異動前的警員編號
+    client_id VARCHAR(100) NULL,        -- 發出異動的席位(連線時設定的 @client_id)
+    KEY idx_change_log_changed_at (changed_at)
+);
+
+-- 建立備勤分組表，由夜間批次或查詢時產生，依 change_id 之後的異動判斷是否過期
+CREATE TABLE Standby_Group (
+    group_date DATE NOT NULL,
+    group_mode VARCHAR(20) NOT NULL,    -- 分組方式(sequential、balanced)
+    group_data MEDIUMTEXT NOT NULL,     -- 分組結果(JSON)
+    change_id BIGINT NOT NULL,          -- 產生時已反映的最後一筆 Change_Log id
+    applied_ids VARCHAR(500) NULL,      -- change_id 之後已以增量方式套用的異動id(逗號分隔)
+    generated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (group_date, group_mode)
+);
+
+DELIMITER //
+
+CREATE TRIGGER trg_shift_insert AFTER INSERT ON Shift FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, ref_date, ref_name, S_ID, client_id)
+    VALUES ('Shift', 'insert', NEW.shift_date, NEW.shift_name, NEW.S_ID, @client_id)//
+
+CREATE TRIGGER trg_shift_update AFTER UPDATE ON Shift FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, ref_date, ref_name, S_ID, old_S_ID, client_id)
+    VALUES ('Shift', 'update', NEW.shift_date, NEW.shift_name, NEW.S_ID, OLD.S_ID, @client_id)//
+
+CREATE TRIGGER trg_shift_delete AFTER DELETE ON Shift FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, ref_date, ref_name, old_S_ID, client_id)
+    VALUES ('Shift', 'delete', OLD.shift_date, OLD.shift_name, OLD.S_ID, @client_id)//
+
+CREATE TRIGGER trg_employee_insert AFTER INSERT ON Employee_Shift FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, S_ID, client_id)
+    VALUES ('Employee_Shift', 'insert', NEW.S_ID, @client_id)//
+
+CREATE TRIGGER trg_employee_update AFTER UPDATE ON Employee_Shift FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, S_ID, old_S_ID, client_id)
+    VALUES ('Employee_Shift', 'update', NEW.S_ID, OLD.S_ID, @client_id)//
+
+CREATE TRIGGER trg_employee_delete AFTER DELETE ON Employee_Shift FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, old_S_ID, client_id)
+    VALUES ('Employee_Shift', 'delete', OLD.S_ID, @client_id)//
+
+CREATE TRIGGER trg_leave_insert AFTER INSERT ON Leave_Record FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, ref_id, ref_date, ref_end_date, S_ID, client_id)
+    VALUES ('Leave_Record', 'insert', NEW.id, NEW.start_date, NEW.end_date, NEW.S_ID, @client_id)//
+
+CREATE TRIGGER trg_leave_update AFTER UPDATE ON Leave_Record FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, ref_id, ref_date, ref_end_date, S_ID, old_S_ID, client_id)
+    VALUES ('Leave_Record', 'update', NEW.id, LEAST(OLD.start_date, NEW.start_date),
+            GREATEST(OLD.end_date, NEW.end_date), NEW.S_ID, OLD.S_ID, @client_id)//
+
+CREATE TRIGGER trg_leave_delete AFTER DELETE ON Leave_Record FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, ref_id, ref_date, ref_end_date, old_S_ID, client_id)
+    VALUES ('Leave_Record', 'delete', OLD.id, OLD.start_date, OLD.end_date, OLD.S_ID, @client_id)//
+
+CREATE TRIGGER trg_calendar_insert AFTER INSERT ON Calendar_Exception FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, ref_date, client_id)
+    VALUES ('Calendar_Exception', 'insert', NEW.exception_date, @client_id)//
+
+CREATE TRIGGER trg_calendar_update AFTER UPDATE ON Calendar_Exception FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, ref_date, client_id)
+    VALUES ('Calendar_Exception', 'update', NEW.exception_date, @client_id)//
+
+CREATE TRIGGER trg_calendar_delete AFTER DELETE ON Calendar_Exception FOR EACH ROW
+    INSERT INTO Change_Log (entity, action, ref_date, client_id)
+    VALUES ('Calendar_Exception', 'delete', OLD.exception_date, @client_id)//
+
+DELIMITER ;
+
 -- 插入測試資料
 INSERT INTO Employee_Shift (S_ID, name, team, job_rank, current_shift) VALUES
 ('C001', '李隊長', '1', '隊長', '123檔期'),
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from orders import expected_orders
+
+
+DUTY_COLUMNS = ['S_ID', 'date', 'known', 'name', 'team', 'current_shift', 'working', 'leave_type',
+                'on_duty', 'team_order', 'day_order', 'posts']
+
+
+def duty_status(s_ids, dates, roster, shifts, rotation, calendar=None, leaves=None):
+    """
+    批次查詢多位警員在多個日期的上班狀態
+
+    Args:
+        s_ids: 警員編號序列
+        dates: 與警員編號等長的日期序列
+        roster: 人員DataFrame，需包含 S_ID, name, team, current_shift
+        shifts: 涵蓋查詢日期的排班DataFrame，需包含 shift_date, shift_name, S_ID
+        rotation: RotationPattern
+        calendar: ExceptionCalendar(可選)
+        leaves: LeaveIndex(可選)
+
+    Returns:
+        DataFrame: 依輸入順序每組 (警員, 日期) 一列，欄位為 DUTY_COLUMNS。
+                   working 為依輪休週期與特殊日期應上班，on_duty 為應上班且未請假或當天已排班，
+                   posts 為當天排定的班別，多個以逗號分隔，未排班為空字串
+    """
+    s_ids, dates = list(s_ids), list(dates)
+    if len(s_ids) != len(dates):
+        raise ValueError("警員編號與日期的筆數不同")
+
+    frame = pd.DataFrame({'S_ID': s_ids, 'date': pd.to_datetime(pd.Series(dates)).dt.date})
+    frame = frame.merge(roster[['S_ID', 'name', 'team', 'current_shift']],
+                        on='S_ID', how='left', indicator='_merge')
+    frame['known'] = (frame['_merge'] == 'both').to_numpy()
+    frame = frame.drop(columns='_merge')
+    day_index = pd.DatetimeIndex(pd.to_datetime(frame['date']))
+
+    # 上班狀態：期間內各假檔的上班矩陣算一次，再依假檔與日期查表
+    shift_types = rotation.shift_types
+    type_index = frame['current_shift'].map({shift: i for i, shift in enumerate(shift_types)})
+    known_type = type_index.notna().to_numpy()
+    working = np.zeros(len(frame), dtype=bool)
+    if known_type.any():
+        days = day_index[known_type].unique().sort_values()
+        matrix = rotation.working_matrix(days, shift_types)
+        if calendar is not None:
+            matrix = calendar.apply_to_matrix(matrix, days, shift_types)
+        working[known_type] = matrix[type_index[known_type].astype(int).to_numpy(),
+                                     days.get_indexer(day_index[known_type])]
+    frame['working'] = working
+
+    if leaves is not None:
+        frame['leave_type'] = leaves.leave_types(frame['S_ID'], day_index).to_numpy()
+    else:
+        frame['leave_type'] = None
+
+    # 排序只對人員資料中有的警員計算
+    team_orders = np.zeros(len(frame), dtype=int)
+    day_orders = np.zeros(len(frame), dtype=int)
+    known = frame['known'].to_numpy()
+    if known.any():
+        known_rows = frame.loc[known, ['date', 'team', 'current_shift']].rename(columns={'date': 'shift_date'})
+        team_orders[known], day_orders[known] = expected_orders(known_rows, rotation, calendar)
+    frame['team_order'] = team_orders
+    frame['day_order'] = day_orders
+
+    # 當天排定的班別：同一人同一天可能有多個班別
+    posts = pd.Series('', index=frame.index, dtype=object)
+    if not shifts.empty:
+        assigned = shifts.assign(date=pd.to_datetime(shifts['shift_date']).dt.date) \
+            .groupby(['S_ID', 'date'])['shift_name'].agg(', '.join)
+        keys = pd.MultiIndex.from_arrays([frame['S_ID'], frame['date']])
+        posts = pd.Series(assigned.reindex(keys).fillna('').to_numpy(), index=frame.index, dtype=object)
+    frame['posts'] = posts
+
+    frame['on_duty'] = (frame['working'] & frame['leave_type'].isna()) | (frame['posts'] != '')
+    return frame[DUTY_COLUMNS]
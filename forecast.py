@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+from rotation import RotationPattern
+from utils import format_date
+from simulator import (compile_cycle, get_post_requirements, RANKS,
+                       STANDBY_GROUP_OFFICERS, STANDBY_GROUP_CAPTAINS)
+
+
+class StaffingForecast:
+    """依輪休週期與人員資料預測每日可用人力"""
+
+    def __init__(self, roster, cycle=None, calendar=None, leaves=None):
+        """
+        初始化預測器，預先統計各假檔、職級、隊伍的人數
+
+        Args:
+            roster: 人員DataFrame，需包含 team, job_rank, current_shift
+            cycle: 週期定義或RotationPattern(可選，預設為目前輪休)
+            calendar: ExceptionCalendar(可選)
+            leaves: LeaveIndex(可選)
+        """
+        self.cycle = compile_cycle(cycle or RotationPattern.load())
+        self.calendar = calendar
+        self.leaves = leaves
+        self.members = roster.set_index('S_ID')[['job_rank', 'team', 'current_shift']]
+        self.shift_types = self.cycle.shift_types
+        self.requirements = get_post_requirements()
+
+        counts = roster.groupby(['current_shift', 'job_rank', 'team']).size()
+        self.counts = counts.unstack(['job_rank', 'team'], fill_value=0) \
+            .reindex(index=self.shift_types, fill_value=0) \
+            .sort_index(axis=1)
+
+    def headcount(self, start_date, end_date):
+        """
+        計算期間內每日各職級、各隊的上班人數
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+
+        Returns:
+            DataFrame: 以日期為索引，欄位為 (職級, 隊伍) 的人數
+        """
+        dates = pd.date_range(format_date(start_date), format_date(end_date), freq='D')
+        working = self.cycle.working_matrix(dates)
+        if self.calendar is not None:
+            working = self.calendar.apply_to_matrix(working, dates, self.shift_types)
+        values = working.T.astype(int) @ self.counts.to_numpy()
+
+        # 請假期間原本要上班的日子從對應職級、隊伍扣除
+        if self.leaves is not None:
+            first_day = dates[0].date() if len(dates) else None
+            for s_id, start, end in self.leaves.overlapping(start_date, end_date):
+                if s_id not in self.members.index:
+                    continue
+                rank, team, shift_type = self.members.loc[s_id]
+                if shift_type not in self.shift_types:
+                    continue
+                a, b = (start - first_day).days, (end - first_day).days + 1
+                row = self.shift_types.index(shift_type)
+                col = self.counts.columns.get_loc((rank, team))
+                values[a:b, col] -= working[row, a:b]
+
+        return pd.DataFrame(values, index=dates, columns=self.counts.columns)
+
+    def rank_summary(self, headcount, min_standby_groups=1):
+        """
+        彙總各職級人數並標記人力不足的日期
+
+        Args:
+            headcount: headcount() 的結果
+            min_standby_groups: 每日至少需要的備勤組數
+
+        Returns:
+            DataFrame: 各職級上班人數、需求人數、缺額與是否人力不足
+        """
+        by_rank = headcount.T.groupby(level='job_rank').sum().T.reindex(columns=RANKS, fill_value=0)
+
+        needed = {
+            '警務員': self.requirements['警務員'] + STANDBY_GROUP_OFFICERS * min_standby_groups,
+            '隊長': self.requirements['隊長'] + STANDBY_GROUP_CAPTAINS * min_standby_groups,
+            '副大隊長': self.requirements['副大隊長']
+        }
+
+        summary = by_rank.copy()
+        for rank in RANKS:
+            summary[f'{rank}缺額'] = np.maximum(needed[rank] - by_rank[rank], 0)
+
+        summary['可組備勤組數'] = np.maximum(np.minimum(
+            (by_rank['警務員'] - self.requirements['警務員']) // STANDBY_GROUP_OFFICERS,
+            (by_rank['隊長'] - self.requirements['隊長']) // STANDBY_GROUP_CAPTAINS
+        ), 0)
+        summary['人力不足'] = summary[[f'{rank}缺額' for rank in RANKS]].sum(axis=1) > 0
+        return summary
+
+    def detect_understaffing(self, start_date, end_date, min_standby_groups=1):
+        """
+        找出期間內人力不足的日期
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+            min_standby_groups: 每日至少需要的備勤組數
+
+        Returns:
+            DataFrame: 僅包含人力不足日期的彙總
+        """
+        summary = self.rank_summary(self.headcount(start_date, end_date), min_standby_groups)
+        return summary[summary['人力不足']]
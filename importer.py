@@ -0,0 +1,370 @@
+import os
+from datetime import datetime
+import pandas as pd
+from utils import get_team_order, get_rank_restrictions, get_valid_teams, get_valid_ranks
+
+
+# 匯入檔案可使用中文欄位名稱
+COLUMN_ALIASES = {
+    '警員編號': 'S_ID',
+    '姓名': 'name',
+    '隊別': 'team',
+    '職級': 'job_rank',
+    '假檔': 'current_shift',
+    '班別': 'shift_name',
+    '日期': 'shift_date'
+}
+
+EMPLOYEE_COLUMNS = ['S_ID', 'name', 'team', 'job_rank', 'current_shift']
+SHIFT_COLUMNS = ['shift_name', 'S_ID', 'shift_date']
+
+
+def read_in_chunks(path, chunksize=5000):
+    """
+    分批讀取CSV或Excel檔案
+
+    Args:
+        path: 檔案路徑
+        chunksize: 每批筆數
+
+    Yields:
+        DataFrame: 全部欄位皆為字串的資料批次，索引為檔案中的列號
+    """
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == '.csv':
+        reader = pd.read_csv(path, dtype=str, chunksize=chunksize,
+                             keep_default_na=False, encoding='utf-8-sig')
+        for chunk in reader:
+            # 索引轉為檔案列號(含標題列)
+            chunk.index = chunk.index + 2
+            yield chunk.rename(columns=COLUMN_ALIASES)
+
+    elif ext in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(col).strip() for col in next(rows, ())]
+            buffer = []
+            line_no = 2
+            for row in rows:
+                buffer.append(['' if value is None else _cell_to_str(value) for value in row])
+                if len(buffer) >= chunksize:
+                    yield _excel_chunk(buffer, header, line_no)
+                    line_no += len(buffer)
+                    buffer = []
+            if buffer:
+                yield _excel_chunk(buffer, header, line_no)
+        finally:
+            workbook.close()
+
+    else:
+        raise ValueError(f"不支援的檔案格式: {ext}")
+
+
+def _cell_to_str(value):
+    """將Excel儲存格轉為字串"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _excel_chunk(buffer, header, line_no):
+    """將Excel資料列轉為DataFrame"""
+    df = pd.DataFrame(buffer, columns=header, dtype=str)
+    df.index = range(line_no, line_no + len(df))
+    return df.rename(columns=COLUMN_ALIASES)
+
+
+def _collect_reasons(df, checks):
+    """
+    將多個向量化檢查結果合併為錯誤原因
+
+    Args:
+        df: 資料批次
+        checks: (布林Series, 錯誤訊息) 的列表
+
+    Returns:
+        Series: 每列的錯誤原因，空字串代表通過
+    """
+    reasons = pd.Series('', index=df.index, dtype=object)
+    for mask, message in checks:
+        reasons = reasons.mask(mask, reasons + message + '；')
+    return reasons.str.rstrip('；')
+
+
+class RosterImporter:
+    """批次匯入人員與歷史班表"""
+
+    def __init__(self, manager, chunksize=5000):
+        """
+        初始化匯入器
+
+        Args:
+            manager: ShiftManager 實例
+            chunksize: 每批處理筆數
+        """
+        self.manager = manager
+        self.db = manager.db
+        self.chunksize = chunksize
+        self.rejected = []
+
+    def validate_employees(self, chunk, seen_ids):
+        """
+        驗證人員資料批次
+
+        Args:
+            chunk: 資料批次
+            seen_ids: 先前批次已出現的警員編號
+
+        Returns:
+            tuple: (通過的DataFrame, 被拒絕的DataFrame)
+        """
+        missing = [col for col in EMPLOYEE_COLUMNS if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"缺少欄位: {', '.join(missing)}")
+
+        df = chunk[EMPLOYEE_COLUMNS].apply(lambda col: col.str.strip())
+
+        reasons = _collect_reasons(df, [
+            ((df == '').any(axis=1), '缺少必要欄位'),
+            (df['S_ID'].str.len() > 10, '警員編號過長'),
+            (df['name'].str.len() > 50, '姓名過長'),
+            (~df['team'].isin(get_valid_teams()), '無效的隊伍編號'),
+            (~df['job_rank'].isin(get_valid_ranks()), '無效的職級'),
+            (~df['current_shift'].isin(self.manager.rotation.shift_types), '無效的假檔')
+        ])
+
+        # 重複檢查只比對其他檢查皆通過的資料列，批次內與跨批次都以檔案中第一筆為準
+        s_ids = df['S_ID'].where(reasons == '')
+        duplicated = s_ids.notna() & (s_ids.duplicated(keep='first') | s_ids.isin(seen_ids))
+        reasons = reasons.mask(duplicated, '檔案內重複的警員編號')
+        return df[reasons == ''], df[reasons != ''].assign(原因=reasons[reasons != ''])
+
+    def validate_shifts(self, chunk, roster, seen_keys):
+        """
+        驗證歷史班表資料批次
+
+        同一人同一天在資料庫中已有其他班別，且該班別不會被本次匯入覆蓋時也拒絕；
+        已封存年份的排班不能再寫入。
+
+        Args:
+            chunk: 資料批次
+            roster: 以S_ID為索引的人員DataFrame
+            seen_keys: 先前批次已出現的 (日期, 班別) 與 (日期, 警員編號)
+
+        Returns:
+            tuple: (通過的DataFrame, 被拒絕的DataFrame)
+        """
+        missing = [col for col in SHIFT_COLUMNS if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"缺少欄位: {', '.join(missing)}")
+
+        df = chunk[SHIFT_COLUMNS].apply(lambda col: col.str.strip())
+        dates = pd.to_datetime(df['shift_date'], format='%Y-%m-%d', errors='coerce')
+        df = df.assign(shift_date=dates.dt.date)
+
+        rank_restrictions = pd.Series(get_rank_restrictions())
+        required_rank = df['shift_name'].map(rank_restrictions)
+        actual_rank = df['S_ID'].map(roster['job_rank'])
+
+        reasons = _collect_reasons(df, [
+            (dates.isna(), '日期格式錯誤'),
+            (required_rank.isna(), '無效的班別'),
+            (actual_rank.isna(), '找不到警員編號'),
+            (required_rank.notna() & actual_rank.notna() & (required_rank != actual_rank), '職級不符'),
+            (dates.dt.year.isin(self.manager.archive.years()), '該年度排班已封存')
+        ])
+
+        # 重複檢查只比對其他檢查皆通過的資料列，批次內與跨批次都以檔案中第一筆為準
+        day_keys = dates.dt.strftime('%Y-%m-%d').where(reasons == '')
+        post_keys = day_keys + '|' + df['shift_name']
+        person_keys = day_keys + '|' + df['S_ID']
+        duplicated = day_keys.notna() & (
+            post_keys.duplicated(keep='first') | post_keys.isin(seen_keys) |
+            person_keys.duplicated(keep='first') | person_keys.isin(seen_keys)
+        )
+        reasons = reasons.mask(duplicated, '檔案內重複的班別或人員')
+
+        # 資料庫中同一人同一天的其他班別，若該班別已由檔案覆蓋則不算重複
+        checked = reasons == ''
+        if checked.any():
+            existing = self.load_shifts(df.loc[checked, 'shift_date'].min(), df.loc[checked, 'shift_date'].max())
+            existing_days = pd.to_datetime(existing['shift_date']).dt.strftime('%Y-%m-%d')
+            existing_posts = existing_days + '|' + existing['shift_name']
+            kept = ~(existing_posts.isin(seen_keys) | existing_posts.isin(post_keys[checked])).to_numpy()
+            booked = pd.MultiIndex.from_arrays([existing_days[kept], existing['S_ID'][kept]])
+            rows = pd.MultiIndex.from_arrays([day_keys, df['S_ID']])
+            other_post = pd.Series(rows.isin(booked), index=df.index) & checked
+            reasons = reasons.mask(other_post, '該員當天在資料庫中已有其他班別')
+        seen_keys.update(post_keys[reasons == ''])
+        seen_keys.update(person_keys[reasons == ''])
+        return df[reasons == ''], df[reasons != ''].assign(原因=reasons[reasons != ''])
+
+    def upsert_employees(self, df):
+        """
+        批次新增或更新人員資料
+
+        Args:
+            df: 已驗證的人員DataFrame
+        """
+        query = """
+        INSERT INTO Employee_Shift (S_ID, name, team, job_rank, current_shift)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            name = VALUES(name),
+            team = VALUES(team),
+            job_rank = VALUES(job_rank),
+            current_shift = VALUES(current_shift)
+        """
+        self.db.get_cursor().executemany(query, list(df.itertuples(index=False, name=None)))
+
+    def upsert_shifts(self, df, roster):
+        """
+        批次新增或更新歷史班表
+
+        Args:
+            df: 已驗證的班表DataFrame
+            roster: 以S_ID為索引的人員DataFrame
+        """
+        teams = df['S_ID'].map(roster['team'])
+        shift_types = df['S_ID'].map(roster['current_shift'])
+
+        # 每個(隊伍, 月份)與日期只計算一次排序
+        months = df['shift_date'].map(lambda d: d.month)
+        team_order_cache = {
+            key: get_team_order(key[0], key[1])
+            for key in set(zip(teams, months))
+        }
+        day_order_cache = {
+            day: self.manager.get_current_shift_order(day)
+            for day in df['shift_date'].unique()
+        }
+
+        rows = [
+            (shift_name, s_id, shift_date,
+             team_order_cache[(team, month)],
+             day_order_cache[shift_date].get(shift_type, 0))
+            for shift_name, s_id, shift_date, team, month, shift_type
+            in zip(df['shift_name'], df['S_ID'], df['shift_date'], teams, months, shift_types)
+        ]
+
+        query = """
+        INSERT INTO Shift (shift_name, S_ID, shift_date, team_order, day_order)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            S_ID = VALUES(S_ID),
+            team_order = VALUES(team_order),
+            day_order = VALUES(day_order)
+        """
+        self.db.get_cursor().executemany(query, rows)
+
+    def load_shifts(self, start_date, end_date):
+        """
+        讀取期間內資料庫中已有的排班
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+
+        Returns:
+            DataFrame: 包含 shift_date, shift_name, S_ID 的排班資料
+        """
+        self.db.get_cursor().execute(
+            "SELECT shift_date, shift_name, S_ID FROM Shift WHERE shift_date BETWEEN %s AND %s",
+            (start_date, end_date)
+        )
+        rows = self.db.get_cursor().fetchall()
+        return pd.DataFrame(rows, columns=['shift_date', 'shift_name', 'S_ID'])
+
+    def load_roster(self):
+        """
+        一次讀取全部人員資料
+
+        Returns:
+            DataFrame: 以S_ID為索引的人員資料
+        """
+        self.db.get_cursor().execute(
+            "SELECT S_ID, team, job_rank, current_shift FROM Employee_Shift"
+        )
+        rows = self.db.get_cursor().fetchall()
+        return pd.DataFrame(rows, columns=['S_ID', 'team', 'job_rank', 'current_shift']).set_index('S_ID')
+
+    def run(self, employee_path=None, shift_path=None, dry_run=False):
+        """
+        執行匯入，所有寫入在同一個交易中完成
+
+        Args:
+            employee_path: 人員資料檔路徑(可選)
+            shift_path: 歷史班表檔路徑(可選)
+            dry_run: 只驗證不寫入
+
+        Returns:
+            dict: 匯入結果統計
+        """
+        result = {'人員匯入': 0, '班表匯入': 0, '拒絕筆數': 0, '錯誤報告': None}
+        self.rejected = []
+
+        try:
+            imported = []
+            if employee_path:
+                seen_ids = set()
+                for chunk in read_in_chunks(employee_path, self.chunksize):
+                    valid, rejected = self.validate_employees(chunk, seen_ids)
+                    seen_ids.update(valid['S_ID'])
+                    self._reject(rejected, employee_path)
+                    if not dry_run and not valid.empty:
+                        self.upsert_employees(valid)
+                    imported.append(valid)
+                    result['人員匯入'] += len(valid)
+
+            if shift_path:
+                # 讀取人員資料放在人員匯入之後，才能看到同一交易中新增的人員
+                roster = self.load_roster()
+                if dry_run and imported:
+                    # 只驗證時人員資料未寫入，以檔案中通過驗證的人員補上
+                    employees = pd.concat(imported).set_index('S_ID')[roster.columns]
+                    roster = pd.concat([roster[~roster.index.isin(employees.index)], employees])
+                seen_keys = set()
+                for chunk in read_in_chunks(shift_path, self.chunksize):
+                    valid, rejected = self.validate_shifts(chunk, roster, seen_keys)
+                    self._reject(rejected, shift_path)
+                    if not dry_run and not valid.empty:
+                        self.upsert_shifts(valid, roster)
+                    result['班表匯入'] += len(valid)
+
+            if dry_run:
+                self.db.get_connection().rollback()
+            else:
+                self.db.get_connection().commit()
+
+        except Exception:
+            self.db.get_connection().rollback()
+            raise
+
+        result['拒絕筆數'] = sum(len(df) for df in self.rejected)
+        if self.rejected:
+            result['錯誤報告'] = self.write_report()
+        return result
+
+    def _reject(self, rejected, source):
+        """記錄被拒絕的資料列"""
+        if not rejected.empty:
+            rejected = rejected.rename_axis('列號').reset_index()
+            rejected.insert(0, '來源', os.path.basename(source))
+            self.rejected.append(rejected)
+
+    def write_report(self):
+        """
+        輸出被拒絕資料列的報告
+
+        Returns:
+            str: 報告檔案名稱
+        """
+        filename = f"匯入錯誤報告_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        pd.concat(self.rejected, ignore_index=True).to_csv(filename, index=False, encoding='utf-8-sig')
+        return filename
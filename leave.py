@@ -0,0 +1,234 @@
+import threading
+from bisect import bisect_right
+from datetime import timedelta
+import pandas as pd
+from utils import format_date
+
+
+LEAVE_TYPES = ['病假', '事假', '公假', '受訓', '出庭']
+
+
+class LeaveIndex:
+    """
+    請假區間的記憶體索引
+
+    每位警員的請假區間合併為依起始日排序的不重疊區間，
+    查詢某日是否請假只需一次二分搜尋。
+    新增、刪除與需要走訪全部資料的查詢以鎖互斥，可由多個執行緒共用。
+    """
+
+    def __init__(self):
+        """初始化空的請假索引"""
+        self.records = {}
+        self._by_officer = {}
+        self._merged = {}
+        self._lock = threading.RLock()
+
+    def load(self, cursor):
+        """
+        從資料庫載入全部請假紀錄
+
+        Args:
+            cursor: 資料庫游標
+        """
+        cursor.execute("""
+        SELECT id, S_ID, leave_type, start_date, end_date, note
+        FROM Leave_Record
+        """)
+        self.load_rows(cursor.fetchall())
+
+    def load_rows(self, rows):
+        """
+        由資料列建立請假索引
+
+        Args:
+            rows: (id, S_ID, leave_type, start_date, end_date, note) 的序列
+        """
+        with self._lock:
+            self.records = {}
+            self._by_officer = {}
+            for row in rows:
+                self._store(*row)
+            self._merged = {}
+            for s_id in self._by_officer:
+                self._rebuild(s_id)
+
+    def _store(self, leave_id, s_id, leave_type, start_date, end_date, note):
+        """記錄單筆請假資料"""
+        self.records[leave_id] = {
+            'id': leave_id,
+            'S_ID': s_id,
+            'leave_type': leave_type,
+            'start_date': start_date,
+            'end_date': end_date,
+            'note': note or ''
+        }
+        self._by_officer.setdefault(s_id, []).append(leave_id)
+
+    def _rebuild(self, s_id):
+        """重建單一警員的合併區間"""
+        intervals = sorted(
+            (self.records[leave_id]['start_date'], self.records[leave_id]['end_date'])
+            for leave_id in self._by_officer.get(s_id, [])
+        )
+        starts, ends = [], []
+        for start, end in intervals:
+            # 重疊或相連的區間合併為一段
+            if ends and start <= ends[-1] + timedelta(days=1):
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+
+        if starts:
+            self._merged[s_id] = (starts, ends)
+        else:
+            self._merged.pop(s_id, None)
+            self._by_officer.pop(s_id, None)
+
+    def add(self, leave_id, s_id, leave_type, start_date, end_date, note=None):
+        """新增請假紀錄至索引"""
+        with self._lock:
+            self._store(leave_id, s_id, leave_type, start_date, end_date, note)
+            self._rebuild(s_id)
+
+    def remove(self, leave_id):
+        """
+        從索引移除請假紀錄
+
+        Returns:
+            dict: 被移除的紀錄，不存在則為 None
+        """
+        with self._lock:
+            record = self.records.pop(leave_id, None)
+            if record:
+                self._by_officer[record['S_ID']].remove(leave_id)
+                self._rebuild(record['S_ID'])
+        return record
+
+    def find(self, s_id, date):
+        """
+        查詢警員在指定日期的請假紀錄
+
+        Args:
+            s_id: 警員編號
+            date: 查詢日期
+
+        Returns:
+            dict: 涵蓋該日的請假紀錄，沒有請假則為 None
+        """
+        date = format_date(date)
+        if not self.is_on_leave(s_id, date):
+            return None
+
+        # 確定有請假後才從該員的紀錄中找出涵蓋該日的那一筆
+        with self._lock:
+            for leave_id in self._by_officer.get(s_id, []):
+                record = self.records[leave_id]
+                if record['start_date'] <= date <= record['end_date']:
+                    return record
+        return None
+
+    def is_on_leave(self, s_id, date):
+        """
+        檢查警員在指定日期是否請假
+
+        Args:
+            s_id: 警員編號
+            date: 查詢日期
+
+        Returns:
+            bool: 是否請假
+        """
+        merged = self._merged.get(s_id)
+        if merged is None:
+            return False
+        date = format_date(date)
+        starts, ends = merged
+        i = bisect_right(starts, date) - 1
+        return i >= 0 and ends[i] >= date
+
+    def on_leave_ids(self, date):
+        """
+        取得指定日期請假中的所有警員
+
+        Args:
+            date: 查詢日期
+
+        Returns:
+            set: 警員編號集合
+        """
+        date = format_date(date)
+        with self._lock:
+            return {s_id for s_id in self._merged if self.is_on_leave(s_id, date)}
+
+    def overlapping(self, start_date, end_date):
+        """
+        列出與期間重疊的合併請假區間
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+
+        Returns:
+            list: (警員編號, 區間起始日, 區間結束日) 的列表，已截到查詢期間內
+        """
+        start_date, end_date = format_date(start_date), format_date(end_date)
+        result = []
+        with self._lock:
+            for s_id, (starts, ends) in self._merged.items():
+                i = bisect_right(starts, end_date) - 1
+                while i >= 0 and ends[i] >= start_date:
+                    result.append((s_id, max(starts[i], start_date), min(ends[i], end_date)))
+                    i -= 1
+        return result
+
+    def records_between(self, start_date, end_date, s_id=None):
+        """
+        列出與期間重疊的請假紀錄
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+            s_id: 警員編號(可選)
+
+        Returns:
+            list: 依起始日排序的請假紀錄
+        """
+        start_date, end_date = format_date(start_date), format_date(end_date)
+        with self._lock:
+            records = list(self.records.values())
+        return sorted(
+            (record for record in records
+             if record['start_date'] <= end_date and record['end_date'] >= start_date
+             and (s_id is None or record['S_ID'] == s_id)),
+            key=lambda record: (record['start_date'], record['S_ID'])
+        )
+
+    def leave_types(self, s_ids, days):
+        """
+        批次查詢多筆 (警員, 日期) 當天的假別
+
+        Args:
+            s_ids: 警員編號序列
+            days: 與警員編號等長的日期序列
+
+        Returns:
+            Series: 假別，未請假為 None，索引為 0 起的位置
+        """
+        frame = pd.DataFrame({'S_ID': list(s_ids), '_day': pd.to_datetime(pd.Series(list(days)))})
+        leave_types = pd.Series([None] * len(frame), dtype=object)
+        if not len(frame):
+            return leave_types
+
+        records = self.records_between(frame['_day'].min().date(), frame['_day'].max().date())
+        if not records:
+            return leave_types
+
+        records = pd.DataFrame(records)[['S_ID', 'leave_type', 'start_date', 'end_date']]
+        pairs = frame.reset_index().merge(records, on='S_ID')
+        inside = (pairs['_day'] >= pd.to_datetime(pairs['start_date'])) & \
+                 (pairs['_day'] <= pd.to_datetime(pairs['end_date']))
+        matched = pairs[inside].drop_duplicates('index').set_index('index')['leave_type']
+        leave_types[matched.index] = matched
+        return leave_types
@@ -0,0 +1,355 @@
+import argparse
+import os
+import random
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+import numpy as np
+from shift_manager import ShiftManager
+from utils import get_valid_teams, get_valid_shift_types, get_shift_display_order, get_rank_restrictions
+
+
+# 合成資料的警員編號前綴，清除時只刪除這些人員與其排班
+SEED_PREFIX = 'LT'
+# 值班台的操作比例
+DISPATCH_MIX = {'查看班表': 50, '備勤分組': 20, '指派班別': 15, '修改班別': 15}
+OUTCOMES = ['成功', '規則不符', '衝突', '死結', '鎖等待逾時', '錯誤']
+
+
+def classify(success, message):
+    """
+    依回傳訊息判斷操作結果
+
+    Args:
+        success: 是否成功
+        message: 結果訊息
+
+    Returns:
+        str: OUTCOMES 之一
+    """
+    if success:
+        return '成功'
+    if 'Deadlock' in message or '1213' in message:
+        return '死結'
+    if 'Lock wait timeout' in message or '1205' in message:
+        return '鎖等待逾時'
+    if '已有人擔任' in message or 'Duplicate entry' in message or '已被其他人修改' in message:
+        return '衝突'
+    if message.startswith('錯誤：'):
+        return '規則不符'
+    return '錯誤'
+
+
+def seed_synthetic(manager, officers, dates, fill=0.5):
+    """
+    建立合成人員與排班，已存在的班別不覆蓋
+
+    Args:
+        manager: ShiftManager 實例
+        officers: 人員數
+        dates: 要預先排班的日期列表
+        fill: 預先排班的班別比例
+
+    Returns:
+        tuple: (人員數, 排班數)
+    """
+    teams = get_valid_teams()
+    shift_types = get_valid_shift_types()
+    employees = []
+    for i in range(officers):
+        rank = '副大隊長' if i % 50 == 0 else '隊長' if i % 10 == 0 else '警務員'
+        employees.append((f"{SEED_PREFIX}{i:05d}", f"測試{i:05d}", teams[i % len(teams)],
+                          rank, shift_types[(i // len(teams)) % len(shift_types)]))
+
+    cursor = manager.db.get_cursor()
+    try:
+        cursor.executemany("""
+        INSERT INTO Employee_Shift (S_ID, name, team, job_rank, current_shift)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            name = VALUES(name),
+            team = VALUES(team),
+            job_rank = VALUES(job_rank),
+            current_shift = VALUES(current_shift)
+        """, employees)
+        manager._invalidate_roster()
+
+        shifts = []
+        for shift_date in dates:
+            for shift_name, rank in get_rank_restrictions().items():
+                candidates = working_officers(manager, employees, shift_date, rank)
+                if candidates and random.random() < fill:
+                    shifts.append((shift_name, random.choice(candidates), shift_date, 0, 0))
+        cursor.executemany("""
+        INSERT IGNORE INTO Shift (shift_name, S_ID, shift_date, team_order, day_order)
+        VALUES (%s, %s, %s, %s, %s)
+        """, shifts)
+        manager._recompute_orders(start_date=min(dates), end_date=max(dates))
+        manager.db.get_connection().commit()
+        return len(employees), len(shifts)
+    except Exception:
+        manager.db.get_connection().rollback()
+        raise
+
+
+def remove_synthetic(manager):
+    """
+    刪除合成人員與其排班
+
+    Args:
+        manager: ShiftManager 實例
+
+    Returns:
+        tuple: (人員數, 排班數)
+    """
+    cursor = manager.db.get_cursor()
+    try:
+        cursor.execute("DELETE FROM Shift WHERE S_ID LIKE %s", (f"{SEED_PREFIX}%",))
+        shifts = cursor.rowcount
+        cursor.execute("DELETE FROM Employee_Shift WHERE S_ID LIKE %s", (f"{SEED_PREFIX}%",))
+        employees = cursor.rowcount
+        manager.db.get_connection().commit()
+        manager._invalidate_roster()
+        return employees, shifts
+    except Exception:
+        manager.db.get_connection().rollback()
+        raise
+
+
+def working_officers(manager, employees, shift_date, rank):
+    """
+    列出當日上班且職級符合的合成人員
+
+    Args:
+        manager: ShiftManager 實例
+        employees: (S_ID, 姓名, 隊別, 職級, 假檔) 列表
+        shift_date: 日期
+        rank: 需要的職級
+
+    Returns:
+        list: 警員編號列表
+    """
+    return [s_id for s_id, _, _, job_rank, shift_type in employees
+            if job_rank == rank and manager.is_working_day(shift_date, shift_type)]
+
+
+def load_synthetic(manager):
+    """
+    讀取資料庫中的合成人員
+
+    Returns:
+        list: (S_ID, 姓名, 隊別, 職級, 假檔) 列表
+    """
+    manager.db.get_cursor().execute("""
+    SELECT S_ID, name, team, job_rank, current_shift
+    FROM Employee_Shift
+    WHERE S_ID LIKE %s
+    """, (f"{SEED_PREFIX}%",))
+    return manager.db.get_cursor().fetchall()
+
+
+def read_operation(manager, dates):
+    """
+    一次查詢請求：查看某日班表並產生備勤分組
+
+    Args:
+        manager: ShiftManager 實例
+        dates: 可查詢的日期列表
+
+    Returns:
+        tuple: (操作名稱, 結果)，任一查詢失敗時結果不是成功
+    """
+    check_date = random.choice(dates)
+    with manager.session():
+        # 查看班表失敗時回傳 None，錯誤訊息只會輸出
+        if manager.view_daily_shifts(check_date) is None:
+            return '查詢', '錯誤'
+        return '查詢', classify(*manager.generate_all_standby_groups(check_date))
+
+
+def dispatch_operation(manager, dates, employees):
+    """
+    一次值班台請求，依 DISPATCH_MIX 的比例選擇查看班表、備勤分組、指派或修改班別
+
+    Args:
+        manager: ShiftManager 實例
+        dates: 可操作的日期列表
+        employees: 合成人員列表
+
+    Returns:
+        tuple: (操作名稱, 結果)
+    """
+    operation = random.choices(list(DISPATCH_MIX), weights=list(DISPATCH_MIX.values()))[0]
+    shift_date = random.choice(dates)
+    with manager.session():
+        if operation == '查看班表':
+            # 查看班表失敗時回傳 None
+            return operation, '成功' if manager.view_daily_shifts(shift_date) is not None else '錯誤'
+        if operation == '備勤分組':
+            return operation, classify(*manager.generate_all_standby_groups(shift_date))
+
+        shift_name = random.choice(get_shift_display_order())
+        rank = get_rank_restrictions()[shift_name]
+        candidates = working_officers(manager, employees, shift_date, rank) or \
+            [s_id for s_id, _, _, job_rank, _ in employees if job_rank == rank]
+        if not candidates:
+            return operation, '規則不符'
+        new_sid = random.choice(candidates)
+
+        if operation == '指派班別':
+            return operation, classify(*manager.assign_shift(shift_name, new_sid, shift_date))
+
+        # 修改班別：先查詢目前擔任的人員，再改派，與值班台的操作順序相同
+        manager.db.get_cursor().execute("""
+        SELECT shift_name, S_ID FROM Shift
+        WHERE shift_date = %s AND S_ID LIKE %s
+        """, (shift_date, f"{SEED_PREFIX}%"))
+        rows = manager.db.get_cursor().fetchall()
+        if not rows:
+            return '指派班別', classify(*manager.assign_shift(shift_name, new_sid, shift_date))
+        shift_name, old_sid = random.choice(rows)
+        rank = get_rank_restrictions().get(shift_name)
+        candidates = [s_id for s_id in working_officers(manager, employees, shift_date, rank) if s_id != old_sid]
+        if not candidates:
+            return operation, '規則不符'
+        return operation, classify(*manager.modify_shift(shift_name, old_sid, random.choice(candidates), shift_date))
+
+
+def run_workers(manager, workers, seconds, operation):
+    """
+    以多個執行緒在指定時間內重複執行操作，記錄每次的耗時與結果
+
+    Args:
+        manager: ShiftManager 實例(所有執行緒共用)
+        workers: 執行緒數
+        seconds: 執行秒數
+        operation: 無參數的操作函式，回傳 (操作名稱, 結果)
+
+    Returns:
+        dict: 完成次數、失敗次數、實際耗時與每次操作的紀錄 [(操作名稱, 結果, 秒數)]
+    """
+    records = [[] for _ in range(workers)]
+    deadline = time.perf_counter() + seconds
+
+    def worker(i):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                name, outcome = operation()
+            except Exception:
+                name, outcome = '例外', '錯誤'
+            records[i].append((name, outcome, time.perf_counter() - started))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    records = [record for worker_records in records for record in worker_records]
+    failed = sum(1 for _, outcome, _ in records if outcome == '錯誤')
+    return {'完成': len(records) - failed, '失敗': failed, '秒數': elapsed, '紀錄': records}
+
+
+def summarize(records):
+    """
+    依操作統計次數、延遲百分位數與各種結果的次數
+
+    Args:
+        records: run_workers 的紀錄
+
+    Returns:
+        dict: {操作名稱: {'次數', 'p50', 'p99', 結果: 次數}}，'全部' 為所有操作合計；
+              延遲百分位數不含結果為錯誤的操作
+    """
+    groups = {'全部': records}
+    for record in records:
+        groups.setdefault(record[0], []).append(record)
+
+    summary = {}
+    for name, group in groups.items():
+        latencies = np.array([seconds for _, outcome, seconds in group if outcome != '錯誤']) * 1000
+        stats = {'次數': len(group), 'p50': np.percentile(latencies, 50) if len(latencies) else 0,
+                 'p99': np.percentile(latencies, 99) if len(latencies) else 0}
+        for outcome in OUTCOMES:
+            stats[outcome] = sum(1 for _, result, _ in group if result == outcome)
+        summary[name] = stats
+    return summary
+
+
+def print_summary(workers, result):
+    """顯示一輪負載測試的結果"""
+    summary = summarize(result['紀錄'])
+    total = summary['全部']
+    # 吞吐量只計算沒有發生錯誤的操作
+    print(f"\n=== {workers} 個執行緒，{result['秒數']:.1f} 秒，每秒 {result['完成'] / result['秒數']:.1f} 次 ===")
+    print(f"{'操作':<8} {'次數':>6} {'p50(ms)':>9} {'p99(ms)':>9} " +
+          " ".join(f"{outcome:>6}" for outcome in OUTCOMES))
+    for name, stats in summary.items():
+        print(f"{name:<8} {stats['次數']:>6} {stats['p50']:>9.1f} {stats['p99']:>9.1f} " +
+              " ".join(f"{stats[outcome]:>6}" for outcome in OUTCOMES))
+    writes = sum(summary[name]['次數'] for name in ('指派班別', '修改班別') if name in summary)
+    if writes:
+        conflicts = sum(summary[name]['衝突'] for name in ('指派班別', '修改班別') if name in summary)
+        print(f"寫入 {writes} 次，衝突率 {conflicts / writes:.1%}，死結率 {total['死結'] / writes:.1%}，"
+              f"鎖等待逾時率 {total['鎖等待逾時'] / writes:.1%}")
+
+
+def main():
+    """依序以不同執行緒數執行負載測試並比較吞吐量與延遲"""
+    parser = argparse.ArgumentParser(description="多執行緒負載測試")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16], help="執行緒(值班台)數")
+    parser.add_argument('--seconds', type=float, default=10, help="每輪執行秒數")
+    parser.add_argument('--days', type=int, default=30, help="隨機操作今天起幾天內的日期")
+    parser.add_argument('--mix', choices=['read', 'dispatch'], default='read',
+                        help="read 只查詢；dispatch 模擬值班台的查詢、指派與修改")
+    parser.add_argument('--database', help="使用的資料庫，寫入(--mix dispatch、--seed)時必須是另建的測試資料庫")
+    parser.add_argument('--seed', type=int, default=0, metavar='N', help="先建立N位合成人員與排班")
+    parser.add_argument('--cleanup', action='store_true', help="結束後刪除合成人員與其排班")
+    args = parser.parse_args()
+
+    manager = ShiftManager()
+    # 寫入會指派、修改正式班表，只允許在與設定檔不同的資料庫執行
+    writes = args.mix == 'dispatch' or args.seed or args.cleanup
+    if writes and args.database in (None, manager.db.db_config['database']):
+        parser.error(f"--mix dispatch、--seed 與 --cleanup 會寫入資料庫，"
+                     f"請以 --database 指定 {manager.db.db_config['database']} 以外的測試資料庫")
+    if args.database:
+        manager.db.db_config['database'] = args.database
+    manager.db.pool_size = max(args.workers)
+    manager.connect()
+
+    today = datetime.now().date()
+    dates = [today + timedelta(days=i) for i in range(args.days)]
+
+    try:
+        if args.seed:
+            employees, shifts = seed_synthetic(manager, args.seed, dates)
+            print(f"已建立 {employees} 位合成人員、{shifts} 筆排班")
+
+        if args.mix == 'dispatch':
+            employees = load_synthetic(manager)
+            if not employees:
+                print("沒有合成人員，請先以 --seed 建立")
+                return
+            operation = lambda: dispatch_operation(manager, dates, employees)
+        else:
+            operation = lambda: read_operation(manager, dates)
+
+        for workers in args.workers:
+            # 指派與修改會輸出處理過程，測試期間不顯示
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                result = run_workers(manager, workers, args.seconds, operation)
+            print_summary(workers, result)
+    finally:
+        if args.cleanup:
+            employees, shifts = remove_synthetic(manager)
+            print(f"已刪除 {employees} 位合成人員、{shifts} 筆排班")
+        manager.disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,68 @@
 from datetime import datetime
+import pandas as pd
 from shift_manager import ShiftManager
 from utils import get_shifts_config, format_date
+from simulator import parse_segments, export_comparison
+from calendar_exceptions import EXCEPTION_TYPES
+from leave import LEAVE_TYPES
+from changes import describe_change
+from standby import GROUPING_MODES
+
+
+# 使用快照檔時可用的查詢功能
+OFFLINE_CHOICES = {'3', '4', '5', '6', '10', '0'}
+
+
+# 表格超過這個筆數時分頁顯示
+PAGE_SIZE = 50
+
+
+def configure_display():
+    """設定 pandas 顯示選項，程式啟動時設定一次"""
+    pd.set_option('display.max_rows', None)
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.width', None)
+    pd.set_option('display.max_colwidth', None)
+
+
+def print_frame(df, page_size=PAGE_SIZE, index=True):
+    """
+    顯示DataFrame，超過一頁時每頁之間等待使用者按Enter
+
+    Args:
+        df: 要顯示的DataFrame
+        page_size: 每頁筆數
+        index: 是否顯示索引
+    """
+    if len(df) <= page_size:
+        print(df.to_string(index=index))
+        return
+
+    for start in range(0, len(df), page_size):
+        end = min(start + page_size, len(df))
+        print(df.iloc[start:end].to_string(index=index))
+        if end < len(df):
+            answer = input(f"-- 第{start + 1}-{end}筆，共{len(df)}筆，按Enter繼續，輸入q結束 --")
+            if answer.strip().lower() == 'q':
+                break
+
+
+def show_changes(manager, changes, limit=20):
+    """顯示其他席位的異動，只有排序更新的班表異動不顯示"""
+    others = [
+        change for change in changes
+        if change['client_id'] != manager.db.client_id
+        and not (change['entity'] == 'Shift' and change['action'] == 'update'
+                 and change['S_ID'] == change['old_S_ID'])
+    ]
+    if not others:
+        return
+
+    print(f"\n=== 其他席位的異動 ({len(others)}筆) ===")
+    for change in others[:limit]:
+        print(f"{change['changed_at']:%H:%M:%S} {describe_change(change)}")
+    if len(others) > limit:
+        print(f"... 另有 {len(others) - limit} 筆")
 
 
 def main_menu():
@@ -14,8 +76,33 @@ def main_menu():
     print("6. 產生空表")
     print("7. 修改班別")
     print("8. 管理隊伍人員")  # 新增選項
-    print("9. 退出")
-    return input("請選擇功能 (1-9): ")
+    print("9. 匯入人員資料")
+    print("10. 報表與分析")
+    print("11. 特殊日期管理")
+    print("12. 請假管理")
+    print("13. 調班")
+    print("14. 複製前一週期班表")
+    print("0. 退出")
+    return input("請選擇功能 (0-14): ")
+
+def choose_candidate(manager, shift_name, shift_date):
+    """顯示替補人選並讓使用者選擇，回傳選定的警員編號"""
+    success, candidates = manager.find_replacement_candidates(shift_name, shift_date)
+    if not success:
+        print(f"錯誤：{candidates}")
+    elif not candidates:
+        print("查無可替補的人員")
+    else:
+        print(f"\n=== {shift_name} 建議人選 ===")
+        for i, c in enumerate(candidates, 1):
+            print(f"{i}. {c['name']}({c['S_ID']}, {c['team']}隊, {c['shift']}) "
+                  f"日排序: {c['day_order']} 檔排序: {c['team_order']} 近期勤務: {c['recent_shifts']}次")
+
+    choice = input("請輸入編號選擇人選，或直接輸入警員編號: ").strip()
+    if success and choice.isdigit() and 1 <= int(choice) <= len(candidates):
+        return candidates[int(choice) - 1]['S_ID']
+    return choice
+
 
 def handle_assign_shift(manager, shift_date, shift_name, rank):
     """處理單個班別的指派"""
@@ -25,7 +112,7 @@ def handle_assign_shift(manager, shift_date, shift_name, rank):
         print(f"\n警告：{shift_name} 目前已由 {current_emp['name']}({current_emp['team']}隊) 擔任")
         modify = input("是否要修改此班別? (y/n): ")
         if modify.lower() == 'y':
-            new_sid = input(f"請輸入新的警員編號 (限{rank}): ")
+            new_sid = choose_candidate(manager, shift_name, shift_date)
             if new_sid:
                 success, message = manager.modify_shift(
                     shift_name,
@@ -62,7 +149,7 @@ def assign_shifts(manager, shift_date):
     print("\n當前班表:")
     current_shifts = manager.view_daily_shifts(shift_date)
     if current_shifts is not None:
-        print(current_shifts)
+        print_frame(current_shifts)
 
     print("\n開始安排班別...")
     shifts = get_shifts_config()
@@ -74,7 +161,7 @@ def assign_shifts(manager, shift_date):
     print("\n=== 更新後的班表 ===")
     updated_shifts = manager.view_daily_shifts(shift_date)
     if updated_shifts is not None:
-        print(updated_shifts)
+        print_frame(updated_shifts)
 
 
 def handle_view_shifts(manager):
@@ -85,7 +172,7 @@ def handle_view_shifts(manager):
         df = manager.view_daily_shifts(shift_date)
         if df is not None:
             print("\n=== 當日班表 ===")
-            print(df)
+            print_frame(df)
         else:
             print("查無資料")
     except ValueError:
@@ -132,7 +219,11 @@ def handle_generate_standby_groups(manager):
     date_str = input("請輸入要產生空表的日期 (YYYY-MM-DD): ")
     try:
         check_date = format_date(date_str)
-        success, groups = manager.generate_all_standby_groups(check_date)
+        modes = list(GROUPING_MODES)
+        print("分組方式：" + "、".join(f"{i}. {GROUPING_MODES[mode]}" for i, mode in enumerate(modes, 1)))
+        mode_choice = input(f"請選擇分組方式 (按Enter使用{GROUPING_MODES[manager.standby_mode]}): ").strip()
+        mode = modes[int(mode_choice) - 1] if mode_choice in [str(i) for i in range(1, len(modes) + 1)] else None
+        success, groups = manager.generate_all_standby_groups(check_date, mode)
         if success:
             filename = manager.export_to_word(groups, check_date)
             if filename:
@@ -155,7 +246,7 @@ def handle_modify_shift(manager):
         print("\n當前班表:")
         df = manager.view_daily_shifts(shift_date)
         if df is not None:
-            print(df)
+            print_frame(df)
         else:
             print("查無資料")
             return
@@ -169,7 +260,10 @@ def handle_modify_shift(manager):
             return
 
         print(f"\n當前擔任 {shift_name} 的是：{current_emp['name']}({current_emp['team']}隊)")
-        new_sid = input("請輸入新的警員編號: ")
+        new_sid = choose_candidate(manager, shift_name, shift_date)
+        if not new_sid:
+            print("未進行任何更改")
+            return
 
         success, message = manager.modify_shift(
             shift_name,
@@ -183,7 +277,7 @@ def handle_modify_shift(manager):
         print("\n=== 更新後的班表 ===")
         updated_df = manager.view_daily_shifts(shift_date)
         if updated_df is not None:
-            print(updated_df)
+            print_frame(updated_df)
 
     except ValueError:
         print("日期格式錯誤，請使用YYYY-MM-DD格式")
@@ -206,7 +300,7 @@ def handle_team_management(manager):
             success, result = manager.view_team_member_order(team_id)
             if success:
                 print(f"\n=== 第{team_id}隊人員順序 ===")
-                print(result)
+                print_frame(result)
             else:
                 print(f"錯誤：{result}")
 
@@ -219,7 +313,7 @@ def handle_team_management(manager):
                 continue
 
             print("\n當前隊伍人員順序:")
-            print(result)
+            print_frame(result)
 
             print("\n請選擇調整方式：")
             print("1. 交換兩人順序")
@@ -240,7 +334,7 @@ def handle_team_management(manager):
                     success, updated_result = manager.view_team_member_order(team_id)
                     if success:
                         print("\n更新後的順序:")
-                        print(updated_result)
+                        print_frame(updated_result)
 
             elif adjust_choice == '2':
                 # 重新排序
@@ -284,7 +378,7 @@ def handle_team_management(manager):
                         success, updated_result = manager.view_team_member_order(team_id)
                         if success:
                             print("\n更新後的順序:")
-                            print(updated_result)
+                            print_frame(updated_result)
                 else:
                     print("未進行任何更改")
 
@@ -324,7 +418,7 @@ def handle_team_management(manager):
                 continue
 
             print("\n當前隊伍成員:")
-            print(result)
+            print_frame(result)
 
             print("\n請依序為每位成員指定新的假檔")
             print("可用的假檔：1=123檔期, 2=456檔期, 3=789檔期")
@@ -352,6 +446,385 @@ def handle_team_management(manager):
             print("無效的選擇，請重新輸入")
 
 
+def handle_import_roster(manager):
+    """處理批次匯入人員資料功能"""
+    employee_path = input("請輸入人員資料檔路徑 (CSV/Excel，按Enter跳過): ").strip()
+    shift_path = input("請輸入歷史班表檔路徑 (CSV/Excel，按Enter跳過): ").strip()
+    dry_run = input("是否只驗證不寫入? (y/n): ").lower() == 'y'
+
+    success, result = manager.import_roster(employee_path or None, shift_path or None, dry_run)
+    if not success:
+        print(f"錯誤：{result}")
+        return
+
+    print("\n=== 匯入結果 ===")
+    print(f"人員匯入: {result['人員匯入']} 筆")
+    print(f"班表匯入: {result['班表匯入']} 筆")
+    print(f"拒絕筆數: {result['拒絕筆數']} 筆")
+    if result['錯誤報告']:
+        print(f"錯誤報告已輸出至：{result['錯誤報告']}")
+
+
+def handle_simulate_rotation(manager):
+    """處理輪休週期模擬功能"""
+    current = manager.rotation
+    print(f"\n目前週期: 起始日 {current.start_date}，區段 "
+          f"{','.join(str(seg['days']) for seg in current.segments)}，偏移 {current.offsets}")
+
+    try:
+        start_date = format_date(input("請輸入模擬起始日期 (YYYY-MM-DD): "))
+        segments = input("請輸入替代週期區段 (上班/休假交替，例如 7,4,8,2): ")
+        offsets = {}
+        for shift_type, offset in current.offsets.items():
+            value = input(f"請輸入{shift_type}的偏移天數 (按Enter保持 {offset}): ").strip()
+            offsets[shift_type] = int(value) if value else offset
+
+        alternative = {
+            'name': '替代方案',
+            'start_date': current.start_date,
+            'offsets': offsets,
+            'segments': parse_segments(segments),
+            'weekday_overrides': current.weekday_overrides
+        }
+    except ValueError as err:
+        print(f"輸入錯誤: {err}")
+        return
+
+    success, result = manager.simulate_rotations(
+        [{'cycle': current}, {'cycle': alternative}], start_date
+    )
+    if not success:
+        print(f"錯誤：{result}")
+        return
+
+    comparison, results = result
+    print("\n=== 模擬比較 ===")
+    print(comparison)
+
+    if input("是否輸出Excel報表? (y/n): ").lower() == 'y':
+        filename = export_comparison(comparison, results, f"輪休模擬_{start_date.strftime('%Y%m%d')}.xlsx")
+        print(f"已成功生成檔案：{filename}")
+
+
+def handle_forecast_staffing(manager):
+    """處理人力預測功能"""
+    try:
+        start_date = format_date(input("請輸入起始日期 (YYYY-MM-DD): "))
+        end_date = format_date(input("請輸入結束日期 (YYYY-MM-DD): "))
+        groups = input("每日至少需要幾組備勤 (按Enter為1): ").strip()
+        min_standby_groups = int(groups) if groups else 1
+    except ValueError:
+        print("輸入格式錯誤")
+        return
+
+    success, result = manager.forecast_staffing(start_date, end_date, min_standby_groups)
+    if not success:
+        print(f"錯誤：{result}")
+        return
+
+    summary = result['summary']
+    understaffed = summary[summary['人力不足']]
+    print(f"\n=== {start_date} 至 {end_date} 人力預測 ===")
+    print(summary)
+    if understaffed.empty:
+        print("\n期間內沒有人力不足的日期")
+    else:
+        print(f"\n共 {len(understaffed)} 天人力不足:")
+        print(understaffed)
+
+
+def handle_audit_shifts(manager):
+    """處理排班規則檢查功能"""
+    try:
+        start_date = format_date(input("請輸入起始日期 (YYYY-MM-DD): "))
+        end_date = format_date(input("請輸入結束日期 (YYYY-MM-DD): "))
+    except ValueError:
+        print("輸入格式錯誤")
+        return
+
+    success, result = manager.audit_shifts(start_date, end_date)
+    if not success:
+        print(f"錯誤：{result}")
+        return
+
+    if result.empty:
+        print(f"\n{start_date} 至 {end_date} 的排班沒有違反規則")
+        return
+
+    print(f"\n=== {start_date} 至 {end_date} 共 {len(result)} 筆違規 ===")
+    print_frame(result[['shift_date', 'shift_name', 'S_ID', 'rule', 'message']], index=False)
+
+
+def handle_roster_matrix(manager):
+    """處理月班表矩陣功能"""
+    try:
+        year = int(input("請輸入年份: "))
+        month = int(input("請輸入月份: "))
+        if not 1 <= month <= 12:
+            raise ValueError
+    except ValueError:
+        print("輸入格式錯誤")
+        return
+
+    print("1. Excel (.xlsx)")
+    print("2. Word (.docx)")
+    file_format = 'docx' if input("請選擇輸出格式 (1-2): ") == '2' else 'xlsx'
+
+    filename = manager.export_roster_matrix(year, month, file_format)
+    if filename:
+        print(f"已成功生成檔案：{filename}")
+    else:
+        print("檔案生成失敗")
+
+
+def handle_export_month(manager):
+    """處理整月人員列表輸出功能"""
+    try:
+        year = int(input("請輸入年份: "))
+        month = int(input("請輸入月份: "))
+        if not 1 <= month <= 12:
+            raise ValueError
+    except ValueError:
+        print("輸入格式錯誤")
+        return
+
+    filename = manager.export_month_to_word(year, month)
+    if filename:
+        print(f"已成功生成檔案：{filename}")
+    else:
+        print("檔案生成失敗")
+
+
+def handle_reports(manager):
+    """處理報表與分析功能"""
+    while True:
+        print("\n=== 報表與分析 ===")
+        print("1. 輪休週期模擬比較")
+        print("2. 人力預測與不足檢查")
+        print("3. 月班表(人員x日期)")
+        print("4. 整月人員列表(Word)")
+        print("5. 排班規則檢查")
+        print("6. 返回主選單")
+
+        choice = input("請選擇功能 (1-6): ")
+
+        if choice == '1':
+            handle_simulate_rotation(manager)
+
+        elif choice == '2':
+            handle_forecast_staffing(manager)
+
+        elif choice == '3':
+            handle_roster_matrix(manager)
+
+        elif choice == '4':
+            handle_export_month(manager)
+
+        elif choice == '5':
+            handle_audit_shifts(manager)
+
+        elif choice == '6':
+            break
+
+        else:
+            print("無效的選擇，請重新輸入")
+
+
+def handle_calendar_exceptions(manager):
+    """處理特殊日期管理功能"""
+    while True:
+        print("\n=== 特殊日期管理 ===")
+        print("1. 查看特殊日期")
+        print("2. 新增/修改特殊日期")
+        print("3. 刪除特殊日期")
+        print("4. 返回主選單")
+
+        choice = input("請選擇功能 (1-4): ")
+
+        try:
+            if choice == '1':
+                start_date = format_date(input("請輸入起始日期 (YYYY-MM-DD): "))
+                end_date = format_date(input("請輸入結束日期 (YYYY-MM-DD): "))
+                exceptions = manager.calendar.between(start_date, end_date)
+                if not exceptions:
+                    print("期間內沒有特殊日期")
+                for entry in exceptions:
+                    working = '依輪休' if entry['working_shifts'] is None else \
+                        (', '.join(sorted(entry['working_shifts'])) or '全部休假')
+                    group_size = entry['standby_group_size'] or 9
+                    print(f"{entry['date']} {entry['type']} {entry['description']} "
+                          f"(上班假檔: {working}, 備勤每組: {group_size}人)")
+
+            elif choice == '2':
+                exception_date = format_date(input("請輸入日期 (YYYY-MM-DD): "))
+                for i, exception_type in enumerate(EXCEPTION_TYPES, 1):
+                    print(f"{i}. {exception_type}")
+                type_choice = input(f"請選擇類型 (1-{len(EXCEPTION_TYPES)}): ")
+                if not type_choice.isdigit() or not 1 <= int(type_choice) <= len(EXCEPTION_TYPES):
+                    print("無效的選擇")
+                    continue
+                description = input("請輸入說明 (可留空): ").strip() or None
+
+                print(f"可用的假檔：{', '.join(manager.rotation.shift_types)}")
+                working_text = input("請輸入當日上班的假檔，以逗號分隔 (按Enter依輪休，輸入 - 代表全部休假): ").strip()
+                if not working_text:
+                    working_shifts = None
+                elif working_text == '-':
+                    working_shifts = []
+                else:
+                    working_shifts = [shift.strip() for shift in working_text.split(',') if shift.strip()]
+
+                group_text = input("請輸入備勤每組警務員人數 (按Enter為9人): ").strip()
+                standby_group_size = int(group_text) if group_text else None
+
+                success, message = manager.add_calendar_exception(
+                    exception_date, EXCEPTION_TYPES[int(type_choice) - 1], description,
+                    working_shifts, standby_group_size
+                )
+                print(message)
+
+            elif choice == '3':
+                exception_date = format_date(input("請輸入要刪除的日期 (YYYY-MM-DD): "))
+                success, message = manager.remove_calendar_exception(exception_date)
+                print(message)
+
+            elif choice == '4':
+                break
+
+            else:
+                print("無效的選擇，請重新輸入")
+
+        except ValueError:
+            print("輸入格式錯誤")
+
+
+def handle_leave_management(manager):
+    """處理請假管理功能"""
+    while True:
+        print("\n=== 請假管理 ===")
+        print("1. 查看請假紀錄")
+        print("2. 登記請假")
+        print("3. 刪除請假紀錄")
+        print("4. 返回主選單")
+
+        choice = input("請選擇功能 (1-4): ")
+
+        try:
+            if choice == '1':
+                start_date = format_date(input("請輸入起始日期 (YYYY-MM-DD): "))
+                end_date = format_date(input("請輸入結束日期 (YYYY-MM-DD): "))
+                s_id = input("請輸入警員編號 (按Enter查看全部): ").strip() or None
+                records = manager.leaves.records_between(start_date, end_date, s_id)
+                if not records:
+                    print("期間內沒有請假紀錄")
+                for record in records:
+                    print(f"[{record['id']}] {record['S_ID']} {record['leave_type']} "
+                          f"{record['start_date']} 至 {record['end_date']} {record['note']}")
+
+            elif choice == '2':
+                s_id = input("請輸入警員編號: ").strip()
+                for i, leave_type in enumerate(LEAVE_TYPES, 1):
+                    print(f"{i}. {leave_type}")
+                type_choice = input(f"請選擇假別 (1-{len(LEAVE_TYPES)}): ")
+                if not type_choice.isdigit() or not 1 <= int(type_choice) <= len(LEAVE_TYPES):
+                    print("無效的選擇")
+                    continue
+                start_date = format_date(input("請輸入起始日期 (YYYY-MM-DD): "))
+                end_date = format_date(input("請輸入結束日期 (YYYY-MM-DD): "))
+                note = input("請輸入備註 (可留空): ").strip() or None
+
+                success, message = manager.add_leave(
+                    s_id, LEAVE_TYPES[int(type_choice) - 1], start_date, end_date, note
+                )
+                print(message)
+
+            elif choice == '3':
+                leave_id = int(input("請輸入請假紀錄編號: "))
+                success, message = manager.remove_leave(leave_id)
+                print(message)
+
+            elif choice == '4':
+                break
+
+            else:
+                print("無效的選擇，請重新輸入")
+
+        except ValueError:
+            print("輸入格式錯誤")
+
+
+def handle_swap_shift(manager):
+    """處理調班功能"""
+    date_str = input("請輸入要調班的日期 (YYYY-MM-DD): ")
+    try:
+        shift_date = format_date(date_str)
+    except ValueError:
+        print("日期格式錯誤，請使用YYYY-MM-DD格式")
+        return
+
+    shift_name = input("請輸入要調班的班別: ")
+    success, options = manager.find_swaps(shift_name, shift_date)
+    if not success:
+        print(f"錯誤：{options}")
+        return
+    if not options:
+        print("查無可交換的班別")
+        return
+
+    print(f"\n=== {shift_date} {shift_name} 可交換的班別 ===")
+    for i, option in enumerate(options, 1):
+        print(f"{i}. {option['shift_date']} {option['shift_name']} "
+              f"{option['name']}({option['S_ID']}, {option['team']}隊)")
+
+    choice = input("請輸入編號選擇要交換的班別 (按Enter取消): ").strip()
+    if not choice.isdigit() or not 1 <= int(choice) <= len(options):
+        print("未進行任何更改")
+        return
+
+    option = options[int(choice) - 1]
+    success, message = manager.apply_swap(shift_name, shift_date, option['shift_name'], option['shift_date'])
+    print(message)
+
+
+def handle_clone_shifts(manager):
+    """處理複製前一週期班表功能"""
+    try:
+        source_start = format_date(input("請輸入來源起始日期 (YYYY-MM-DD): "))
+        source_end = format_date(input("請輸入來源結束日期 (YYYY-MM-DD): "))
+        target_text = input(f"請輸入目標起始日期 (YYYY-MM-DD，按Enter為{manager.rotation.cycle_length}天週期後): ").strip()
+        target_start = format_date(target_text) if target_text else None
+    except ValueError:
+        print("輸入格式錯誤")
+        return
+
+    success, result = manager.clone_shifts(source_start, source_end, target_start, dry_run=True)
+    if not success:
+        print(result)
+        return
+
+    accepted, skipped = result['accepted'], result['skipped']
+    if not skipped.empty:
+        count = len(skipped.drop_duplicates(['shift_date', 'shift_name']))
+        print(f"\n=== 以下 {count} 筆不複製 ===")
+        print_frame(skipped[['shift_date', 'shift_name', 'S_ID', 'rule', 'message']], index=False)
+    if accepted.empty:
+        print("沒有可複製的排班")
+        return
+
+    first, last = accepted['shift_date'].min(), accepted['shift_date'].max()
+    confirm = input(f"確定要複製 {len(accepted)} 筆排班至 {first} 至 {last} 嗎？(y/n): ")
+    if confirm.lower() != 'y':
+        print("未進行任何更改")
+        return
+
+    success, result = manager.clone_shifts(source_start, source_end, target_start)
+    if not success:
+        print(result)
+        return
+    skipped = result['skipped'].drop_duplicates(['shift_date', 'shift_name'])
+    print(f"成功：已複製 {result['inserted']} 筆排班，略過 {len(skipped)} 筆")
+
+
 def handle_order_adjustment(manager, team_id):
     """處理順序調整功能"""
     try:
@@ -362,7 +835,7 @@ def handle_order_adjustment(manager, team_id):
             return
 
         print("\n當前隊伍人員順序:")
-        print(result)
+        print_frame(result)
 
         print("\n請依序為每位成員指定新的順序（1 開始）")
         order_changes = {}
@@ -404,7 +877,7 @@ def handle_order_adjustment(manager, team_id):
                 success, updated_result = manager.view_team_member_order(team_id)
                 if success:
                     print("\n更新後的順序:")
-                    print(updated_result)
+                    print_frame(updated_result)
         else:
             print("未進行任何更改")
 
@@ -413,6 +886,7 @@ def handle_order_adjustment(manager, team_id):
 
 def main():
     """主程式入口"""
+    configure_display()
     manager = ShiftManager()
 
     try:
@@ -421,8 +895,13 @@ def main():
 
         while True:
             try:
+                show_changes(manager, manager.poll_changes())
                 choice = main_menu()
 
+                if manager.offline and choice not in OFFLINE_CHOICES:
+                    print("資料庫無法連線，目前僅提供查看班表、輪休檔次、隊伍排序、產生空表與報表功能")
+                    continue
+
                 if choice == '1':
                     shift_date = datetime.now().date()
                     assign_shifts(manager, shift_date)
@@ -455,6 +934,24 @@ def main():
                     handle_team_management(manager)
 
                 elif choice == '9':
+                    handle_import_roster(manager)
+
+                elif choice == '10':
+                    handle_reports(manager)
+
+                elif choice == '11':
+                    handle_calendar_exceptions(manager)
+
+                elif choice == '12':
+                    handle_leave_management(manager)
+
+                elif choice == '13':
+                    handle_swap_shift(manager)
+
+                elif choice == '14':
+                    handle_clone_shifts(manager)
+
+                elif choice == '0':
 
                     print("感謝使用，再見！")
                     break
@@ -462,6 +959,8 @@ def main():
                 else:
                     print("無效的選擇，請重新輸入")
 
+                manager.refresh_snapshot()
+
             except Exception as e:
                 print(f"操作過程中發生錯誤: {str(e)}")
                 print("請重試或聯繫系統管理員")
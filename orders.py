@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from utils import get_team_order
+
+
+ORDER_BATCH_SIZE = 500
+
+
+def expected_orders(shifts, rotation, calendar=None):
+    """
+    依目前的隊別、假檔計算排班應有的檔排序與日排序
+
+    Args:
+        shifts: 排班DataFrame，需包含 shift_date, team, current_shift
+        rotation: RotationPattern
+        calendar: ExceptionCalendar(可選)
+
+    Returns:
+        tuple: (檔排序陣列, 日排序陣列)
+    """
+    if shifts.empty:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    day_index = pd.DatetimeIndex(pd.to_datetime(shifts['shift_date']))
+    days = day_index.unique().sort_values()
+
+    # 日排序：先查整段期間的日排序表，特殊日期再逐日覆寫
+    shift_types = rotation.shift_types
+    orders = rotation.day_order_matrix(days, shift_types).copy()
+    if calendar is not None:
+        for col, day in enumerate(days.date):
+            if calendar.get(day) is None:
+                continue
+            applied = calendar.apply_day_orders(day, dict(zip(shift_types, orders[:, col])))
+            orders[:, col] = [applied[shift] for shift in shift_types]
+
+    type_index = shifts['current_shift'].map({shift: i for i, shift in enumerate(shift_types)})
+    known = type_index.notna().to_numpy()
+    day_orders = np.zeros(len(shifts), dtype=int)
+    day_orders[known] = orders[type_index[known].astype(int).to_numpy(), days.get_indexer(day_index[known])]
+
+    # 檔排序：只依隊別與月份決定，每個組合算一次
+    keys = pd.MultiIndex.from_arrays([shifts['team'].astype(str).to_numpy(), day_index.month])
+    pairs = keys.unique()
+    team_order_of = pd.Series([get_team_order(team, month) for team, month in pairs], index=pairs)
+    team_orders = team_order_of.reindex(keys).to_numpy(dtype=int)
+
+    return team_orders, day_orders
+
+
+def find_stale_orders(shifts, rotation, calendar=None):
+    """
+    找出排序與目前人員資料不一致的排班
+
+    Args:
+        shifts: 排班DataFrame，需包含 shift_date, shift_name, S_ID, team_order, day_order, team, current_shift
+        rotation: RotationPattern
+        calendar: ExceptionCalendar(可選)
+
+    Returns:
+        DataFrame: 需要更新的排班，team_order 與 day_order 為重新計算後的值
+    """
+    team_orders, day_orders = expected_orders(shifts, rotation, calendar)
+    stale = (shifts['team_order'].fillna(0).to_numpy(dtype=int) != team_orders) | \
+            (shifts['day_order'].fillna(0).to_numpy(dtype=int) != day_orders)
+    return pd.DataFrame({
+        'shift_date': shifts['shift_date'].to_numpy()[stale],
+        'shift_name': shifts['shift_name'].to_numpy()[stale],
+        'S_ID': shifts['S_ID'].to_numpy()[stale],
+        'team_order': team_orders[stale],
+        'day_order': day_orders[stale]
+    })
+
+
+def update_orders(cursor, changes, batch_size=ORDER_BATCH_SIZE):
+    """
+    以每批一個 UPDATE ... JOIN 寫回重新計算的排序
+
+    以日期、班別與警員編號比對，計算後已改由其他人擔任的班別不會被更新。
+
+    Args:
+        cursor: 資料庫游標
+        changes: find_stale_orders 的結果
+        batch_size: 每批筆數
+
+    Returns:
+        int: 更新筆數
+    """
+    rows = list(changes[['shift_date', 'shift_name', 'S_ID', 'team_order', 'day_order']]
+                .itertuples(index=False, name=None))
+    updated = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        values = " UNION ALL ".join(
+            ["SELECT %s AS shift_date, %s AS shift_name, %s AS S_ID, %s AS team_order, %s AS day_order"] +
+            ["SELECT %s, %s, %s, %s, %s"] * (len(batch) - 1)
+        )
+        query = f"""
+        UPDATE Shift s
+        JOIN ({values}) AS v
+            ON s.shift_date = v.shift_date AND s.shift_name = v.shift_name AND s.S_ID = v.S_ID
+        SET s.team_order = v.team_order, s.day_order = v.day_order
+        """
+        cursor.execute(query, tuple(
+            value for shift_date, shift_name, s_id, team_order, day_order in batch
+            for value in (shift_date, shift_name, s_id, int(team_order), int(day_order))
+        ))
+        updated += cursor.rowcount
+    return updated
@@ -0,0 +1,57 @@
+class RosterIndex:
+    """人員資料的記憶體索引，依警員編號與職級查詢"""
+
+    def __init__(self, rows):
+        """
+        建立索引
+
+        Args:
+            rows: (S_ID, name, team, job_rank, current_shift) 的序列
+        """
+        self.members = {}
+        self.by_rank = {}
+        for s_id, name, team, rank, shift_type in rows:
+            self.members[s_id] = {
+                'S_ID': s_id,
+                'name': name,
+                'team': team,
+                'rank': rank,
+                'shift': shift_type
+            }
+            self.by_rank.setdefault(rank, []).append(s_id)
+
+        # 同職級內依隊伍、編號排序，讓查詢結果順序固定
+        for s_ids in self.by_rank.values():
+            s_ids.sort(key=lambda s_id: (_team_key(self.members[s_id]['team']), s_id))
+
+    def get(self, s_id):
+        """
+        查詢單一警員
+
+        Args:
+            s_id: 警員編號
+
+        Returns:
+            dict: 警員資訊，不存在則為 None
+        """
+        return self.members.get(s_id)
+
+    def with_rank(self, rank):
+        """
+        取得指定職級的所有警員
+
+        Args:
+            rank: 職級
+
+        Returns:
+            list: 警員資訊列表
+        """
+        return [self.members[s_id] for s_id in self.by_rank.get(rank, [])]
+
+    def __len__(self):
+        return len(self.members)
+
+
+def _team_key(team):
+    """隊伍編號依數字排序"""
+    return int(team) if str(team).isdigit() else float('inf')
@@ -0,0 +1,144 @@
+import calendar
+from datetime import date
+import numpy as np
+import pandas as pd
+from docx import Document
+from docx.enum.section import WD_ORIENT
+from docx.shared import Pt, Cm
+
+
+REST_MARK = '休'
+WEEKDAY_NAMES = ['一', '二', '三', '四', '五', '六', '日']
+RANK_ORDER = {'副大隊長': 0, '隊長': 1, '警務員': 2}
+INFO_COLUMNS = ['S_ID', '姓名', '隊別', '職級', '假檔']
+
+
+def month_range(year, month):
+    """
+    取得月份的第一天與最後一天
+
+    Args:
+        year: 年
+        month: 月
+
+    Returns:
+        tuple: (第一天, 最後一天)
+    """
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def build_roster_matrix(roster, shifts, rotation, dates, exceptions=None, leaves=None):
+    """
+    建立人員x日期的班表矩陣
+
+    Args:
+        roster: 人員DataFrame，需包含 S_ID, name, team, job_rank, current_shift
+        shifts: 期間內排班DataFrame，需包含 shift_date, shift_name, S_ID
+        rotation: RotationPattern
+        dates: DatetimeIndex
+        exceptions: ExceptionCalendar(可選)
+        leaves: LeaveIndex(可選)
+
+    Returns:
+        DataFrame: 每列一位人員，日期欄位內為班別、假別或休假標記，上班未排班為空白
+    """
+    roster = roster.assign(
+        _team=pd.to_numeric(roster['team'], errors='coerce'),
+        _rank=roster['job_rank'].map(RANK_ORDER)
+    ).sort_values(['_team', '_rank', 'current_shift', 'S_ID']).reset_index(drop=True)
+
+    # 先算各假檔的上班矩陣，再依人員的假檔展開
+    shift_types = rotation.shift_types
+    working = rotation.working_matrix(dates)
+    if exceptions is not None:
+        working = exceptions.apply_to_matrix(working, dates, shift_types)
+
+    type_index = roster['current_shift'].map({shift: i for i, shift in enumerate(shift_types)})
+    known = type_index.notna().to_numpy()
+    officer_working = np.zeros((len(roster), len(dates)), dtype=bool)
+    officer_working[known] = working[type_index[known].astype(int).to_numpy()]
+    cells = np.where(officer_working, '', REST_MARK).astype(object)
+
+    row_of = pd.Series(roster.index, index=roster['S_ID'])
+    col_of = pd.Series(np.arange(len(dates)), index=dates.date)
+
+    if leaves is not None and len(dates):
+        for record in leaves.records_between(dates[0].date(), dates[-1].date()):
+            row = row_of.get(record['S_ID'])
+            if row is None:
+                continue
+            a = col_of[max(record['start_date'], dates[0].date())]
+            b = col_of[min(record['end_date'], dates[-1].date())] + 1
+            cells[row, a:b] = record['leave_type']
+
+    # 排班以索引一次寫入矩陣
+    if not shifts.empty:
+        rows = shifts['S_ID'].map(row_of)
+        cols = shifts['shift_date'].map(col_of)
+        valid = (rows.notna() & cols.notna()).to_numpy()
+        cells[rows[valid].astype(int).to_numpy(), cols[valid].astype(int).to_numpy()] = \
+            shifts['shift_name'].to_numpy()[valid]
+
+    date_columns = [f"{d.day}({WEEKDAY_NAMES[d.weekday()]})" for d in dates]
+    matrix = pd.DataFrame(cells, columns=date_columns)
+    info = roster[['S_ID', 'name', 'team', 'job_rank', 'current_shift']]
+    info.columns = INFO_COLUMNS
+    return pd.concat([info, matrix], axis=1)
+
+
+def export_matrix_to_excel(matrix, title, filename):
+    """
+    將班表矩陣輸出為Excel
+
+    Args:
+        matrix: build_roster_matrix 的結果
+        title: 工作表名稱
+        filename: 輸出檔名
+
+    Returns:
+        str: 輸出檔名
+    """
+    with pd.ExcelWriter(filename) as writer:
+        matrix.to_excel(writer, sheet_name=title[:31], index=False)
+        sheet = writer.sheets[title[:31]]
+        sheet.freeze_panes = sheet.cell(row=2, column=len(INFO_COLUMNS) + 1)
+    return filename
+
+
+def export_matrix_to_word(matrix, title, filename):
+    """
+    將班表矩陣輸出為橫向Word文件
+
+    Args:
+        matrix: build_roster_matrix 的結果
+        title: 文件標題
+        filename: 輸出檔名
+
+    Returns:
+        str: 輸出檔名
+    """
+    doc = Document()
+    section = doc.sections[0]
+    section.orientation = WD_ORIENT.LANDSCAPE
+    section.page_width, section.page_height = section.page_height, section.page_width
+    for side in ('left_margin', 'right_margin', 'top_margin', 'bottom_margin'):
+        setattr(section, side, Cm(1))
+
+    doc.styles['Normal'].font.size = Pt(6)
+    doc.add_heading(title, 1)
+
+    # 列印時省略編號與假檔欄位
+    columns = ['姓名', '隊別'] + list(matrix.columns[len(INFO_COLUMNS):])
+    values = matrix[columns].astype(str).to_numpy()
+
+    table = doc.add_table(rows=len(values) + 1, cols=len(columns))
+    table.style = 'Table Grid'
+    for cell, text in zip(table.rows[0].cells, columns):
+        cell.text = text
+    for row, row_values in zip(table.rows[1:], values):
+        for cell, text in zip(row.cells, row_values):
+            if text:
+                cell.text = text
+
+    doc.save(filename)
+    return filename
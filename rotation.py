@@ -0,0 +1,213 @@
+import json
+import os
+from math import gcd
+import numpy as np
+import pandas as pd
+from utils import format_date
+
+
+# 預設的輪休週期定義檔
+DEFAULT_PATTERN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rotation_patterns', 'default.json')
+
+
+class RotationPattern:
+    """
+    輪休週期定義，建立時即展開為查表陣列
+
+    週期長度與一週7天的最小公倍數內，每個假檔每一天是否上班、日排序皆預先計算，
+    之後任何日期的查詢都只需一次取餘數與一次索引。
+    """
+
+    def __init__(self, definition):
+        """
+        編譯輪休週期定義
+
+        Args:
+            definition: dict，格式同 rotation_patterns/default.json
+        """
+        self.name = definition.get('name', '')
+        self.start_date = format_date(definition['start_date'])
+        self.offsets = {shift: int(offset) for shift, offset in definition['offsets'].items()}
+        self.shift_types = list(self.offsets)
+        self.segments = [self._normalize_segment(seg) for seg in definition['segments']]
+        self.weekday_overrides = {
+            int(weekday): bool(working)
+            for weekday, working in definition.get('weekday_overrides', {}).items()
+        }
+
+        # 週期內每個位置的上班狀態與日排序
+        cycle_working = []
+        cycle_orders = []
+        for segment in self.segments:
+            cycle_working.extend([segment['working']] * segment['days'])
+            cycle_orders.extend(segment['day_orders'])
+        self.cycle_length = len(cycle_working)
+        if self.cycle_length == 0:
+            raise ValueError("週期長度必須大於0")
+
+        # 展開為週期與星期的共同週期，星期覆寫也一併編入
+        self.period = self.cycle_length * 7 // gcd(self.cycle_length, 7)
+        positions = np.arange(self.period)
+        weekdays = (self.start_date.weekday() + positions) % 7
+        cycle_working = np.array(cycle_working, dtype=bool)
+        cycle_orders = np.array(cycle_orders, dtype=np.int16)
+
+        override_mask = np.isin(weekdays, list(self.weekday_overrides))
+        override_value = np.array([self.weekday_overrides.get(day, False) for day in weekdays], dtype=bool)
+
+        cycle_index = (positions[None, :] - np.array([self.offsets[s] for s in self.shift_types])[:, None]) \
+            % self.cycle_length
+        self.working_table = np.where(override_mask[None, :], override_value[None, :], cycle_working[cycle_index])
+        self.day_order_table = np.where(self.working_table, cycle_orders[cycle_index], 0).astype(np.int16)
+
+        # 單日查詢使用Python list避免numpy純量的額外開銷
+        self._shift_index = {shift: i for i, shift in enumerate(self.shift_types)}
+        self._working_rows = self.working_table.tolist()
+        self._order_rows = self.day_order_table.tolist()
+
+    @staticmethod
+    def _normalize_segment(segment):
+        """將 (天數, 是否上班) 或 dict 形式的區段統一為 dict"""
+        if not isinstance(segment, dict):
+            days, working = segment
+            segment = {'days': days, 'working': working}
+
+        days = int(segment['days'])
+        working = bool(segment['working'])
+        if days <= 0:
+            raise ValueError("區段天數必須為正整數")
+
+        if not working:
+            day_orders = [0] * days
+        else:
+            day_orders = list(segment.get('day_orders') or [1] * days)
+            if len(day_orders) != days:
+                raise ValueError("日排序數量必須與區段天數相同")
+        return {'days': days, 'working': working, 'day_orders': day_orders}
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        從JSON檔載入輪休週期定義
+
+        Args:
+            path: JSON檔路徑
+
+        Returns:
+            RotationPattern: 編譯後的輪休週期
+        """
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        載入指定檔案的輪休週期，未指定時使用 DEFAULT_PATTERN_PATH
+
+        Args:
+            path: JSON檔路徑(可選)
+
+        Returns:
+            RotationPattern: 編譯後的輪休週期
+        """
+        return cls.from_file(path or DEFAULT_PATTERN_PATH)
+
+    def index_of(self, date):
+        """取得日期在查表陣列中的位置"""
+        return (format_date(date) - self.start_date).days % self.period
+
+    def is_working(self, date, shift_type):
+        """
+        查詢假檔在指定日期是否上班
+
+        Args:
+            date: 查詢日期
+            shift_type: 假檔
+
+        Returns:
+            bool: 是否上班
+        """
+        return self._working_rows[self._shift_index[shift_type]][self.index_of(date)]
+
+    def day_order(self, date, shift_type):
+        """
+        查詢假檔在指定日期的日排序
+
+        Args:
+            date: 查詢日期
+            shift_type: 假檔
+
+        Returns:
+            int: 日排序，休假為0
+        """
+        return self._order_rows[self._shift_index[shift_type]][self.index_of(date)]
+
+    def day_orders(self, date):
+        """
+        查詢指定日期所有假檔的日排序
+
+        Args:
+            date: 查詢日期
+
+        Returns:
+            dict: 假檔對應的日排序，休假為0
+        """
+        i = self.index_of(date)
+        return {shift: self._order_rows[k][i] for k, shift in enumerate(self.shift_types)}
+
+    def positions(self, dates):
+        """
+        計算多個日期在查表陣列中的位置
+
+        Args:
+            dates: DatetimeIndex 或日期序列
+
+        Returns:
+            ndarray: 位置陣列
+        """
+        dates = pd.DatetimeIndex(dates)
+        start = pd.Timestamp(self.start_date)
+        return np.asarray((dates - start).days) % self.period
+
+    def working_matrix(self, dates, shift_types=None):
+        """
+        批次查詢多個假檔在多個日期是否上班
+
+        Args:
+            dates: DatetimeIndex 或日期序列
+            shift_types: 假檔列表(可選，預設為全部)
+
+        Returns:
+            ndarray: 形狀為 (假檔數, 天數) 的布林陣列
+        """
+        rows = [self._shift_index[s] for s in (shift_types or self.shift_types)]
+        return self.working_table[np.ix_(rows, self.positions(dates))]
+
+    def day_order_matrix(self, dates, shift_types=None):
+        """
+        批次查詢多個假檔在多個日期的日排序
+
+        Args:
+            dates: DatetimeIndex 或日期序列
+            shift_types: 假檔列表(可選，預設為全部)
+
+        Returns:
+            ndarray: 形狀為 (假檔數, 天數) 的日排序陣列
+        """
+        rows = [self._shift_index[s] for s in (shift_types or self.shift_types)]
+        return self.day_order_table[np.ix_(rows, self.positions(dates))]
+
+    def lookup(self, shift_types, dates):
+        """
+        逐筆查詢 (假檔, 日期) 的上班狀態與日排序
+
+        Args:
+            shift_types: 假檔序列
+            dates: 與假檔等長的日期序列
+
+        Returns:
+            tuple: (上班狀態陣列, 日排序陣列)
+        """
+        rows = pd.Series(shift_types).map(self._shift_index).to_numpy()
+        cols = self.positions(dates)
+        return self.working_table[rows, cols], self.day_order_table[rows, cols]
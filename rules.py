@@ -0,0 +1,259 @@
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from utils import format_date, get_rank_restrictions
+
+
+NIGHT_DUTY_SHIFT = '夜值日官'
+NIGHT_DUTY_REST_DAYS = 1
+VIOLATION_COLUMNS = ['shift_date', 'shift_name', 'S_ID', 'name', 'rule', 'message']
+
+
+def _unknown_officer(frame):
+    """排班人員不在人員資料中"""
+    return ~frame['known']
+
+
+def _rank_mismatch(frame):
+    """職級不符合班別要求"""
+    return frame['known'] & frame['required_rank'].notna() & (frame['job_rank'] != frame['required_rank'])
+
+
+def _unknown_shift_type(frame):
+    """假檔不在輪休週期內，無法判斷是否上班"""
+    return frame['known'] & ~frame['known_type']
+
+
+def _rest_day(frame):
+    """依輪休週期與特殊日期當天應該休假"""
+    return frame['known_type'] & ~frame['working']
+
+
+def _on_leave(frame):
+    """當天請假"""
+    return frame['leave_type'].notna()
+
+
+def _multiple_posts(frame):
+    """同一人同一天有多個班別"""
+    return frame.duplicated(['scenario', '_day', 'S_ID'], keep=False)
+
+
+def _duplicate_post(frame):
+    """同一天同一班別排了多人"""
+    return frame.duplicated(['scenario', '_day', 'shift_name'], keep=False)
+
+
+def _after_night_duty(frame):
+    """夜值日官後 NIGHT_DUTY_REST_DAYS 天內又排班"""
+    nights = frame.loc[frame['shift_name'] == NIGHT_DUTY_SHIFT, ['scenario', 'S_ID', '_day']]
+    keys = pd.MultiIndex.from_arrays([frame['scenario'], frame['S_ID'], frame['_day']])
+    mask = np.zeros(len(frame), dtype=bool)
+    for days in range(1, NIGHT_DUTY_REST_DAYS + 1):
+        blocked = pd.MultiIndex.from_arrays([nights['scenario'], nights['S_ID'],
+                                             nights['_day'] + pd.Timedelta(days=days)])
+        mask |= keys.isin(blocked)
+    return mask
+
+
+# 排班規則：依序檢查，每條規則回傳違規的資料列，訊息以資料列欄位填入
+# 新增規則只需寫一個回傳布林遮罩的函式並加入此列表；比對多筆資料列的規則只比對同一 scenario 內的資料列
+# 只看資料列本身的規則標記 row，可一次篩選多筆互不相干的假設排班
+RULES = [
+    {'name': '人員', 'check': _unknown_officer, 'message': '找不到警員編號 {S_ID}', 'row': True},
+    {'name': '職級', 'check': _rank_mismatch, 'message': '{shift_name}只能由{required_rank}擔任', 'row': True},
+    {'name': '假檔', 'check': _unknown_shift_type, 'message': '{name}的假檔{current_shift}不在輪休週期內',
+     'row': True},
+    {'name': '輪休', 'check': _rest_day, 'message': '根據輪班表，{name}在{shift_date}應該休假', 'row': True},
+    {'name': '請假', 'check': _on_leave, 'message': '{name}在{shift_date}{leave_type}', 'row': True},
+    {'name': '一日一班', 'check': _multiple_posts, 'message': '{name}在{shift_date}已被安排其他班別'},
+    {'name': '一班一人', 'check': _duplicate_post, 'message': '{shift_date}的{shift_name}重複安排'},
+    {'name': '夜值日官休息', 'check': _after_night_duty,
+     'message': f'{{name}}前一天擔任{NIGHT_DUTY_SHIFT}，{{shift_date}}不能安排{{shift_name}}'},
+]
+
+
+class RuleValidator:
+    """
+    排班規則檢查
+
+    先將整批排班一次補上職級、上班狀態與請假資訊，
+    再對每條規則做一次向量化判斷，單筆異動與整年稽核都走同一套規則。
+    """
+
+    def __init__(self, roster, rotation, calendar=None, leaves=None, rules=None):
+        """
+        初始化規則檢查
+
+        Args:
+            roster: 人員DataFrame，需包含 S_ID, name, team, job_rank, current_shift
+            rotation: RotationPattern
+            calendar: ExceptionCalendar(可選)
+            leaves: LeaveIndex(可選)
+            rules: 規則列表(可選，預設為 RULES)
+        """
+        self.roster = roster[['S_ID', 'name', 'job_rank', 'current_shift']]
+        self.rotation = rotation
+        self.calendar = calendar
+        self.leaves = leaves
+        self.rules = rules if rules is not None else RULES
+        self.rank_restrictions = get_rank_restrictions()
+
+    def prepare(self, assignments):
+        """
+        補上規則需要的欄位
+
+        Args:
+            assignments: 排班DataFrame，需包含 shift_date, shift_name, S_ID，可另有 scenario
+
+        Returns:
+            DataFrame: 補上欄位後的排班，沒有 scenario 時全部為 0
+        """
+        columns = ['shift_date', 'shift_name', 'S_ID']
+        frame = assignments[columns + (['scenario'] if 'scenario' in assignments else [])].reset_index(drop=True)
+        if 'scenario' not in frame:
+            frame['scenario'] = 0
+        frame = frame.merge(self.roster, on='S_ID', how='left', indicator='_merge')
+        frame['known'] = (frame['_merge'] == 'both').to_numpy()
+        frame['name'] = frame['name'].fillna(frame['S_ID'])
+        frame['_day'] = pd.to_datetime(frame['shift_date'])
+        frame['required_rank'] = frame['shift_name'].map(self.rank_restrictions)
+
+        # 上班狀態：先對期間內的日期算出各假檔的上班矩陣，再依假檔與日期查表
+        shift_types = self.rotation.shift_types
+        type_index = frame['current_shift'].map({shift: i for i, shift in enumerate(shift_types)})
+        frame['known_type'] = type_index.notna().to_numpy()
+        frame['working'] = False
+        if len(frame):
+            days = pd.DatetimeIndex(frame['_day'].unique()).sort_values()
+            working = self.rotation.working_matrix(days, shift_types)
+            if self.calendar is not None:
+                working = self.calendar.apply_to_matrix(working, days, shift_types)
+            known = frame['known_type'].to_numpy()
+            rows = type_index[known].astype(int).to_numpy()
+            cols = days.get_indexer(frame.loc[known, '_day'])
+            frame.loc[known, 'working'] = working[rows, cols]
+        frame['working'] = frame['working'].astype(bool)
+
+        frame['leave_type'] = self._leave_types(frame)
+        return frame.drop(columns='_merge')
+
+    def _leave_types(self, frame):
+        """依請假區間查出每筆排班當天的假別，未請假為 None"""
+        if self.leaves is None:
+            return pd.Series([None] * len(frame), index=frame.index, dtype=object)
+        return self.leaves.leave_types(frame['S_ID'], frame['_day']).set_axis(frame.index)
+
+    def validate(self, assignments, row_only=False):
+        """
+        檢查整批排班，列出所有違規
+
+        排班有 scenario 欄位時，每個 scenario 視為一組獨立的假設排班，可一次檢查多種異動。
+
+        Args:
+            assignments: 排班DataFrame，需包含 shift_date, shift_name, S_ID，可另有 scenario
+            row_only: 只檢查標記 row 的規則，各資料列視為互不相干的假設排班
+
+        Returns:
+            DataFrame: 違規清單，欄位為 shift_date, shift_name, S_ID, name, rule, message，
+                       排班有 scenario 時另有 scenario 欄位
+        """
+        columns = VIOLATION_COLUMNS + (['scenario'] if 'scenario' in assignments else [])
+        frame = self.prepare(assignments)
+        found = []
+        for rule in self.rules:
+            if row_only and not rule.get('row'):
+                continue
+            mask = np.asarray(rule['check'](frame), dtype=bool)
+            if not mask.any():
+                continue
+            violating = frame[mask]
+            found.append(pd.DataFrame({
+                'shift_date': violating['shift_date'].to_numpy(),
+                'shift_name': violating['shift_name'].to_numpy(),
+                'S_ID': violating['S_ID'].to_numpy(),
+                'name': violating['name'].to_numpy(),
+                'rule': rule['name'],
+                'message': [rule['message'].format(**row) for row in violating.to_dict('records')],
+                'scenario': violating['scenario'].to_numpy()
+            }, columns=columns))
+
+        if not found:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(found, ignore_index=True)
+
+    def check_change(self, existing, shift_name, s_id, shift_date):
+        """
+        檢查將某日的班別改由指定警員擔任是否違規
+
+        Args:
+            existing: 異動日期前後的現有排班DataFrame
+            shift_name: 班別名稱
+            s_id: 警員編號
+            shift_date: 日期
+
+        Returns:
+            list: 違規訊息，沒有違規為空列表
+        """
+        return self.check_candidates(existing, shift_name, shift_date, [s_id])[s_id]
+
+    def check_candidates(self, existing, shift_name, shift_date, s_ids):
+        """
+        一次檢查多位警員各自擔任某日班別是否違規
+
+        所有候選人同時放進該班別一起檢查：候選人彼此不同，
+        除了同一班別多人之外不會互相影響，結果與逐一檢查相同。
+
+        Args:
+            existing: 異動日期前後的現有排班DataFrame
+            shift_name: 班別名稱
+            shift_date: 日期
+            s_ids: 候選警員編號
+
+        Returns:
+            dict: {警員編號: 違規訊息列表}，沒有違規為空列表
+        """
+        shift_date = format_date(shift_date)
+        s_ids = list(dict.fromkeys(s_ids))
+        existing = existing[['shift_date', 'shift_name', 'S_ID']]
+        # 原本擔任該班別的人員被取代
+        kept = existing[~((existing['shift_date'] == shift_date) & (existing['shift_name'] == shift_name))]
+        changes = pd.DataFrame({'shift_date': [shift_date] * len(s_ids), 'shift_name': shift_name, 'S_ID': s_ids},
+                               columns=['shift_date', 'shift_name', 'S_ID'])
+        violations = self.validate(pd.concat([kept, changes], ignore_index=True))
+
+        mine = violations[violations['S_ID'].isin(s_ids)]
+        relevant = (mine['shift_date'] == shift_date) & (mine['shift_name'] == shift_name) & \
+                   (mine['rule'] != '一班一人')
+        if shift_name == NIGHT_DUTY_SHIFT:
+            # 新排的夜值日官會讓之後幾天已排的班別違規
+            relevant |= (mine['rule'] == '夜值日官休息') & (mine['shift_date'] > shift_date) & \
+                        (mine['shift_date'] <= shift_date + timedelta(days=NIGHT_DUTY_REST_DAYS))
+
+        messages = {s_id: [] for s_id in s_ids}
+        for s_id, message in zip(mine.loc[relevant, 'S_ID'], mine.loc[relevant, 'message']):
+            messages[s_id].append(message)
+        return messages
+
+    def new_violations(self, before, after):
+        """
+        列出異動後才出現的違規
+
+        Args:
+            before: 異動前的排班DataFrame
+            after: 異動後的排班DataFrame
+
+        Returns:
+            DataFrame: 異動前沒有的違規，欄位同 validate
+        """
+        keys = ['shift_date', 'shift_name', 'S_ID', 'rule']
+        existing = self.validate(before)
+        violations = self.validate(after)
+        new = ~pd.MultiIndex.from_frame(violations[keys]).isin(pd.MultiIndex.from_frame(existing[keys]))
+        return violations[new].reset_index(drop=True)
+
+
+def change_window(shift_date):
+    """單筆異動需要一併讀取的排班期間"""
+    shift_date = format_date(shift_date)
+    return shift_date - timedelta(days=NIGHT_DUTY_REST_DAYS), shift_date + timedelta(days=NIGHT_DUTY_REST_DAYS)
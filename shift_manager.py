@@ -1,9 +1,53 @@
+import os
+import threading
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from docx import Document
-from docx.shared import Inches
+from datetime import date, datetime, timedelta
 from database import DatabaseConnection
-from utils import get_team_order, format_date, get_rank_restrictions
+from importer import RosterImporter
+from simulator import RotationSimulator
+from forecast import StaffingForecast
+from rotation import RotationPattern
+from calendar_exceptions import ExceptionCalendar, EXCEPTION_TYPES
+from leave import LeaveIndex, LEAVE_TYPES
+from roster_index import RosterIndex
+from candidates import CandidateSearch
+from swap import SwapFinder, window
+from standby import (collect_standby_members, group_standby, apply_delta, standby_entry,
+                     DEFAULT_GROUP_SIZE, DEFAULT_GROUPING_MODE)
+from word_export import render_document
+from rules import RuleValidator, change_window, NIGHT_DUTY_REST_DAYS
+from orders import find_stale_orders, update_orders
+from duty_lookup import duty_status
+from cloning import plan_clone, insert_clones, clone_offset
+from team_members import TeamMemberStore
+from archive import ShiftArchive, add_partitions, list_partitions, DEFAULT_ARCHIVE_PATH
+from changes import ChangeFeed
+from standby_store import StandbyStore, MAX_APPLIED_CHANGES
+from snapshot import Snapshot, write_snapshot, DEFAULT_SNAPSHOT_PATH
+from roster_matrix import (build_roster_matrix, month_range, export_matrix_to_excel,
+                           export_matrix_to_word)
+from utils import (get_team_order, format_date, get_valid_teams,
+                   get_valid_ranks, get_valid_shift_types, get_shift_display_order)
+
+
+DAILY_SHIFT_COLUMNS = ['shift_name', 'S_ID', 'name', 'job_rank', 'team_order', 'day_order', 'current_shift']
+
+
+def categorical(values, categories):
+    """
+    轉為類別欄位，重複的字串只存一份代碼
+
+    Args:
+        values: 欄位值
+        categories: 已知類別，依此順序排序
+
+    Returns:
+        Categorical: 類別欄位，不在已知類別中的值依字串順序排在最後
+    """
+    known = list(categories)
+    extra = sorted({value for value in values if value is not None} - set(known))
+    return pd.Categorical(values, categories=known + extra, ordered=True)
 
 
 class ShiftManager:
@@ -12,21 +56,225 @@ class ShiftManager:
     def __init__(self):
         """初始化排班管理器"""
         self.db = DatabaseConnection()
-        self.shift_start_date = datetime(2024, 1, 6).date()
-        self.shift_patterns = {
-            '123檔期': 0,
-            '456檔期': 14,
-            '789檔期': 7
-        }
+        # 輪休週期可由 rotation_pattern 環境變數指定JSON檔，未指定時使用預設週期
+        self.rotation = RotationPattern.load(os.getenv("rotation_pattern"))
+        self.shift_start_date = self.rotation.start_date
+        self.shift_patterns = dict(self.rotation.offsets)
+        self.calendar = ExceptionCalendar()
+        self.leaves = LeaveIndex()
+        self._forecast = None
+        self._roster_index = None
+        self._validator = None
+        # 依人員資料建立的快取由多個執行緒共用，以版本號避免存入異動前建立的結果
+        self._cache_lock = threading.Lock()
+        self._roster_version = 0
+        # 其他席位的異動，人員、請假與特殊日期異動時更新記憶體中的資料
+        self.changes = ChangeFeed()
+        # 預先產生的備勤分組，分組方式見 standby.GROUPING_MODES
+        self.standby_store = StandbyStore()
+        self.standby_mode = os.getenv("standby_mode") or DEFAULT_GROUPING_MODE
+        # 隊內人員順序
+        self.team_members = TeamMemberStore()
+        self.changes.subscribe(self._apply_changes, ['Employee_Shift', 'Leave_Record', 'Calendar_Exception'])
+        # 資料庫無法連線時改用快照檔，僅提供查詢功能
+        self.snapshot = None
+        self.snapshot_path = os.getenv("snapshot_path") or DEFAULT_SNAPSHOT_PATH
+        self.snapshot_interval = timedelta(minutes=int(os.getenv("snapshot_interval") or 60))
+        self._snapshot_due = None
+        # 已結束年度的排班封存檔，查詢歷史排班時自動讀取
+        self.archive = ShiftArchive(os.getenv("archive_path") or DEFAULT_ARCHIVE_PATH)
+
+    @property
+    def offline(self):
+        """是否正在使用快照檔(唯讀)"""
+        return self.snapshot is not None
 
     def connect(self):
-        """連接資料庫"""
-        self.db.connect()
+        """連接資料庫，無法連線時改用快照檔"""
+        try:
+            self.db.connect()
+        except Exception:
+            if not os.path.exists(self.snapshot_path):
+                raise
+            self.open_snapshot()
+            return
+
+        try:
+            self.calendar.load(self.db.get_cursor())
+        except Exception as err:
+            print(f"載入特殊日期失敗: {err}")
+        try:
+            self.leaves.load(self.db.get_cursor())
+        except Exception as err:
+            print(f"載入請假紀錄失敗: {err}")
+        try:
+            self.changes.seek_latest(self.db.get_cursor())
+            self.changes.prune(self.db.get_cursor())
+            self.db.get_connection().commit()
+        except Exception as err:
+            self.db.get_connection().rollback()
+            print(f"啟用異動通知失敗: {err}")
+        try:
+            # 新增或換隊的人員排在隊伍最後
+            self.team_members.sync(self.db.get_cursor())
+            self.db.get_connection().commit()
+        except Exception as err:
+            self.db.get_connection().rollback()
+            print(f"更新隊內人員順序失敗: {err}")
+        self.refresh_snapshot()
 
     def disconnect(self):
         """關閉資料庫連接"""
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+            return
+        self.changes.stop()
         self.db.disconnect()
 
+    def poll_changes(self):
+        """
+        讀取其他席位提交的新異動，並更新記憶體中的資料
+
+        Returns:
+            list: 新異動，見 ChangeFeed.fetch
+        """
+        if self.offline:
+            return []
+        try:
+            with self.session():
+                # 結束目前的讀取交易，才看得到其他席位之後提交的資料
+                self.db.get_connection().rollback()
+                return self.changes.poll(self.db.get_cursor())
+        except Exception as err:
+            print(f"讀取異動失敗: {err}")
+            return []
+
+    def _apply_changes(self, changes):
+        """
+        依異動更新記憶體中的人員、請假與特殊日期資料，只重新讀取有異動的資料列
+
+        Args:
+            changes: 異動列表
+        """
+        if any(change['entity'] == 'Employee_Shift' for change in changes):
+            self._invalidate_roster()
+
+        leave_ids = sorted({c['ref_id'] for c in changes if c['entity'] == 'Leave_Record'})
+        if leave_ids:
+            self.db.get_cursor().execute(f"""
+            SELECT id, S_ID, leave_type, start_date, end_date, note
+            FROM Leave_Record
+            WHERE id IN ({', '.join(['%s'] * len(leave_ids))})
+            """, tuple(leave_ids))
+            rows = {row[0]: row for row in self.db.get_cursor().fetchall()}
+            for leave_id in leave_ids:
+                self.leaves.remove(leave_id)
+                if leave_id in rows:
+                    self.leaves.add(*rows[leave_id])
+
+        dates = sorted({c['ref_date'] for c in changes if c['entity'] == 'Calendar_Exception'})
+        if dates:
+            self.db.get_cursor().execute(f"""
+            SELECT exception_date, exception_type, description, working_shifts, standby_group_size
+            FROM Calendar_Exception
+            WHERE exception_date IN ({', '.join(['%s'] * len(dates))})
+            """, tuple(dates))
+            rows = {row[0]: row for row in self.db.get_cursor().fetchall()}
+            for exception_date in dates:
+                if exception_date not in rows:
+                    self.calendar.remove(exception_date)
+                    continue
+                _, exception_type, description, working_text, group_size = rows[exception_date]
+                working_shifts = None if working_text is None else [
+                    shift for shift in working_text.split(',') if shift
+                ]
+                self.calendar.put(exception_date, exception_type, description, working_shifts, group_size)
+
+    def open_snapshot(self):
+        """
+        開啟快照檔並以快照內容取代資料庫查詢
+
+        Returns:
+            Snapshot: 開啟的快照
+        """
+        self.snapshot = Snapshot(self.snapshot_path)
+        self.calendar.load_rows(self.snapshot.calendar_rows())
+        self.leaves.load_rows(self.snapshot.leave_rows())
+        self._invalidate_roster()
+        print(f"資料庫無法連線，改用 {self.snapshot.created_at:%Y-%m-%d %H:%M} 的快照資料(僅供查詢)")
+        print(f"快照排班期間: {self.snapshot.window_start} ~ {self.snapshot.window_end}")
+        return self.snapshot
+
+    def refresh_snapshot(self, force=False):
+        """
+        到了更新時間就重新寫入快照檔，未到時間直接返回
+
+        Args:
+            force: 是否忽略更新間隔立即寫入
+
+        Returns:
+            dict: 快照摘要，未更新則為 None
+        """
+        if self.offline:
+            return None
+        now = datetime.now()
+        if not force and self._snapshot_due is not None and now < self._snapshot_due:
+            return None
+
+        try:
+            summary = write_snapshot(self.db.get_cursor(), self.snapshot_path, archive=self.archive)
+            self._snapshot_due = now + self.snapshot_interval
+            return summary
+        except Exception as err:
+            # 快照失敗不影響正常操作，下次再試
+            self._snapshot_due = now + self.snapshot_interval
+            print(f"寫入快照失敗: {err}")
+            return None
+
+    def session(self):
+        """
+        取得請求範圍的連線與交易，多執行緒使用時每個請求應包在 session 內
+
+        Returns:
+            contextmanager: 見 DatabaseConnection.session
+        """
+        return self.db.session()
+
+    def _invalidate_roster(self):
+        """人員資料異動後清除依賴人員資料的快取"""
+        with self._cache_lock:
+            self._roster_version += 1
+            self._forecast = None
+            self._roster_index = None
+            self._validator = None
+
+    def _cached(self, attr, build):
+        """
+        取得依人員資料建立的快取，不存在時建立
+
+        建立時不持有鎖，避免查詢資料庫時阻擋其他執行緒；
+        建立期間若人員資料有異動，結果只回傳不存入快取。
+
+        Args:
+            attr: 快取屬性名稱
+            build: 建立快取的函式
+
+        Returns:
+            快取內容
+        """
+        with self._cache_lock:
+            value = getattr(self, attr)
+            version = self._roster_version
+        if value is not None:
+            return value
+
+        value = build()
+        with self._cache_lock:
+            if self._roster_version == version:
+                setattr(self, attr, value)
+        return value
+
     def view_daily_shifts(self, specific_date):
         """
         查看某日的所有班表
@@ -35,67 +283,40 @@ class ShiftManager:
             specific_date: 指定日期
 
         Returns:
-            DataFrame: 包含該日所有班別資訊的DataFrame
+            DataFrame: 包含該日所有班別資訊的DataFrame，班別、職級與假檔為類別欄位
         """
         query = """
-        SELECT 
-            CASE shift_name
-                WHEN 'A班' THEN '01_A班'
-                WHEN 'B班' THEN '02_B班'
-                WHEN 'C班' THEN '03_C班'
-                WHEN 'D班' THEN '04_D班'
-                WHEN 'E班' THEN '05_E班'
-                WHEN '上值日' THEN '06_上值日'
-                WHEN '下值日' THEN '07_下值日'
-                WHEN '日值日官' THEN '08_日值日官'
-                WHEN '夜值日官' THEN '09_夜值日官'
-                WHEN '值班副大隊長' THEN '10_值班副大隊長'
-                WHEN '日勤務管理員' THEN '11_日勤務管理員'
-                WHEN '夜勤務管理員' THEN '12_夜勤務管理員'
-                WHEN '日械彈管理員' THEN '13_日械彈管理員'
-                WHEN '夜械彈管理員' THEN '14_夜械彈管理員'
-                ELSE shift_name
-            END as sort_order,
-            shift_name,
-            e.S_ID, 
-            e.name, 
-            e.job_rank,
-            s.team_order,
-            s.day_order,
-            e.current_shift
+        SELECT s.shift_name, e.S_ID, e.name, e.job_rank, s.team_order, s.day_order, e.current_shift
         FROM Shift s
         JOIN Employee_Shift e ON s.S_ID = e.S_ID
         WHERE s.shift_date = %s
-        ORDER BY sort_order, s.team_order, s.day_order
         """
         try:
-            # 使用傳統方式獲取數據
-            self.db.get_cursor().execute(query, (specific_date,))
-            rows = self.db.get_cursor().fetchall()
-
-            # 如果沒有數據，返回空的DataFrame
-            if not rows:
-                return pd.DataFrame(columns=[
-                    'shift_name', 'S_ID', 'name', 'job_rank',
-                    'team_order', 'day_order', 'current_shift'
-                ])
-
-            # 將結果轉換為DataFrame
-            df = pd.DataFrame(rows, columns=[
-                'sort_order', 'shift_name', 'S_ID', 'name', 'job_rank',
-                'team_order', 'day_order', 'current_shift'
-            ])
-
-            # 移除排序用的欄位
-            df = df.drop('sort_order', axis=1)
-
-            # 設定顯示選項
-            pd.set_option('display.max_rows', None)
-            pd.set_option('display.max_columns', None)
-            pd.set_option('display.width', None)
-            pd.set_option('display.max_colwidth', None)
-
-            return df
+            if self.offline:
+                self._require_snapshot(specific_date)
+                daily = self.snapshot.daily_shifts(specific_date)
+                columns = [daily[column].tolist() for column in DAILY_SHIFT_COLUMNS]
+            elif self.archive.is_archived(specific_date):
+                daily = self._archived_daily(specific_date)
+                columns = [daily[column].tolist() for column in DAILY_SHIFT_COLUMNS]
+            else:
+                self.db.get_cursor().execute(query, (specific_date,))
+                columns = list(zip(*self.db.get_cursor().fetchall())) or [()] * len(DAILY_SHIFT_COLUMNS)
+
+            shift_names, s_ids, names, ranks, team_orders, day_orders, shift_types = columns
+            df = pd.DataFrame({
+                'shift_name': categorical(shift_names, get_shift_display_order()),
+                'S_ID': s_ids,
+                'name': names,
+                'job_rank': categorical(ranks, get_valid_ranks()),
+                'team_order': np.array(team_orders, dtype=np.int16),
+                'day_order': np.array(day_orders, dtype=np.int16),
+                'current_shift': categorical(shift_types, get_valid_shift_types())
+            })
+
+            # 依班別顯示順序、檔排序、日排序排列
+            order = np.lexsort((df['day_order'], df['team_order'], df['shift_name'].cat.codes))
+            return df.take(order).reset_index(drop=True)
 
         except Exception as err:
             print(f"查詢錯誤: {err}")
@@ -116,9 +337,14 @@ class ShiftManager:
             team_order = get_team_order(team_id, check_date.month)
 
             # 獲取隊伍成員資訊
-            query = "SELECT S_ID, name, current_shift FROM Employee_Shift WHERE team = %s"
-            self.db.get_cursor().execute(query, (team_id,))
-            members = self.db.get_cursor().fetchall()
+            if self.offline:
+                roster = self.get_roster()
+                members = list(roster.loc[roster['team'] == str(team_id),
+                                          ['S_ID', 'name', 'current_shift']].itertuples(index=False, name=None))
+            else:
+                query = "SELECT S_ID, name, current_shift FROM Employee_Shift WHERE team = %s"
+                self.db.get_cursor().execute(query, (team_id,))
+                members = self.db.get_cursor().fetchall()
 
             if not members:
                 return False, "找不到該隊資料"
@@ -134,12 +360,18 @@ class ShiftManager:
                 is_rest = not self.is_working_day(check_date, shift_type)
                 shift_orders = self.get_current_shift_order(check_date)
                 day_order = shift_orders.get(shift_type, 0) if not is_rest else '休假'
+                leave = self.leaves.find(member_id, check_date)
+
+                if leave:
+                    status = leave['leave_type']
+                else:
+                    status = '休假' if is_rest else '上班'
 
                 result['人員狀態'].append({
                     '姓名': name,
                     '假檔': shift_type,
                     '日排序': day_order,
-                    '狀態': '休假' if is_rest else '上班'
+                    '狀態': status
                 })
 
             return True, result
@@ -159,20 +391,20 @@ class ShiftManager:
         """
         check_date = format_date(check_date)
 
-        # 週三特殊處理
-        if check_date.weekday() == 2:
-            return "今天是週三，所有檔次都在上班"
-
-        rest_shifts = []
-        all_shifts = ['123檔期', '456檔期', '789檔期']
+        # 週三等固定上班日不會有檔次休假
+        rest_shifts = [
+            shift for shift in self.rotation.shift_types
+            if not self.is_working_day(check_date, shift)
+        ]
 
-        for shift in all_shifts:
-            if not self.is_working_day(check_date, shift):
-                rest_shifts.append(shift)
+        day_text = f"今天是 {check_date.strftime('%Y-%m-%d')}"
+        exception = self.calendar.get(check_date)
+        if exception:
+            day_text += f"({exception['type']}{'：' + exception['description'] if exception['description'] else ''})"
 
         if rest_shifts:
-            return f"今天是 {check_date.strftime('%Y-%m-%d')}，{', '.join(rest_shifts)} 在休假"
-        return "查詢出錯，請確認日期"
+            return f"{day_text}，{', '.join(rest_shifts)} 在休假"
+        return f"{day_text}，所有檔次都在上班"
 
     def is_working_day(self, date, shift_type):
         """
@@ -186,25 +418,7 @@ class ShiftManager:
             bool: 是否為工作日
         """
         date = format_date(date)
-        self.shift_start_date = format_date(self.shift_start_date)
-
-        # 週三都要上班
-        if date.weekday() == 2:
-            return True
-
-        days_from_start = (date - self.shift_start_date).days
-        shift_offset = self.shift_patterns[shift_type]
-        adjusted_days = (days_from_start - shift_offset) % 21
-
-        # 判斷工作週期
-        if adjusted_days < 7:  # 前7天上班
-            return True
-        elif adjusted_days < 11:  # 接著休假4天
-            return False
-        elif adjusted_days < 19:  # 接著上班8天
-            return True
-        else:  # 最後休假2天
-            return False
+        return self.calendar.is_working(date, shift_type, self.rotation.is_working(date, shift_type))
 
     def get_employee_info(self, s_id):
         """
@@ -251,14 +465,19 @@ class ShiftManager:
         Returns:
             tuple: (是否已分配, 當前分配的員工資訊)
         """
-        query = """
-        SELECT s.S_ID, e.name, e.team
-        FROM Shift s
-        JOIN Employee_Shift e ON s.S_ID = e.S_ID
-        WHERE s.shift_name = %s AND s.shift_date = %s
-        """
-        self.db.get_cursor().execute(query, (shift_name, shift_date))
-        result = self.db.get_cursor().fetchone()
+        if self.archive.is_archived(shift_date):
+            daily = self._archived_daily(shift_date)
+            daily = daily[daily['shift_name'] == shift_name]
+            result = tuple(daily[['S_ID', 'name', 'team']].iloc[0]) if not daily.empty else None
+        else:
+            query = """
+            SELECT s.S_ID, e.name, e.team
+            FROM Shift s
+            JOIN Employee_Shift e ON s.S_ID = e.S_ID
+            WHERE s.shift_name = %s AND s.shift_date = %s
+            """
+            self.db.get_cursor().execute(query, (shift_name, shift_date))
+            result = self.db.get_cursor().fetchone()
 
         if result:
             return True, {
@@ -282,35 +501,18 @@ class ShiftManager:
             tuple: (是否成功, 結果訊息)
         """
         try:
-            # 驗證新警員資訊
-            new_emp_info = self.get_employee_info(new_sid)
-            if not new_emp_info:
-                return False, f"錯誤：找不到警員編號 {new_sid}"
-
-            # 檢查職級限制
-            rank_restrictions = get_rank_restrictions()
-            if shift_name in rank_restrictions and new_emp_info['rank'] != rank_restrictions[shift_name]:
-                return False, f"錯誤：{shift_name}只能由{rank_restrictions[shift_name]}擔任"
-
-            # 檢查工作日
             shift_date = format_date(shift_date)
-            if not self.is_working_day(shift_date, new_emp_info['shift']):
-                return False, "錯誤：根據輪班表，該員工在此日期應該休假"
-
-            # 檢查新警員是否已有其他班別
-            check_query = """
-            SELECT shift_name 
-            FROM Shift 
-            WHERE S_ID = %s AND shift_date = %s
-            """
-            self.db.get_cursor().execute(check_query, (new_sid, shift_date))
-            existing_shift = self.db.get_cursor().fetchone()
-            if existing_shift:
-                return False, f"錯誤：該警員在此日期已被安排 {existing_shift[0]}"
+            if self.archive.is_archived(shift_date):
+                return False, self._archived_message(shift_date.year)
+            violations = self.validate_change(shift_name, new_sid, shift_date)
+            if violations:
+                return False, "錯誤：" + "；".join(violations)
+
+            stored_standby = self._stored_standby(shift_date)
 
             # 計算新的排序
-            team = self.get_employee_team(new_sid)
-            team_order = get_team_order(team, shift_date.month)
+            new_emp_info = self.get_roster_index().get(new_sid)
+            team_order = get_team_order(new_emp_info['team'], shift_date.month)
             shift_orders = self.get_current_shift_order(shift_date)
             day_order = shift_orders.get(new_emp_info['shift'], 0)
 
@@ -322,6 +524,11 @@ class ShiftManager:
             """
             self.db.get_cursor().execute(update_query,
                                          (new_sid, team_order, day_order, shift_name, shift_date, old_sid))
+            if self.db.get_cursor().rowcount == 0 and new_sid != old_sid:
+                # 查詢後已被其他席位修改或刪除，不覆蓋對方的變更
+                self.db.get_connection().rollback()
+                return False, "錯誤：此班別已被其他人修改，請重新查詢後再試"
+            self._apply_standby_delta(shift_date, stored_standby, added=[old_sid], removed=[new_sid])
             self.db.get_connection().commit()
 
             order_info = f"(檔排序: {team_order}, 日排序: {day_order})"
@@ -339,38 +546,23 @@ class ShiftManager:
             print(f"人員ID: {s_id}")
             print(f"日期: {shift_date}")
 
+            shift_date = format_date(shift_date)
+            if self.archive.is_archived(shift_date):
+                return False, self._archived_message(shift_date.year)
+
             # 檢查該班別是否已被分配
             is_assigned, current_emp = self.check_shift_assigned(shift_name, shift_date)
             if is_assigned:
                 print(f"警告：此班別目前已由 {current_emp['name']}({current_emp['team']}隊) 擔任")
                 return False, "錯誤：此班別已有人擔任，如需修改請使用修改功能"
 
-            # 檢查該警員是否已有班別
-            check_query = """
-            SELECT shift_name 
-            FROM Shift 
-            WHERE S_ID = %s AND shift_date = %s
-            """
-            self.db.get_cursor().execute(check_query, (s_id, shift_date))
-            existing_shift = self.db.get_cursor().fetchone()
-            if existing_shift:
-                return False, f"錯誤：該警員在此日期已被安排 {existing_shift[0]}"
-
-            # [其餘驗證邏輯保持不變]
-            emp_info = self.get_employee_info(s_id)
-            if not emp_info:
-                return False, f"錯誤：找不到警員編號 {s_id}"
-
-            rank_restrictions = get_rank_restrictions()
-            if shift_name in rank_restrictions and emp_info['rank'] != rank_restrictions[shift_name]:
-                return False, f"錯誤：{shift_name}只能由{rank_restrictions[shift_name]}擔任"
-
-            shift_date = format_date(shift_date)
-            if not self.is_working_day(shift_date, emp_info['shift']):
-                return False, "錯誤：根據輪班表，該員工在此日期應該休假"
+            violations = self.validate_change(shift_name, s_id, shift_date)
+            if violations:
+                return False, "錯誤：" + "；".join(violations)
 
-            team = self.get_employee_team(s_id)
-            team_order = get_team_order(team, shift_date.month)
+            stored_standby = self._stored_standby(shift_date)
+            emp_info = self.get_roster_index().get(s_id)
+            team_order = get_team_order(emp_info['team'], shift_date.month)
             shift_orders = self.get_current_shift_order(shift_date)
             day_order = shift_orders.get(emp_info['shift'], 0)
 
@@ -380,6 +572,7 @@ class ShiftManager:
             """
             self.db.get_cursor().execute(insert_query,
                                          (shift_name, s_id, shift_date, team_order, day_order))
+            self._apply_standby_delta(shift_date, stored_standby, removed=[s_id])
             self.db.get_connection().commit()
 
             order_info = f"(檔排序: {team_order}, 日排序: {day_order})"
@@ -389,6 +582,55 @@ class ShiftManager:
             self.db.get_connection().rollback()
             return False, f"錯誤：{str(err)}"
 
+    def get_validator(self):
+        """
+        取得排班規則檢查，人員資料異動前重複使用
+
+        Returns:
+            RuleValidator: 規則檢查
+        """
+        return self._cached('_validator', lambda: RuleValidator(
+            self.get_roster(), self.rotation, self.calendar, self.leaves
+        ))
+
+    def validate_change(self, shift_name, s_id, shift_date):
+        """
+        檢查由指定警員擔任某日班別是否違反排班規則
+
+        Args:
+            shift_name: 班別名稱
+            s_id: 警員編號
+            shift_date: 日期
+
+        Returns:
+            list: 違規訊息，沒有違規為空列表
+        """
+        existing = self.get_shifts_between(*change_window(shift_date))
+        return self.get_validator().check_change(existing, shift_name, s_id, shift_date)
+
+    def audit_shifts(self, start_date, end_date):
+        """
+        檢查期間內所有排班是否違反排班規則
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+
+        Returns:
+            tuple: (是否成功, 違規清單DataFrame或錯誤訊息)
+        """
+        try:
+            start_date = format_date(start_date)
+            end_date = format_date(end_date)
+            # 多讀前幾天，才能檢查期間第一天是否緊接在夜值日官之後
+            shifts = self.get_shifts_between(start_date - timedelta(days=NIGHT_DUTY_REST_DAYS), end_date)
+            violations = self.get_validator().validate(shifts)
+            violations = violations[violations['shift_date'] >= start_date]
+            return True, violations.sort_values(['shift_date', 'shift_name']).reset_index(drop=True)
+
+        except Exception as err:
+            return False, f"查詢錯誤: {str(err)}"
+
     def get_current_shift_order(self, check_date):
         """
         取得當前日期各假檔的排序
@@ -399,11 +641,8 @@ class ShiftManager:
         Returns:
             dict: 各假檔的排序
         """
-        return {
-            shift: self.get_day_order_by_shift(shift, check_date)
-            if self.is_working_day(check_date, shift) else 0
-            for shift in ['123檔期', '456檔期', '789檔期']
-        }
+        check_date = format_date(check_date)
+        return self.calendar.apply_day_orders(check_date, self.rotation.day_orders(check_date))
 
     def get_day_order_by_shift(self, shift_type, check_date):
         """
@@ -416,200 +655,233 @@ class ShiftManager:
         Returns:
             int: 排序號碼
         """
-        if not self.is_working_day(check_date, shift_type):
-            return 0
+        return self.get_current_shift_order(check_date).get(shift_type, 0)
 
-        days_from_start = (check_date - self.shift_start_date).days
-        shift_offset = self.shift_patterns[shift_type]
-        adjusted_days = (days_from_start - shift_offset) % 21
+    def duty_status(self, s_ids, dates):
+        """
+        批次查詢多位警員在多個日期的上班狀態、排序與排定班別
 
-        if adjusted_days < 7:
-            day_patterns = [1, 2, 2, 1, 2, 1, 2]
-            return day_patterns[adjusted_days]
-        elif adjusted_days < 11:
-            return 0
-        else:
-            work_day = adjusted_days - 11
-            if work_day < 8:
-                day_patterns = [1, 2, 1, 2, 1, 1, 2, 3]
-                return day_patterns[work_day]
-        return 0
+        人員資料與期間內排班各只讀取一次，上班狀態以輪休週期矩陣一次算出，
+        取代逐筆呼叫 is_working_day、get_employee_info。
+
+        Args:
+            s_ids: 警員編號序列
+            dates: 與警員編號等長的日期序列
+
+        Returns:
+            tuple: (是否成功, DataFrame或錯誤訊息)，DataFrame 欄位見 duty_lookup.DUTY_COLUMNS
+        """
+        try:
+            dates = [format_date(date) for date in dates]
+            if dates:
+                shifts = self.get_shifts_between(min(dates), max(dates))
+            else:
+                shifts = pd.DataFrame(columns=['shift_date', 'shift_name', 'S_ID', 'team_order', 'day_order'])
+            status = duty_status(s_ids, dates, self.get_roster(), shifts,
+                                 self.rotation, self.calendar, self.leaves)
+            return True, status
+        except Exception as err:
+            return False, f"查詢錯誤: {str(err)}"
 
-    def generate_all_standby_groups(self, check_date):
+    def generate_all_standby_groups(self, check_date, mode=None):
         """
         生成所有可能的備勤人員分組
 
         Args:
             check_date: 查詢日期
+            mode: 分組方式(可選，預設 self.standby_mode)
 
         Returns:
             tuple: (是否成功, 分組結果)
         """
         try:
-            shift_orders = self.get_current_shift_order(check_date)
-            current_month = check_date.month
-
-            # 取得各隊的檔排序
-            team_orders = {
-                str(team): get_team_order(str(team), current_month)
-                for team in range(1, 15) if str(team) not in ['10', '12']
-            }
+            check_date = format_date(check_date)
+            mode = mode or self.standby_mode
 
             # 取得已被安排值班的人員
-            duty_query = "SELECT S_ID FROM Shift WHERE shift_date = %s"
-            self.db.get_cursor().execute(duty_query, (check_date,))
-            duty_members = set(row[0] for row in self.db.get_cursor().fetchall())
-
-            available_officers = []
-            available_captains = []
-
-            # 處理1-9隊的警務員
-            regular_officers_query = """
-            SELECT e.S_ID, e.name, e.team, e.current_shift, e.job_rank
-            FROM Employee_Shift e
-            WHERE e.job_rank = '警務員'
-                AND e.team IN ('1','2','3','4','5','6','7','8','9')
-            ORDER BY e.team
-            """
+            if self.offline:
+                duty_members = set(self.get_shifts_between(check_date, check_date)['S_ID'])
+                return True, self.build_standby_groups(check_date, duty_members, mode)
 
-            # 處理1-9隊的隊長
-            regular_captains_query = """
-            SELECT e.S_ID, e.name, e.team, e.current_shift, e.job_rank
-            FROM Employee_Shift e
-            WHERE e.job_rank = '隊長'
-                AND e.team IN ('1','2','3','4','5','6','7','8','9')
-            ORDER BY e.team
-            """
+            # 優先使用預先產生且未過期的分組
+            stored = self.standby_store.load(self.db.get_cursor(), [check_date], mode)
+            if check_date in stored:
+                return True, stored[check_date]
+            return True, self.regenerate_standby_groups([check_date], mode)[check_date]
 
-            # 按照日排序和檔排序處理
-            for day_order in [1, 2, 3]:
-                for team_order in [1, 2, 3]:
-                    # 處理警務員
-                    self.db.get_cursor().execute(regular_officers_query)
-                    for member in self.db.get_cursor().fetchall():
-                        s_id, name, team, shift_type, rank = member
-
-                        if s_id in duty_members or \
-                                not self.is_working_day(check_date, shift_type) or \
-                                shift_orders[shift_type] != day_order or \
-                                team_orders[team] != team_order:
-                            continue
-
-                        available_officers.append({
-                            'S_ID': s_id,
-                            'name': name,
-                            'team': team,
-                            'shift_type': shift_type,
-                            'team_order': team_order,
-                            'day_order': day_order
-                        })
-
-                    # 處理隊長
-                    self.db.get_cursor().execute(regular_captains_query)
-                    for captain in self.db.get_cursor().fetchall():
-                        s_id, name, team, shift_type, rank = captain
-
-                        if s_id in duty_members or \
-                                not self.is_working_day(check_date, shift_type) or \
-                                shift_orders[shift_type] != day_order or \
-                                team_orders[team] != team_order:
-                            continue
-
-                        available_captains.append({
-                            'S_ID': s_id,
-                            'name': name,
-                            'team': team,
-                            'shift_type': shift_type,
-                            'team_order': team_order,
-                            'day_order': day_order
-                        })
-
-            # 處理11,13,14隊
-            special_query = """
-                            SELECT e.S_ID, e.name, e.team, e.current_shift, e.job_rank
-                            FROM Employee_Shift e
-                            WHERE e.team IN ('11','13','14')
-                            ORDER BY e.team
-                            """
+        except Exception as err:
+            if self.offline:
+                return False, f"錯誤：{str(err)}"
+            self.db.get_connection().rollback()
+            return False, f"資料庫錯誤: {str(err)}"
+
+    def regenerate_standby_groups(self, dates, mode=None):
+        """
+        重新計算多天的備勤分組並存入 Standby_Group 表
+
+        Args:
+            dates: 日期列表
+            mode: 分組方式(可選，預設 self.standby_mode)
+
+        Returns:
+            dict: {日期: 分組結果}
+        """
+        mode = mode or self.standby_mode
+        # 記憶體中的人員、請假與特殊日期已反映到這筆異動為止，
+        # 之後的異動都會讓這次存放的分組被視為過期
+        change_id = self.changes.last_id
+        shifts = self.get_shifts_between(min(dates), max(dates))
+        duty_by_date = shifts.groupby('shift_date')['S_ID'].apply(set).to_dict()
+
+        results = {}
+        for check_date in dates:
+            results[check_date] = self.build_standby_groups(check_date, duty_by_date.get(check_date, set()), mode)
+            self.standby_store.save(self.db.get_cursor(), check_date, results[check_date], change_id, mode=mode)
+        self.db.get_connection().commit()
+        return results
+
+    def pregenerate_standby_groups(self, start_date, days, force=False, mode=None):
+        """
+        預先產生未來數天的備勤分組，只重新計算沒有分組或分組已過期的日期
+
+        Args:
+            start_date: 起始日
+            days: 天數
+            force: 是否全部重新產生(輪休週期定義變更時使用)
+            mode: 分組方式(可選，預設 self.standby_mode)
 
-            self.db.get_cursor().execute(special_query)
-            special_members = self.db.get_cursor().fetchall()
-
-            for team_order in [1, 2, 3]:
-                for member in special_members:
-                    s_id, name, team, shift_type, rank = member
-
-                    if s_id in duty_members or \
-                            not self.is_working_day(check_date, shift_type) or \
-                            team_orders[team] != team_order:
-                        continue
-
-                    member_info = {
-                        'S_ID': s_id,
-                        'name': name,
-                        'team': team,
-                        'shift_type': shift_type,
-                        'team_order': team_order,
-                        'day_order': 0
-                    }
-
-                    if rank == '警務員':
-                        available_officers.append(member_info)
-                    elif rank == '隊長':
-                        available_captains.append(member_info)
-
-            # 進行分組
-            groups = []
-            officer_index = 0
-            group_num = 1
-            last_group_captains = available_captains[:]
-
-            # 每組9個警務員+1個隊長
-            while officer_index + 9 <= len(available_officers) and len(last_group_captains) > 0:
-                group = {
-                    'captain': last_group_captains.pop(0),
-                    'officers': available_officers[officer_index:officer_index + 9],
-                    'group_num': group_num
-                }
-                groups.append(group)
-                officer_index += 9
-                group_num += 1
-
-            # 處理剩餘人員
-            if officer_index < len(available_officers) or len(last_group_captains) > 0:
-                remaining_officers = available_officers[officer_index:]
-                group = {
-                    'captains': last_group_captains,
-                    'officers': remaining_officers,
-                    'group_num': group_num,
-                    'is_last_group': True
-                }
-                groups.append(group)
-
-            return True, groups
+        Returns:
+            tuple: (是否成功, 結果訊息)
+        """
+        try:
+            mode = mode or self.standby_mode
+            start_date = format_date(start_date)
+            dates = [start_date + timedelta(days=i) for i in range(days)]
+            stale = dates if force else self.standby_store.stale_dates(self.db.get_cursor(), dates, mode)
+            if stale:
+                self.regenerate_standby_groups(stale, mode)
+            return True, f"已重新產生 {len(stale)} 天的備勤分組，{len(dates) - len(stale)} 天沿用既有分組"
 
         except Exception as err:
-            return False, f"資料庫錯誤: {str(err)}"
+            self.db.get_connection().rollback()
+            return False, f"產生備勤分組失敗: {str(err)}"
+
+    def build_standby_groups(self, check_date, duty_members, mode=None):
+        """
+        依已值班人員計算備勤分組，不需再查詢資料庫
 
+        Args:
+            check_date: 日期
+            duty_members: 當日已值班的警員編號集合
+            mode: 分組方式(可選，預設 self.standby_mode)
 
-    def export_to_word(self, groups, check_date):
+        Returns:
+            list: 分組結果
         """
-        將人員列表輸出為Word文件
+        officers, captains = self.collect_standby_members(check_date, duty_members)
+        group_size = self.calendar.standby_group_size(check_date, DEFAULT_GROUP_SIZE)
+        return group_standby(officers, captains, group_size, mode or self.standby_mode)
+
+    def collect_standby_members(self, check_date, duty_members):
+        """
+        列出當日可列入備勤的警務員與隊長
 
         Args:
-            groups: 分組結果
             check_date: 日期
+            duty_members: 當日已值班的警員編號集合
 
         Returns:
-            str: 生成的檔案名稱
+            tuple: (警務員列表, 隊長列表)，皆依日排序、檔排序排列
+        """
+        # 請假人員與已值班人員一樣不列入備勤
+        excluded = set(duty_members) | self.leaves.on_leave_ids(check_date)
+
+        return collect_standby_members(
+            self.get_roster_index().members.values(),
+            *self._standby_context(check_date), excluded
+        )
+
+    def _standby_context(self, check_date):
+        """當日的各假檔日排序、各隊檔排序與上班的假檔"""
+        shift_orders = self.get_current_shift_order(check_date)
+        team_orders = {
+            team: get_team_order(team, check_date.month) for team in get_valid_teams()
+        }
+        working_shifts = {
+            shift for shift in self.rotation.shift_types if self.is_working_day(check_date, shift)
+        }
+        return shift_orders, team_orders, working_shifts
+
+    def _stored_standby(self, check_date):
         """
+        讀取當日未過期的備勤分組，供異動後增量更新；離線或讀取失敗時為 None
+        """
+        if self.offline:
+            return None
         try:
-            doc = Document()
-            doc.add_heading(f'{check_date.strftime("%Y-%m-%d")} 人員列表', 0)
+            return self.standby_store.load_entry(self.db.get_cursor(), check_date, self.standby_mode)
+        except Exception:
+            return None
+
+    def _apply_standby_delta(self, check_date, stored, added=(), removed=()):
+        """
+        值班人員異動後，在同一交易中以增量方式更新已存放的備勤分組
+
+        Args:
+            check_date: 日期
+            stored: 異動前 _stored_standby 的結果
+            added: 離開值班、可能回到備勤的警員編號
+            removed: 開始值班、不再列入備勤的警員編號
+        """
+        if stored is None:
+            return
+        groups, change_id, applied = stored
+        cursor = self.db.get_cursor()
+        applied = applied | self.standby_store.shift_changes_after(cursor, check_date, change_id)
+        if len(applied) > MAX_APPLIED_CHANGES:
+            return
+
+        # 當天仍擔任其他班別或請假的人不回到備勤
+        added = [s_id for s_id in added if s_id not in removed]
+        if added:
+            cursor.execute(f"""
+            SELECT S_ID FROM Shift
+            WHERE shift_date = %s AND S_ID IN ({', '.join(['%s'] * len(added))})
+            """, (check_date, *added))
+            still_on_duty = {row[0] for row in cursor.fetchall()} | self.leaves.on_leave_ids(check_date)
+            added = [s_id for s_id in added if s_id not in still_on_duty]
+
+        context = self._standby_context(check_date)
+        roster = self.get_roster_index()
+        entries = [
+            entry for entry in (standby_entry(roster.get(s_id), *context) for s_id in added if roster.get(s_id))
+            if entry is not None
+        ]
+        group_size = self.calendar.standby_group_size(check_date, DEFAULT_GROUP_SIZE)
+        groups = apply_delta(groups, group_size, added=entries, removed=removed, mode=self.standby_mode)
+        self.standby_store.save(cursor, check_date, groups, change_id, applied, self.standby_mode)
+
+    def get_daily_duties(self, check_date):
+        """
+        查詢某日的值班人員，依班別順序排列
 
-            # 值班人員部分
-            doc.add_heading('值班人員', level=1)
-            duty_query = """
+        Args:
+            check_date: 日期
+
+        Returns:
+            list: (班別, 姓名, 隊別) 的列表
+        """
+        if self.offline:
+            self._require_snapshot(check_date)
+            return list(self.snapshot.daily_shifts(check_date)[
+                ['shift_name', 'name', 'team']].itertuples(index=False, name=None))
+        if self.archive.is_archived(check_date):
+            daily = self._archived_daily(check_date)
+            order = {shift_name: i for i, shift_name in enumerate(get_shift_display_order())}
+            daily = daily.iloc[daily['shift_name'].map(order).fillna(len(order)).argsort(kind='stable')]
+            return list(daily[['shift_name', 'name', 'team']].itertuples(index=False, name=None))
+
+        duty_query = """
                             SELECT s.shift_name, e.name, e.team
                             FROM Shift s
                             JOIN Employee_Shift e ON s.S_ID = e.S_ID
@@ -632,59 +904,88 @@ class ShiftManager:
                                     WHEN '夜械彈管理員' THEN '14'
                                 END
                             """
-            self.db.get_cursor().execute(duty_query, (check_date,))
-            duty_results = self.db.get_cursor().fetchall()
-
-            if duty_results:
-                table = doc.add_table(rows=1, cols=3)
-                table.style = 'Table Grid'
-                header_cells = table.rows[0].cells
-                header_cells[0].text = "班別"
-                header_cells[1].text = "姓名"
-                header_cells[2].text = "隊別"
-
-                for duty in duty_results:
-                    row_cells = table.add_row().cells
-                    row_cells[0].text = duty[0]
-                    row_cells[1].text = duty[1]
-                    row_cells[2].text = f"{duty[2]}隊"
-
-            doc.add_paragraph()
-
-            # 備勤人員部分
-            doc.add_heading('備勤人員', level=1)
-            for group in groups:
-                table = doc.add_table(rows=1, cols=3)
-                table.style = 'Table Grid'
-
-                header_cells = table.rows[0].cells
-                header_cells[0].text = "帶班隊長"
-                header_cells[1].text = "警務員"
-                header_cells[2].text = f"備勤{group['group_num']}組"
-
-                row_cells = table.add_row().cells
-
-                if 'is_last_group' in group:
-                    captains_text = "\n".join([
-                        f"{c['name']}({c['team']}隊)"
-                        for c in group['captains']
-                    ])
-                    row_cells[0].text = captains_text
-                else:
-                    captain = group['captain']
-                    row_cells[0].text = f"{captain['name']}({captain['team']}隊)"
+        self.db.get_cursor().execute(duty_query, (check_date,))
+        return self.db.get_cursor().fetchall()
 
-                row_cells[1].text = " ".join([
-                    f"{o['name']}({o['team']}隊)"
-                    for o in group['officers']
-                ])
-                row_cells[2].text = f"備勤{group['group_num']}組"
+    def export_to_word(self, groups, check_date):
+        """
+        將人員列表輸出為Word文件
 
-                doc.add_paragraph()
+        Args:
+            groups: 分組結果
+            check_date: 日期
 
+        Returns:
+            str: 生成的檔案名稱
+        """
+        try:
+            duty_results = self.get_daily_duties(check_date)
             filename = f"人員列表_{check_date.strftime('%Y%m%d')}.docx"
-            doc.save(filename)
-            return filename
+            return render_document([(check_date, duty_results, groups, 0)], filename)
+
+        except Exception as err:
+            print(f"導出文件時發生錯誤: {str(err)}")
+            return None
+
+    def get_month_days(self, year, month):
+        """
+        一次讀取整月排班，整理出每天的值班人員與備勤分組
+
+        Args:
+            year: 年
+            month: 月
+
+        Returns:
+            list: (日期, 值班人員, 分組結果) 的列表
+        """
+        start_date, end_date = month_range(year, month)
+        shifts = self.get_shifts_between(start_date, end_date)
+        roster = self.get_roster_index()
+        display_order = {name: i for i, name in enumerate(get_shift_display_order())}
+
+        # 一次讀取整月排班後依日期分組
+        duties_by_date = {}
+        for shift_date, shift_name, s_id in zip(shifts['shift_date'], shifts['shift_name'], shifts['S_ID']):
+            duties_by_date.setdefault(shift_date, []).append((shift_name, s_id))
+
+        dates = list(pd.date_range(start_date, end_date, freq='D').date)
+        stored = {} if self.offline else self.standby_store.load(self.db.get_cursor(), dates, self.standby_mode)
+        missing = [check_date for check_date in dates if check_date not in stored]
+        if missing and not self.offline:
+            stored.update(self.regenerate_standby_groups(missing))
+
+        days = []
+        for check_date in dates:
+            day_shifts = sorted(duties_by_date.get(check_date, []),
+                                key=lambda duty: display_order.get(duty[0], len(display_order)))
+            duties = []
+            for shift_name, s_id in day_shifts:
+                member = roster.get(s_id) or {'name': s_id, 'team': ''}
+                duties.append((shift_name, member['name'], member['team']))
+
+            groups = stored.get(check_date)
+            if groups is None:
+                groups = self.build_standby_groups(check_date, {s_id for _, s_id in day_shifts})
+            days.append((check_date, duties, groups))
+        return days
+
+    def export_month_to_word(self, year, month):
+        """
+        將整個月每天的值班人員與備勤分組輸出為同一份Word文件
+
+        Args:
+            year: 年
+            month: 月
+
+        Returns:
+            str: 生成的檔案名稱
+        """
+        try:
+            days = [
+                (check_date, duties, groups, 1)
+                for check_date, duties, groups in self.get_month_days(year, month)
+            ]
+            return render_document(days, f"人員列表_{year}{month:02d}.docx")
 
         except Exception as err:
             print(f"導出文件時發生錯誤: {str(err)}")
@@ -755,14 +1056,14 @@ class ShiftManager:
             values = []
             if new_team is not None:
                 # 驗證新隊伍編號
-                if new_team not in ['1', '2', '3', '4', '5', '6', '7', '8', '9', '11', '13', '14']:
+                if new_team not in get_valid_teams():
                     return False, "無效的隊伍編號"
                 updates.append("team = %s")
                 values.append(new_team)
 
             if new_shift is not None:
                 # 驗證新假檔
-                if new_shift not in ['123檔期', '456檔期', '789檔期']:
+                if new_shift not in self.rotation.shift_types:
                     return False, "無效的假檔"
                 updates.append("current_shift = %s")
                 values.append(new_shift)
@@ -779,7 +1080,11 @@ class ShiftManager:
             values.append(s_id)
 
             self.db.get_cursor().execute(query, tuple(values))
+            if new_team is not None:
+                self.team_members.sync(self.db.get_cursor())
+            self._recompute_orders([s_id])
             self.db.get_connection().commit()
+            self._invalidate_roster()
 
             # 取得更新後的資料
             self.db.get_cursor().execute(
@@ -807,7 +1112,7 @@ class ShiftManager:
         """
         try:
             # 驗證所有假檔
-            valid_shifts = {'123檔期', '456檔期', '789檔期'}
+            valid_shifts = set(self.rotation.shift_types)
             for shift in shift_assignments.values():
                 if shift not in valid_shifts:
                     return False, f"無效的假檔: {shift}"
@@ -835,7 +1140,9 @@ class ShiftManager:
                 """
                 self.db.get_cursor().execute(query, (new_shift, s_id, team_id))
 
+            self._recompute_orders(list(shift_assignments))
             self.db.get_connection().commit()
+            self._invalidate_roster()
             return True, f"成功更新第{team_id}隊 {len(shift_assignments)}位成員的假檔"
 
         except Exception as err:
@@ -855,20 +1162,13 @@ class ShiftManager:
             tuple: (是否成功, DataFrame或錯誤訊息)
         """
         try:
+            # 依 (team, position) 索引範圍掃描
             query = """
-            SELECT 
-                S_ID,
-                name,
-                job_rank,
-                current_shift,
-                CASE current_shift
-                    WHEN '123檔期' THEN 1
-                    WHEN '456檔期' THEN 2
-                    WHEN '789檔期' THEN 3
-                END as shift_num
-            FROM Employee_Shift
-            WHERE team = %s
-            ORDER BY job_rank DESC, shift_num
+            SELECT e.S_ID, e.name, e.job_rank, e.current_shift
+            FROM Team_Member tm
+            JOIN Employee_Shift e ON e.S_ID = tm.S_ID
+            WHERE tm.team = %s
+            ORDER BY tm.position, tm.S_ID
             """
             self.db.get_cursor().execute(query, (team_id,))
             rows = self.db.get_cursor().fetchall()
@@ -876,18 +1176,14 @@ class ShiftManager:
             if not rows:
                 return False, f"找不到第{team_id}隊的人員資料"
 
-            # 轉換為 DataFrame 並添加順序
-            data = []
-            for i, row in enumerate(rows, 1):
-                data.append({
-                    'S_ID': row[0],
-                    '順序': i,
-                    '姓名': row[1],
-                    '職級': row[2],
-                    '假檔': row[3]
-                })
-
-            df = pd.DataFrame(data)
+            s_ids, names, ranks, shift_types = zip(*rows)
+            df = pd.DataFrame({
+                'S_ID': s_ids,
+                '順序': np.arange(1, len(rows) + 1, dtype=np.int16),
+                '姓名': names,
+                '職級': categorical(ranks, get_valid_ranks()),
+                '假檔': categorical(shift_types, get_valid_shift_types())
+            })
             return True, df
 
         except Exception as err:
@@ -938,7 +1234,9 @@ class ShiftManager:
                 team_id
             ))
 
+            self._recompute_orders([s_id1, s_id2])
             self.db.get_connection().commit()
+            self._invalidate_roster()
             return True, f"成功交換 {names[s_id1]} 和 {names[s_id2]} 的假檔"
 
         except Exception as err:
@@ -947,7 +1245,7 @@ class ShiftManager:
 
     def update_member_order(self, team_id, order_changes):
         """
-        更新隊內人員順序
+        更新隊內人員順序，只寫入移動的隊員
 
         Args:
             team_id: 隊伍編號
@@ -957,54 +1255,21 @@ class ShiftManager:
             tuple: (是否成功, 結果訊息)
         """
         try:
-            # 先獲取所有隊員資訊
-            query = """
-            SELECT S_ID, name, job_rank, current_shift
-            FROM Employee_Shift
-            WHERE team = %s
-            ORDER BY job_rank DESC, current_shift
-            """
-            self.db.get_cursor().execute(query, (team_id,))
-            members = self.db.get_cursor().fetchall()
-
-            # 創建當前成員列表
-            current_members = []
-            for member in members:
-                current_members.append({
-                    'S_ID': member[0],
-                    'name': member[1],
-                    'job_rank': member[2],
-                    'current_shift': member[3]
-                })
+            members = self.team_members.members(self.db.get_cursor(), team_id, for_update=True)
+            new_order = [s_id for s_id, _ in members]
 
-            # 建立新順序列表
-            new_order_members = current_members.copy()
-
-            # 根據 order_changes 排序
-            for s_id, new_order in sorted(order_changes.items(), key=lambda x: x[1]):
-                # 找出要移動的成員
-                member = next(m for m in new_order_members if m['S_ID'] == s_id)
-                # 從列表中移除
-                new_order_members.remove(member)
-                # 插入新位置
-                new_order_members.insert(new_order - 1, member)
-
-            # 更新資料庫
-            for i, member in enumerate(new_order_members):
-                if i < 3:  # 前三個人
-                    new_shift = '123檔期'
-                elif i < 6:  # 中間三個人
-                    new_shift = '456檔期'
-                else:  # 最後的人
-                    new_shift = '789檔期'
-
-                update_query = """
-                UPDATE Employee_Shift 
-                SET current_shift = %s 
-                WHERE S_ID = %s AND team = %s
-                """
-                self.db.get_cursor().execute(update_query, (new_shift, member['S_ID'], team_id))
+            invalid_members = set(order_changes) - set(new_order)
+            if invalid_members:
+                self.db.get_connection().rollback()
+                return False, f"以下員工不屬於第{team_id}隊: {', '.join(invalid_members)}"
 
+            # 根據 order_changes 依序移到新位置
+            for s_id, order in sorted(order_changes.items(), key=lambda x: x[1]):
+                new_order.remove(s_id)
+                new_order.insert(order - 1, s_id)
+
+            self.team_members.reorder(self.db.get_cursor(), team_id, new_order,
+                                      dict(members), set(order_changes))
             self.db.get_connection().commit()
             return True, f"成功更新第{team_id}隊 {len(order_changes)}位成員的順序"
 
@@ -1014,7 +1279,7 @@ class ShiftManager:
 
     def swap_member_orders(self, team_id, s_id1, s_id2):
         """
-        交換兩個隊員的順序（通過交換假檔實現）
+        交換兩個隊員的順序
 
         Args:
             team_id: 隊伍編號
@@ -1025,41 +1290,635 @@ class ShiftManager:
             tuple: (是否成功, 結果訊息)
         """
         try:
-            # 檢查兩個警員是否都在同一個隊伍
-            query = """
-            SELECT S_ID, name, current_shift 
-            FROM Employee_Shift 
-            WHERE team = %s AND S_ID IN (%s, %s)
-            """
-            self.db.get_cursor().execute(query, (team_id, s_id1, s_id2))
-            results = self.db.get_cursor().fetchall()
-
-            if len(results) != 2:
+            if not self.team_members.swap(self.db.get_cursor(), team_id, s_id1, s_id2):
+                self.db.get_connection().rollback()
                 return False, "警員編號錯誤或不在同一個隊伍"
+            self.db.get_connection().commit()
 
-            # 獲取當前假檔
-            shifts = {row[0]: row[2] for row in results}
-            names = {row[0]: row[1] for row in results}
+            name1 = self.get_employee_info(s_id1)['name']
+            name2 = self.get_employee_info(s_id2)['name']
+            return True, f"成功交換 {name1} 和 {name2} 的順序"
 
-            # 交換假檔
-            query = """
-            UPDATE Employee_Shift 
-            SET current_shift = CASE
-                WHEN S_ID = %s THEN %s
-                WHEN S_ID = %s THEN %s
-            END
-            WHERE S_ID IN (%s, %s) AND team = %s
+        except Exception as err:
+            self.db.get_connection().rollback()
+            return False, f"交換失敗: {str(err)}"
+
+    def import_roster(self, employee_path=None, shift_path=None, dry_run=False):
+        """
+        從CSV或Excel批次匯入人員資料與歷史班表
+
+        Args:
+            employee_path: 人員資料檔路徑(可選)
+            shift_path: 歷史班表檔路徑(可選)
+            dry_run: 只驗證不寫入
+
+        Returns:
+            tuple: (是否成功, 匯入結果或錯誤訊息)
+        """
+        if not employee_path and not shift_path:
+            return False, "沒有提供要匯入的檔案"
+
+        try:
+            importer = RosterImporter(self)
+            result = importer.run(employee_path, shift_path, dry_run)
+            if not dry_run:
+                self._invalidate_roster()
+                # 新匯入或換隊的人員排在隊伍最後
+                self.team_members.sync(self.db.get_cursor())
+                self.db.get_connection().commit()
+                self.recompute_orders()
+            return True, result
+        except Exception as err:
+            return False, f"匯入失敗: {str(err)}"
+
+    def _recompute_orders(self, s_ids=None, start_date=None, end_date=None):
+        """
+        重新計算排班的檔排序與日排序，不提交交易
+
+        Args:
+            s_ids: 只處理這些警員的排班(可選，預設為全部)
+            start_date: 起始日(可選，預設為今天)，已封存年份唯讀，一律從最後封存年份的隔年起算
+            end_date: 結束日(可選，預設不限)
+
+        Returns:
+            int: 更新筆數
+        """
+        if s_ids is not None and not s_ids:
+            return 0
+
+        start_date = format_date(start_date) if start_date else datetime.now().date()
+        archived = self.archive.years()
+        if archived and start_date.year <= archived[-1]:
+            start_date = date(archived[-1] + 1, 1, 1)
+        conditions = ["s.shift_date >= %s"]
+        params = [start_date]
+        if end_date:
+            conditions.append("s.shift_date <= %s")
+            params.append(format_date(end_date))
+        if s_ids is not None:
+            conditions.append(f"s.S_ID IN ({', '.join(['%s'] * len(s_ids))})")
+            params.extend(s_ids)
+
+        query = f"""
+        SELECT s.shift_date, s.shift_name, s.S_ID, s.team_order, s.day_order, e.team, e.current_shift
+        FROM Shift s
+        JOIN Employee_Shift e ON s.S_ID = e.S_ID
+        WHERE {' AND '.join(conditions)}
+        """
+        self.db.get_cursor().execute(query, tuple(params))
+        shifts = pd.DataFrame(self.db.get_cursor().fetchall(), columns=[
+            'shift_date', 'shift_name', 'S_ID', 'team_order', 'day_order', 'team', 'current_shift'
+        ])
+        changes = find_stale_orders(shifts, self.rotation, self.calendar)
+        return update_orders(self.db.get_cursor(), changes)
+
+    def recompute_orders(self, start_date=None, end_date=None):
+        """
+        修正期間內排序與目前人員資料、特殊日期不一致的排班
+
+        Args:
+            start_date: 起始日(可選，預設為今天)
+            end_date: 結束日(可選，預設不限)
+
+        Returns:
+            tuple: (是否成功, 結果訊息)
+        """
+        try:
+            count = self._recompute_orders(start_date=start_date, end_date=end_date)
+            self.db.get_connection().commit()
+            return True, f"已更新 {count} 筆排班的排序"
+        except Exception as err:
+            self.db.get_connection().rollback()
+            return False, f"重新計算排序失敗: {str(err)}"
+
+    def get_roster(self):
+        """
+        一次讀取全部人員資料
+
+        Returns:
+            DataFrame: 包含 S_ID, name, team, job_rank, current_shift 的人員資料
+        """
+        if self.offline:
+            return self.snapshot.roster()
+
+        query = "SELECT S_ID, name, team, job_rank, current_shift FROM Employee_Shift ORDER BY S_ID"
+        self.db.get_cursor().execute(query)
+        rows = self.db.get_cursor().fetchall()
+        return pd.DataFrame(rows, columns=['S_ID', 'name', 'team', 'job_rank', 'current_shift'])
+
+    def get_shifts_between(self, start_date, end_date):
+        """
+        一次讀取期間內的所有排班
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+
+        Returns:
+            DataFrame: 包含 shift_date, shift_name, S_ID, team_order, day_order 的排班資料，
+                       已封存年份的排班由封存檔讀取
+        """
+        if self.offline:
+            self._require_snapshot(start_date, end_date)
+            return self.snapshot.shifts_between(start_date, end_date)
+
+        query = """
+        SELECT shift_date, shift_name, S_ID, team_order, day_order
+        FROM Shift
+        WHERE shift_date BETWEEN %s AND %s
+        ORDER BY shift_date
+        """
+        self.db.get_cursor().execute(query, (format_date(start_date), format_date(end_date)))
+        rows = self.db.get_cursor().fetchall()
+        shifts = pd.DataFrame(rows, columns=['shift_date', 'shift_name', 'S_ID', 'team_order', 'day_order'])
+        if not self.archive.covers(start_date, end_date):
+            return shifts
+
+        try:
+            archived = self.archive.read(start_date, end_date)
+        except ImportError as err:
+            years = [year for year in self.archive.years()
+                     if format_date(start_date).year <= year <= format_date(end_date).year]
+            raise RuntimeError(f"{'、'.join(map(str, years))} 年的排班已封存，{err}") from err
+        shifts = pd.concat([archived, shifts], ignore_index=True)
+        return shifts.sort_values('shift_date', kind='stable').reset_index(drop=True)
+
+    def _archived_daily(self, check_date):
+        """
+        由封存檔讀取某日的排班並加上人員資料
+
+        Args:
+            check_date: 日期
+
+        Returns:
+            DataFrame: 封存欄位與 name, team, job_rank, current_shift
+        """
+        return self.archive.read(check_date, check_date).merge(self.get_roster(), on='S_ID')
+
+    def _require_snapshot(self, start_date, end_date=None):
+        """
+        離線時確認快照涵蓋查詢期間，快照期間以外沒有排班資料，不能當作當天沒有排班
+
+        Raises:
+            ValueError: 快照未涵蓋查詢期間
+        """
+        if not self.snapshot.covers(start_date, end_date):
+            raise ValueError(f"快照未涵蓋此日期(快照期間為 {self.snapshot.window_start} 至 "
+                             f"{self.snapshot.window_end})")
+
+    def _archived_message(self, year):
+        """已封存年份不能寫入的錯誤訊息"""
+        return f"錯誤：{year} 年的排班已封存，不能再新增或修改"
+
+    def add_shift_partitions(self, years_ahead=1):
+        """
+        為今年起到之後幾年建立 Shift 表的年度分割區
+
+        Args:
+            years_ahead: 今年之後再建立幾年
+
+        Returns:
+            tuple: (是否成功, 結果訊息)
+        """
+        try:
+            years = add_partitions(self.db.get_cursor(), datetime.now().year + years_ahead)
+            if not years:
+                return True, "年度分割區已建立，不需新增"
+            return True, f"已建立 {', '.join(map(str, years))} 年的分割區"
+        except Exception as err:
+            self.db.get_connection().rollback()
+            return False, f"建立分割區失敗: {str(err)}"
+
+    def archive_closed_years(self, keep_years=1):
+        """
+        將已結束年度的分割區移到封存檔
+
+        Args:
+            keep_years: 保留在資料庫的已結束年數，預設保留去年
+
+        Returns:
+            tuple: (是否成功, 結果訊息)
+        """
+        try:
+            last_year = datetime.now().year - keep_years
+            counts = {}
+            for partition, bound in list_partitions(self.db.get_cursor()):
+                if bound is None or bound > last_year:
+                    continue
+                for year, count in self.archive.archive_partition(self.db.get_cursor(), partition).items():
+                    counts[year] = counts.get(year, 0) + count
+            if not counts:
+                return True, "沒有需要封存的排班"
+            return True, "已封存 " + ", ".join(f"{year} 年 {count} 筆" for year, count in sorted(counts.items()))
+        except Exception as err:
+            self.db.get_connection().rollback()
+            return False, f"封存失敗: {str(err)}"
+
+    def get_roster_index(self):
+        """
+        取得人員索引，人員資料異動前重複使用
+
+        Returns:
+            RosterIndex: 人員索引
+        """
+        return self._cached('_roster_index', lambda: RosterIndex(
+            self.get_roster().itertuples(index=False, name=None)
+        ))
+
+    def simulate_rotations(self, scenarios, start_date, days=365):
+        """
+        以目前人員資料模擬並比較不同的輪休週期
+
+        Args:
+            scenarios: 情境列表，每個情境包含 name、cycle 與可選的 assignments
+            start_date: 模擬起始日
+            days: 模擬天數
+
+        Returns:
+            tuple: (是否成功, (比較表, 各情境結果) 或錯誤訊息)
+        """
+        try:
+            simulator = RotationSimulator(self.get_roster(), start_date, days)
+            return True, simulator.compare(scenarios)
+        except Exception as err:
+            return False, f"模擬失敗: {str(err)}"
+
+    def forecast_staffing(self, start_date, end_date, min_standby_groups=1):
+        """
+        預測期間內每日可用人力並標記人力不足的日期
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+            min_standby_groups: 每日至少需要的備勤組數
+
+        Returns:
+            tuple: (是否成功, {'headcount': 各職級各隊人數, 'summary': 各職級彙總} 或錯誤訊息)
+        """
+        try:
+            # 人數統計只在人員異動後重建，之後每次預測只需矩陣運算
+            forecast = self._cached('_forecast', lambda: StaffingForecast(
+                self.get_roster(), self.rotation, self.calendar, self.leaves
+            ))
+
+            headcount = forecast.headcount(start_date, end_date)
+            summary = forecast.rank_summary(headcount, min_standby_groups)
+            return True, {'headcount': headcount, 'summary': summary}
+
+        except Exception as err:
+            return False, f"預測失敗: {str(err)}"
+
+    def add_calendar_exception(self, exception_date, exception_type, description=None,
+                               working_shifts=None, standby_group_size=None):
+        """
+        新增或更新特殊日期
+
+        Args:
+            exception_date: 日期
+            exception_type: 類型(國定假日、颱風假、特殊勤務)
+            description: 說明(可選)
+            working_shifts: 當日上班的假檔列表(可選，None代表依輪休週期)
+            standby_group_size: 備勤每組警務員人數(可選)
+
+        Returns:
+            tuple: (是否成功, 結果訊息)
+        """
+        try:
+            exception_date = format_date(exception_date)
+            if exception_type not in EXCEPTION_TYPES:
+                return False, f"無效的特殊日期類型: {exception_type}"
+            if working_shifts is not None:
+                invalid = set(working_shifts) - set(self.rotation.shift_types)
+                if invalid:
+                    return False, f"無效的假檔: {', '.join(invalid)}"
+            if standby_group_size is not None and standby_group_size < 1:
+                return False, "備勤每組人數必須大於0"
+
+            query = """
+            INSERT INTO Calendar_Exception
+                (exception_date, exception_type, description, working_shifts, standby_group_size)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                exception_type = VALUES(exception_type),
+                description = VALUES(description),
+                working_shifts = VALUES(working_shifts),
+                standby_group_size = VALUES(standby_group_size)
             """
+            working_text = None if working_shifts is None else ','.join(working_shifts)
             self.db.get_cursor().execute(query, (
-                s_id1, shifts[s_id2],
-                s_id2, shifts[s_id1],
-                s_id1, s_id2,
-                team_id
+                exception_date, exception_type, description, working_text, standby_group_size
             ))
+            self.db.get_connection().commit()
+
+            self.calendar.put(exception_date, exception_type, description,
+                              working_shifts, standby_group_size)
+            self.recompute_orders(exception_date, exception_date)
+            return True, f"成功設定 {exception_date} 為{exception_type}"
+
+        except Exception as err:
+            self.db.get_connection().rollback()
+            return False, f"設定失敗: {str(err)}"
+
+    def remove_calendar_exception(self, exception_date):
+        """
+        刪除特殊日期
+
+        Args:
+            exception_date: 日期
+
+        Returns:
+            tuple: (是否成功, 結果訊息)
+        """
+        try:
+            exception_date = format_date(exception_date)
+            self.db.get_cursor().execute(
+                "DELETE FROM Calendar_Exception WHERE exception_date = %s", (exception_date,)
+            )
+            if self.db.get_cursor().rowcount == 0:
+                return False, f"{exception_date} 不是特殊日期"
+
+            self.db.get_connection().commit()
+            self.calendar.remove(exception_date)
+            self.recompute_orders(exception_date, exception_date)
+            return True, f"成功刪除 {exception_date} 的特殊日期設定"
+
+        except Exception as err:
+            self.db.get_connection().rollback()
+            return False, f"刪除失敗: {str(err)}"
+
+    def add_leave(self, s_id, leave_type, start_date, end_date, note=None):
+        """
+        新增請假紀錄
+
+        Args:
+            s_id: 員工編號
+            leave_type: 假別(病假、事假、公假、受訓、出庭)
+            start_date: 起始日
+            end_date: 結束日(含)
+            note: 備註(可選)
+
+        Returns:
+            tuple: (是否成功, 結果訊息)
+        """
+        try:
+            start_date, end_date = format_date(start_date), format_date(end_date)
+            if leave_type not in LEAVE_TYPES:
+                return False, f"無效的假別: {leave_type}"
+            if end_date < start_date:
+                return False, "結束日不可早於起始日"
+
+            emp_info = self.get_employee_info(s_id)
+            if not emp_info:
+                return False, f"找不到員工編號 {s_id}"
+
+            query = """
+            INSERT INTO Leave_Record (S_ID, leave_type, start_date, end_date, note)
+            VALUES (%s, %s, %s, %s, %s)
+            """
+            self.db.get_cursor().execute(query, (s_id, leave_type, start_date, end_date, note))
+            leave_id = self.db.get_cursor().lastrowid
+            self.db.get_connection().commit()
+
+            self.leaves.add(leave_id, s_id, leave_type, start_date, end_date, note)
+
+            # 提醒期間內已排定的班別
+            shifts = self.get_shifts_between(start_date, end_date)
+            booked = list(shifts.loc[shifts['S_ID'] == s_id, ['shift_date', 'shift_name']]
+                          .itertuples(index=False, name=None))
+            message = f"成功登記 {emp_info['name']} {start_date} 至 {end_date} {leave_type}"
+            if booked:
+                message += "，請注意以下班別需另行調整: " + \
+                    ', '.join(f"{shift_date} {shift_name}" for shift_date, shift_name in booked)
+            return True, message
+
+        except Exception as err:
+            self.db.get_connection().rollback()
+            return False, f"登記失敗: {str(err)}"
+
+    def remove_leave(self, leave_id):
+        """
+        刪除請假紀錄
+
+        Args:
+            leave_id: 請假紀錄編號
+
+        Returns:
+            tuple: (是否成功, 結果訊息)
+        """
+        try:
+            self.db.get_cursor().execute("DELETE FROM Leave_Record WHERE id = %s", (leave_id,))
+            if self.db.get_cursor().rowcount == 0:
+                return False, f"找不到請假紀錄 {leave_id}"
+
+            self.db.get_connection().commit()
+            self.leaves.remove(leave_id)
+            return True, f"成功刪除請假紀錄 {leave_id}"
+
+        except Exception as err:
+            self.db.get_connection().rollback()
+            return False, f"刪除失敗: {str(err)}"
+
+    def find_replacement_candidates(self, shift_name, shift_date, k=5):
+        """
+        搜尋班別的替補人選
+
+        Args:
+            shift_name: 班別名稱
+            shift_date: 日期
+            k: 名單數量
+
+        Returns:
+            tuple: (是否成功, 候選人列表或錯誤訊息)
+        """
+        try:
+            search = CandidateSearch(self, shift_date)
+            return True, search.top(shift_name, k)
+        except Exception as err:
+            return False, f"搜尋失敗: {str(err)}"
+
+    def find_swaps(self, shift_name, shift_date, window_days=15):
+        """
+        列出指定班別在日期區間內所有可交換的對象
+
+        Args:
+            shift_name: 班別名稱
+            shift_date: 日期
+            window_days: 前後搜尋天數
+
+        Returns:
+            tuple: (是否成功, 可交換對象列表或錯誤訊息)
+        """
+        try:
+            start_date, end_date = window(shift_date, window_days)
+            finder = SwapFinder(self, start_date, end_date)
+            return True, finder.find(shift_name, shift_date)
+        except Exception as err:
+            return False, f"搜尋失敗: {str(err)}"
+
+    def apply_swap(self, shift_name_a, date_a, shift_name_b, date_b):
+        """
+        互換兩個班別的人員
 
+        Args:
+            shift_name_a: 第一個班別名稱
+            date_a: 第一個班別日期
+            shift_name_b: 第二個班別名稱
+            date_b: 第二個班別日期
+
+        Returns:
+            tuple: (是否成功, 結果訊息)
+        """
+        try:
+            date_a, date_b = format_date(date_a), format_date(date_b)
+            for shift_date in (date_a, date_b):
+                if self.archive.is_archived(shift_date):
+                    return False, self._archived_message(shift_date.year)
+
+            # 鎖定兩天的排班，避免驗證後被其他人修改
+            self.db.get_cursor().execute(
+                "SELECT id FROM Shift WHERE shift_date IN (%s, %s) FOR UPDATE", (date_a, date_b)
+            )
+            self.db.get_cursor().fetchall()
+
+            finder = SwapFinder(self, min(date_a, date_b), max(date_a, date_b))
+            ok, reason = finder.check(date_a, shift_name_a, date_b, shift_name_b)
+            if not ok:
+                self.db.get_connection().rollback()
+                return False, f"錯誤：{reason}"
+
+            member_a = finder.roster.get(finder.assignments[(date_a, shift_name_a)])
+            member_b = finder.roster.get(finder.assignments[(date_b, shift_name_b)])
+
+            # 交換後依新的日期重新計算排序
+            updates = []
+            for member, shift_name, shift_date in ((member_b, shift_name_a, date_a),
+                                                   (member_a, shift_name_b, date_b)):
+                team_order = get_team_order(member['team'], shift_date.month)
+                day_order = self.get_current_shift_order(shift_date).get(member['shift'], 0)
+                updates.append((member['S_ID'], team_order, day_order, shift_name, shift_date))
+
+            update_query = """
+            UPDATE Shift
+            SET S_ID = %s, team_order = %s, day_order = %s
+            WHERE shift_name = %s AND shift_date = %s
+            """
+            for values in updates:
+                self.db.get_cursor().execute(update_query, values)
             self.db.get_connection().commit()
-            return True, f"成功交換 {names[s_id1]} 和 {names[s_id2]} 的順序"
+
+            return True, (f"成功：{member_a['name']} 改擔任 {date_b} {shift_name_b}，"
+                          f"{member_b['name']} 改擔任 {date_a} {shift_name_a}")
+
+        except Exception as err:
+            self.db.get_connection().rollback()
+            return False, f"交換失敗: {str(err)}"
+
+    def clone_shifts(self, source_start, source_end, target_start=None, dry_run=False):
+        """
+        將來源期間的排班複製到之後的日期，排序依新日期重新計算
+
+        違反輪休、職級、一日一班等排班規則或目標班別已有人擔任的資料列不複製，
+        連同原因一併回傳。可複製的資料列以每批一個 INSERT ... SELECT 寫入。
+
+        Args:
+            source_start: 來源起始日
+            source_end: 來源結束日(含)
+            target_start: 目標起始日(可選，預設為來源起始日後整數個輪休週期，且不與來源期間重疊)
+            dry_run: 只檢查不寫入
+
+        Returns:
+            tuple: (是否成功, {'inserted': 新增筆數, 'accepted': 可複製的排班, 'skipped': 略過的排班與原因}
+                    或錯誤訊息)
+        """
+        try:
+            source_start, source_end = format_date(source_start), format_date(source_end)
+            if source_end < source_start:
+                return False, "錯誤：結束日期不能早於起始日期"
+            if target_start is None:
+                offset_days = clone_offset(source_start, source_end, self.rotation.cycle_length)
+            else:
+                offset_days = (format_date(target_start) - source_start).days
+            target_start = source_start + timedelta(days=offset_days)
+            target_end = source_end + timedelta(days=offset_days)
+            if target_start <= source_end:
+                return False, "錯誤：目標期間必須在來源期間之後"
+            # 複製以 INSERT ... SELECT 讀取 Shift 表的來源資料列，來源與目標都不能是已封存年份
+            for start, end in ((source_start, source_end), (target_start, target_end)):
+                if self.archive.covers(start, end):
+                    archived = next(year for year in self.archive.years() if start.year <= year <= end.year)
+                    return False, self._archived_message(archived)
+
+            # 鎖定來源與目標期間的排班，避免檢查後被其他人修改
+            window_start = target_start - timedelta(days=NIGHT_DUTY_REST_DAYS)
+            window_end = target_end + timedelta(days=NIGHT_DUTY_REST_DAYS)
+            self.db.get_cursor().execute(
+                "SELECT id FROM Shift WHERE shift_date BETWEEN %s AND %s OR shift_date BETWEEN %s AND %s FOR UPDATE",
+                (source_start, source_end, window_start, window_end)
+            )
+            self.db.get_cursor().fetchall()
+
+            accepted, skipped = plan_clone(
+                self.get_shifts_between(source_start, source_end),
+                self.get_shifts_between(window_start, window_end),
+                self.get_roster(), self.get_validator(), self.rotation, self.calendar, offset_days
+            )
+            inserted = 0
+            if not dry_run and not accepted.empty:
+                inserted = insert_clones(self.db.get_cursor(), accepted, offset_days)
+                self.db.get_connection().commit()
+            else:
+                self.db.get_connection().rollback()
+            return True, {'inserted': inserted, 'accepted': accepted, 'skipped': skipped}
 
         except Exception as err:
             self.db.get_connection().rollback()
-            return False, f"交換失敗: {str(err)}"
\ No newline at end of file
+            return False, f"複製失敗: {str(err)}"
+
+    def build_roster_matrix(self, year, month):
+        """
+        建立月份的人員x日期班表矩陣
+
+        Args:
+            year: 年
+            month: 月
+
+        Returns:
+            tuple: (是否成功, DataFrame或錯誤訊息)
+        """
+        try:
+            start_date, end_date = month_range(year, month)
+            dates = pd.date_range(start_date, end_date, freq='D')
+            matrix = build_roster_matrix(
+                self.get_roster(), self.get_shifts_between(start_date, end_date),
+                self.rotation, dates, self.calendar, self.leaves
+            )
+            return True, matrix
+        except Exception as err:
+            return False, f"查詢錯誤: {str(err)}"
+
+    def export_roster_matrix(self, year, month, file_format='xlsx'):
+        """
+        輸出月份班表矩陣
+
+        Args:
+            year: 年
+            month: 月
+            file_format: 'xlsx' 或 'docx'
+
+        Returns:
+            str: 生成的檔案名稱
+        """
+        success, matrix = self.build_roster_matrix(year, month)
+        if not success:
+            print(matrix)
+            return None
+
+        title = f"{year}年{month}月班表"
+        filename = f"月班表_{year}{month:02d}.{file_format}"
+        try:
+            if file_format == 'docx':
+                return export_matrix_to_word(matrix, title, filename)
+            return export_matrix_to_excel(matrix, title, filename)
+        except Exception as err:
+            print(f"導出文件時發生錯誤: {str(err)}")
+            return None
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from rotation import RotationPattern
+from utils import format_date, get_shifts_config
+
+
+STANDBY_GROUP_OFFICERS = 9
+STANDBY_GROUP_CAPTAINS = 1
+RANKS = ['警務員', '隊長', '副大隊長']
+
+
+def parse_segments(text):
+    """
+    解析週期區段字串，例如 "7,4,8,2" 代表上班7天、休假4天、上班8天、休假2天
+
+    Args:
+        text: 以逗號分隔的天數，由上班開始交替
+
+    Returns:
+        list: 區段定義列表
+    """
+    lengths = [int(part) for part in text.split(',') if part.strip()]
+    if not lengths or any(length <= 0 for length in lengths):
+        raise ValueError("區段天數必須為正整數")
+    return [{'days': length, 'working': i % 2 == 0} for i, length in enumerate(lengths)]
+
+
+def get_post_requirements():
+    """
+    依班別設定計算各職級每日需要的人數
+
+    Returns:
+        dict: 職級對應的值班人數
+    """
+    requirements = dict.fromkeys(RANKS, 0)
+    for _, rank in get_shifts_config():
+        requirements[rank] += 1
+    return requirements
+
+
+def compile_cycle(cycle):
+    """
+    將週期定義編譯為 RotationPattern，已編譯者直接回傳
+
+    Args:
+        cycle: RotationPattern 或週期定義dict
+
+    Returns:
+        RotationPattern: 編譯後的輪休週期
+    """
+    if isinstance(cycle, RotationPattern):
+        return cycle
+    return RotationPattern(cycle)
+
+
+class RotationSimulator:
+    """比較不同輪休週期與人員配置的模擬器"""
+
+    def __init__(self, roster, start_date, days=365):
+        """
+        初始化模擬器
+
+        Args:
+            roster: 人員DataFrame，需包含 S_ID, team, job_rank, current_shift
+            start_date: 模擬起始日
+            days: 模擬天數
+        """
+        self.roster = roster
+        self.dates = pd.date_range(format_date(start_date), periods=days, freq='D')
+        self.requirements = get_post_requirements()
+
+    def run(self, scenario):
+        """
+        執行單一情境的模擬
+
+        Args:
+            scenario: dict，包含 name、cycle(週期定義或RotationPattern)、assignments(可選，{S_ID: 假檔})
+
+        Returns:
+            dict: 每日人力、休假分布與勤務覆蓋統計
+        """
+        cycle = compile_cycle(scenario.get('cycle') or RotationPattern.load())
+        shift_types = cycle.shift_types
+
+        roster = self.roster
+        if scenario.get('assignments'):
+            roster = roster.assign(current_shift=roster['S_ID'].map(scenario['assignments'])
+                                   .fillna(roster['current_shift']))
+
+        unknown = set(roster['current_shift']) - set(shift_types)
+        if unknown:
+            raise ValueError(f"週期設定缺少假檔: {', '.join(sorted(unknown))}")
+
+        working = cycle.working_matrix(self.dates)
+
+        # 各假檔、職級的人數，每日人力 = 上班矩陣 x 人數矩陣
+        counts = pd.crosstab(roster['current_shift'], roster['job_rank']) \
+            .reindex(index=shift_types, columns=RANKS, fill_value=0)
+        daily = pd.DataFrame(working.T.astype(int) @ counts.to_numpy(),
+                             index=self.dates, columns=RANKS)
+
+        standby_officers = daily['警務員'] - self.requirements['警務員']
+        standby_captains = daily['隊長'] - self.requirements['隊長']
+        daily['備勤組數'] = np.maximum(np.minimum(standby_officers // STANDBY_GROUP_OFFICERS,
+                                              standby_captains // STANDBY_GROUP_CAPTAINS), 0)
+        daily['勤務全覆蓋'] = np.logical_and.reduce([
+            daily[rank] >= need for rank, need in self.requirements.items()
+        ])
+
+        # 休假分布：每個假檔的休假天數與休假落在星期幾
+        rest = ~working
+        rest_days = pd.Series(rest.sum(axis=1), index=shift_types)
+        weekdays = np.asarray(self.dates.weekday)
+        weekday_rest = pd.DataFrame(
+            [np.bincount(weekdays[row], minlength=7) for row in rest],
+            index=shift_types,
+            columns=['週一', '週二', '週三', '週四', '週五', '週六', '週日']
+        )
+        officer_rest = roster['current_shift'].map(rest_days)
+
+        return {
+            'name': scenario.get('name', cycle.name),
+            'daily': daily,
+            'rest_days': rest_days,
+            'weekday_rest': weekday_rest,
+            'summary': {
+                '模擬天數': len(self.dates),
+                '勤務全覆蓋天數': int(daily['勤務全覆蓋'].sum()),
+                '無備勤組天數': int((daily['備勤組數'] == 0).sum()),
+                '最少備勤組數': int(daily['備勤組數'].min()),
+                '平均備勤組數': round(float(daily['備勤組數'].mean()), 2),
+                '最少上班警務員': int(daily['警務員'].min()),
+                '最少上班隊長': int(daily['隊長'].min()),
+                '最少上班副大隊長': int(daily['副大隊長'].min()),
+                '每人平均休假天數': round(float(officer_rest.mean()), 2) if len(officer_rest) else 0,
+                '每人休假天數差距': int(officer_rest.max() - officer_rest.min()) if len(officer_rest) else 0,
+                '週末休假比例': round(float(weekday_rest[['週六', '週日']].to_numpy().sum()
+                                     / max(rest.sum(), 1)), 3)
+            }
+        }
+
+    def compare(self, scenarios):
+        """
+        執行多個情境並產生並列比較表
+
+        Args:
+            scenarios: 情境列表
+
+        Returns:
+            tuple: (比較表DataFrame, 各情境模擬結果列表)
+        """
+        results = [self.run(scenario) for scenario in scenarios]
+        comparison = pd.DataFrame(
+            {result['name']: result['summary'] for result in results}
+        )
+        return comparison, results
+
+
+def export_comparison(comparison, results, filename):
+    """
+    將情境比較結果輸出為Excel
+
+    Args:
+        comparison: 比較表
+        results: 各情境模擬結果
+        filename: 輸出檔名
+
+    Returns:
+        str: 輸出檔名
+    """
+    with pd.ExcelWriter(filename) as writer:
+        comparison.to_excel(writer, sheet_name='比較')
+        for i, result in enumerate(results, 1):
+            sheet = f"{i}_{result['name']}"[:31]
+            result['daily'].to_excel(writer, sheet_name=sheet)
+    return filename
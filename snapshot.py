@@ -0,0 +1,273 @@
+import json
+import os
+import struct
+from datetime import datetime, date, timedelta
+import numpy as np
+import pandas as pd
+from utils import format_date, get_shift_display_order
+
+
+MAGIC = b'PSSNAP01'
+ALIGNMENT = 64
+DEFAULT_SNAPSHOT_PATH = os.path.join('snapshot', 'schedule.snap')
+DEFAULT_WINDOW_DAYS = (90, 90)
+EMPLOYEE_COLUMNS = ['S_ID', 'name', 'team', 'job_rank', 'current_shift']
+SHIFT_COLUMNS = ['shift_date', 'shift_name', 'S_ID', 'team_order', 'day_order']
+
+
+def _string_dtype(values):
+    """依最長字串決定固定長度字串型別"""
+    return f"U{max([1] + [len(v) for v in values])}"
+
+
+def _pad(size):
+    """補齊至對齊邊界需要的位元組數"""
+    return (-size) % ALIGNMENT
+
+
+def _iso(value):
+    """日期轉為ISO字串，None 保持不變"""
+    return value.isoformat() if value is not None else None
+
+
+def write_snapshot(cursor, path=DEFAULT_SNAPSHOT_PATH, start_date=None, end_date=None, archive=None):
+    """
+    將人員資料與期間內排班寫入快照檔
+
+    檔案格式：標記(8 bytes) + 標頭長度(8 bytes) + JSON標頭 + 對齊後的陣列資料。
+    人員為固定長度字串的結構陣列，排班以欄位為單位存放，班別與人員都存成整數代碼，
+    依日期排序以便二分搜尋。先寫入暫存檔再取代，讀取端不會看到寫到一半的檔案。
+
+    Args:
+        cursor: 資料庫游標
+        path: 快照檔路徑
+        start_date: 排班起始日(含)，預設為今天往前90天
+        end_date: 排班結束日(含)，預設為今天往後90天
+        archive: ShiftArchive(可選)，期間涵蓋已封存年份時一併讀取
+
+    Returns:
+        dict: 快照摘要
+    """
+    today = datetime.now().date()
+    start_date = format_date(start_date) if start_date else today - timedelta(days=DEFAULT_WINDOW_DAYS[0])
+    end_date = format_date(end_date) if end_date else today + timedelta(days=DEFAULT_WINDOW_DAYS[1])
+
+    cursor.execute(f"SELECT {', '.join(EMPLOYEE_COLUMNS)} FROM Employee_Shift ORDER BY S_ID")
+    employees = cursor.fetchall()
+
+    cursor.execute("""
+    SELECT shift_date, shift_name, S_ID, team_order, day_order
+    FROM Shift
+    WHERE shift_date BETWEEN %s AND %s
+    ORDER BY shift_date
+    """, (start_date, end_date))
+    shifts = cursor.fetchall()
+    if archive is not None and archive.covers(start_date, end_date):
+        # 已封存年份都早於資料庫中的年份，接在前面仍依日期排序
+        shifts = list(archive.read(start_date, end_date).itertuples(index=False, name=None)) + list(shifts)
+
+    cursor.execute("""
+    SELECT exception_date, exception_type, description, working_shifts, standby_group_size
+    FROM Calendar_Exception
+    """)
+    exceptions = [[_iso(row[0])] + list(row[1:]) for row in cursor.fetchall()]
+
+    cursor.execute("SELECT id, S_ID, leave_type, start_date, end_date, note FROM Leave_Record")
+    leaves = [[row[0], row[1], row[2], _iso(row[3]), _iso(row[4]), row[5]] for row in cursor.fetchall()]
+
+    # 人員：固定長度字串結構陣列
+    employee_dtype = np.dtype([
+        (column, _string_dtype([row[i] or '' for row in employees]))
+        for i, column in enumerate(EMPLOYEE_COLUMNS)
+    ])
+    employee_array = np.array([tuple(v or '' for v in row) for row in employees], dtype=employee_dtype)
+
+    # 排班：日期、班別代碼、人員索引、檔排序、日排序各自一欄
+    officer_of = {row[0]: i for i, row in enumerate(employees)}
+    shift_names = sorted({row[1] for row in shifts})
+    code_of = {name: i for i, name in enumerate(shift_names)}
+    shifts = [row for row in shifts if row[2] in officer_of]
+    columns = {
+        'shift_date': np.array([row[0] for row in shifts], dtype='datetime64[D]'),
+        'shift_code': np.array([code_of[row[1]] for row in shifts], dtype=np.uint8),
+        'officer': np.array([officer_of[row[2]] for row in shifts], dtype=np.int32),
+        'team_order': np.array([row[3] or 0 for row in shifts], dtype=np.int8),
+        'day_order': np.array([row[4] or 0 for row in shifts], dtype=np.int8),
+    }
+
+    arrays = {'employees': employee_array}
+    arrays.update({f'shift.{name}': values for name, values in columns.items()})
+
+    header = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'window_start': start_date.isoformat(),
+        'window_end': end_date.isoformat(),
+        'shift_names': shift_names,
+        'calendar_exceptions': exceptions,
+        'leave_records': leaves,
+        'arrays': {}
+    }
+
+    # 陣列偏移量以資料區起點計算，與標頭長度無關
+    offset = 0
+    for name, values in arrays.items():
+        header['arrays'][name] = {
+            'dtype': values.dtype.descr if values.dtype.names else values.dtype.str,
+            'length': len(values),
+            'offset': offset
+        }
+        offset += values.nbytes + _pad(values.nbytes)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = len(MAGIC) + 8 + len(header_bytes)
+    data_start += _pad(data_start)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * (data_start - f.tell()))
+        for values in arrays.values():
+            f.write(values.tobytes())
+            f.write(b'\0' * _pad(values.nbytes))
+    os.replace(temp_path, path)
+
+    return {
+        '人員數': len(employees),
+        '排班筆數': len(shifts),
+        '排班期間': (start_date, end_date),
+        '檔案': path
+    }
+
+
+class Snapshot:
+    """
+    唯讀的快照檔
+
+    開啟時只讀取標頭並以記憶體映射對應整個檔案，不複製陣列資料，
+    需要時才轉換為 DataFrame。
+    """
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH):
+        """
+        開啟快照檔
+
+        Args:
+            path: 快照檔路徑
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} 不是排班快照檔")
+            header_length = struct.unpack('<Q', f.read(8))[0]
+            self.header = json.loads(f.read(header_length).decode('utf-8'))
+
+        data_start = len(MAGIC) + 8 + header_length
+        data_start += _pad(data_start)
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r') \
+            if os.path.getsize(path) > data_start else np.empty(0, dtype=np.uint8)
+
+        self.arrays = {}
+        for name, info in self.header['arrays'].items():
+            dtype = np.dtype([tuple(field) for field in info['dtype']]) \
+                if isinstance(info['dtype'], list) else np.dtype(info['dtype'])
+            begin = data_start + info['offset']
+            self.arrays[name] = self._buffer[begin:begin + dtype.itemsize * info['length']].view(dtype)
+
+        self.created_at = datetime.fromisoformat(self.header['created_at'])
+        self.window_start = date.fromisoformat(self.header['window_start'])
+        self.window_end = date.fromisoformat(self.header['window_end'])
+        self.shift_names = np.array(self.header['shift_names'] or [''], dtype=object)
+        self._roster = None
+
+    def covers(self, start_date, end_date=None):
+        """
+        檢查日期(或期間)是否完全在快照的排班期間內
+
+        Args:
+            start_date: 日期或起始日
+            end_date: 結束日(含，可選，預設同起始日)
+
+        Returns:
+            bool: 快照是否涵蓋
+        """
+        end_date = start_date if end_date is None else end_date
+        return self.window_start <= format_date(start_date) and format_date(end_date) <= self.window_end
+
+    def roster(self):
+        """
+        全部人員資料
+
+        Returns:
+            DataFrame: 包含 S_ID, name, team, job_rank, current_shift 的人員資料
+        """
+        if self._roster is None:
+            employees = self.arrays['employees']
+            self._roster = pd.DataFrame({
+                column: employees[column].astype(object) for column in EMPLOYEE_COLUMNS
+            }, columns=EMPLOYEE_COLUMNS)
+        return self._roster
+
+    def shifts_between(self, start_date, end_date):
+        """
+        期間內的排班，日期欄已排序故以二分搜尋取出區段
+
+        Args:
+            start_date: 起始日
+            end_date: 結束日(含)
+
+        Returns:
+            DataFrame: 包含 shift_date, shift_name, S_ID, team_order, day_order 的排班資料
+        """
+        dates = self.arrays['shift.shift_date']
+        lo = np.searchsorted(dates, np.datetime64(format_date(start_date), 'D'), side='left')
+        hi = np.searchsorted(dates, np.datetime64(format_date(end_date), 'D'), side='right')
+
+        officers = self.arrays['shift.officer'][lo:hi]
+        return pd.DataFrame({
+            'shift_date': dates[lo:hi].astype(object),
+            'shift_name': self.shift_names[self.arrays['shift.shift_code'][lo:hi]],
+            'S_ID': self.arrays['employees']['S_ID'][officers].astype(object),
+            'team_order': self.arrays['shift.team_order'][lo:hi].astype(int),
+            'day_order': self.arrays['shift.day_order'][lo:hi].astype(int),
+        }, columns=SHIFT_COLUMNS)
+
+    def daily_shifts(self, check_date):
+        """
+        某日的班表，欄位與排序同 ShiftManager.view_daily_shifts，另附隊別
+
+        Args:
+            check_date: 日期
+
+        Returns:
+            DataFrame: 當日班表
+        """
+        shifts = self.shifts_between(check_date, check_date)
+        display_order = {name: i for i, name in enumerate(get_shift_display_order())}
+        daily = shifts.merge(self.roster(), on='S_ID')
+        daily = daily.assign(_order=daily['shift_name'].map(display_order).fillna(len(display_order)))
+        daily = daily.sort_values(['_order', 'team_order', 'day_order']).reset_index(drop=True)
+        return daily[['shift_name', 'S_ID', 'name', 'job_rank', 'team_order', 'day_order',
+                      'current_shift', 'team']]
+
+    def calendar_rows(self):
+        """特殊日期資料列，可直接交給 ExceptionCalendar.load_rows"""
+        return [
+            (date.fromisoformat(row[0]),) + tuple(row[1:])
+            for row in self.header['calendar_exceptions']
+        ]
+
+    def leave_rows(self):
+        """請假資料列，可直接交給 LeaveIndex.load_rows"""
+        return [
+            (row[0], row[1], row[2], date.fromisoformat(row[3]), date.fromisoformat(row[4]), row[5])
+            for row in self.header['leave_records']
+        ]
+
+    def close(self):
+        """釋放記憶體映射"""
+        self.arrays = {}
+        self._buffer = None
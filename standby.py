@@ -0,0 +1,263 @@
+import heapq
+from bisect import bisect_left
+
+REGULAR_TEAMS = ['1', '2', '3', '4', '5', '6', '7', '8', '9']
+SPECIAL_TEAMS = ['11', '13', '14']
+STANDBY_RANKS = ['警務員', '隊長']
+DEFAULT_GROUP_SIZE = 9
+# 分組方式：依序切分，或各隊平均分散且隊長帶自己隊上的人
+GROUPING_MODES = {'sequential': '依序分組', 'balanced': '隊別平均分組'}
+DEFAULT_GROUPING_MODE = 'sequential'
+
+
+def standby_key(member, day_order, team_order):
+    """
+    備勤排序鍵：1-9隊依日排序、檔排序、隊別，11、13、14隊排在最後依檔排序、隊別
+
+    Args:
+        member: 人員資訊
+        day_order: 日排序
+        team_order: 檔排序
+
+    Returns:
+        tuple: 排序鍵
+    """
+    if member['team'] in SPECIAL_TEAMS:
+        return (1, 0, team_order, int(member['team']), member['S_ID'])
+    return (0, day_order, team_order, int(member['team']), member['S_ID'])
+
+
+def standby_entry(member, shift_orders, team_orders, working_shifts):
+    """
+    判斷人員能否列入備勤並產生備勤資訊
+
+    Args:
+        member: 人員資訊(S_ID, name, team, rank, shift)
+        shift_orders: 各假檔日排序
+        team_orders: 各隊檔排序
+        working_shifts: 當日上班的假檔集合
+
+    Returns:
+        dict: 備勤資訊，不能列入則為 None
+    """
+    team = member['team']
+    if member['shift'] not in working_shifts or member['rank'] not in STANDBY_RANKS:
+        return None
+
+    team_order = team_orders.get(team, 0)
+    if team_order not in (1, 2, 3):
+        return None
+
+    if team in REGULAR_TEAMS:
+        day_order = shift_orders.get(member['shift'], 0)
+        if not day_order:
+            return None
+    elif team in SPECIAL_TEAMS:
+        day_order = 0
+    else:
+        return None
+
+    return {
+        'S_ID': member['S_ID'],
+        'name': member['name'],
+        'team': team,
+        'shift_type': member['shift'],
+        'team_order': team_order,
+        'day_order': day_order,
+        'rank': member['rank'],
+        'key': standby_key(member, day_order, team_order)
+    }
+
+
+def collect_standby_members(members, shift_orders, team_orders, working_shifts, excluded):
+    """
+    列出可列入備勤的警務員與隊長，依備勤排序排列
+
+    Args:
+        members: 人員資訊序列
+        shift_orders: 各假檔日排序
+        team_orders: 各隊檔排序
+        working_shifts: 當日上班的假檔集合
+        excluded: 不列入備勤的警員編號(已值班、請假)
+
+    Returns:
+        tuple: (警務員列表, 隊長列表)
+    """
+    officers, captains = [], []
+    for member in members:
+        if member['S_ID'] in excluded:
+            continue
+        entry = standby_entry(member, shift_orders, team_orders, working_shifts)
+        if entry is None:
+            continue
+        (officers if entry['rank'] == '警務員' else captains).append(entry)
+
+    officers.sort(key=lambda entry: entry['key'])
+    captains.sort(key=lambda entry: entry['key'])
+    return officers, captains
+
+
+def build_groups(officers, captains, group_size=DEFAULT_GROUP_SIZE):
+    """
+    依序分組：每組 group_size 個警務員加1個隊長，剩餘人員併入最後一組
+
+    Args:
+        officers: 已排序的警務員列表
+        captains: 已排序的隊長列表
+        group_size: 每組警務員人數
+
+    Returns:
+        list: 分組結果
+    """
+    groups = []
+    officer_index = 0
+    group_num = 1
+    last_group_captains = captains[:]
+
+    while officer_index + group_size <= len(officers) and len(last_group_captains) > 0:
+        groups.append({
+            'captain': last_group_captains.pop(0),
+            'officers': officers[officer_index:officer_index + group_size],
+            'group_num': group_num
+        })
+        officer_index += group_size
+        group_num += 1
+
+    # 處理剩餘人員
+    if officer_index < len(officers) or len(last_group_captains) > 0:
+        groups.append({
+            'captains': last_group_captains,
+            'officers': officers[officer_index:],
+            'group_num': group_num,
+            'is_last_group': True
+        })
+
+    return groups
+
+
+def build_balanced_groups(officers, captains, group_size=DEFAULT_GROUP_SIZE):
+    """
+    隊別平均分組：組數、列入各組與最後一組的人員都與依序分組相同，
+    但各組內的警務員依隊別分散，並優先與同隊的隊長同組
+
+    人數最多的隊先分配，每一隊以 (該組已有的同隊人數, 是否非同隊隊長, 組內人數, 組別)
+    為鍵的堆積選組，同隊人員依備勤排序優先進入前面的組別。
+
+    Args:
+        officers: 已排序的警務員列表
+        captains: 已排序的隊長列表
+        group_size: 每組警務員人數
+
+    Returns:
+        list: 分組結果，格式同 build_groups
+    """
+    group_count = min(len(officers) // group_size, len(captains))
+    selected = officers[:group_count * group_size]
+    members = [[] for _ in range(group_count)]
+
+    by_team = {}
+    for entry in selected:
+        by_team.setdefault(entry['team'], []).append(entry)
+
+    for team, entries in sorted(by_team.items(), key=lambda item: (-len(item[1]), item[0])):
+        # 只有本隊的分配會改變各組的鍵，每隊重建一次堆積即可
+        heap = [
+            (sum(1 for entry in members[i] if entry['team'] == team),
+             captains[i]['team'] != team, len(members[i]), i)
+            for i in range(group_count) if len(members[i]) < group_size
+        ]
+        heapq.heapify(heap)
+        for entry in entries:
+            same_team, other_captain, size, i = heapq.heappop(heap)
+            members[i].append(entry)
+            if size + 1 < group_size:
+                heapq.heappush(heap, (same_team + 1, other_captain, size + 1, i))
+
+    groups = [
+        {
+            'captain': captains[i],
+            'officers': sorted(members[i], key=lambda entry: entry['key']),
+            'group_num': i + 1
+        }
+        for i in range(group_count)
+    ]
+
+    # 剩餘人員與依序分組相同，併入最後一組
+    if len(selected) < len(officers) or group_count < len(captains):
+        groups.append({
+            'captains': captains[group_count:],
+            'officers': officers[len(selected):],
+            'group_num': group_count + 1,
+            'is_last_group': True
+        })
+
+    return groups
+
+
+GROUP_BUILDERS = {'sequential': build_groups, 'balanced': build_balanced_groups}
+
+
+def group_standby(officers, captains, group_size=DEFAULT_GROUP_SIZE, mode=DEFAULT_GROUPING_MODE):
+    """
+    依分組方式分組
+
+    Args:
+        officers: 已排序的警務員列表
+        captains: 已排序的隊長列表
+        group_size: 每組警務員人數
+        mode: GROUPING_MODES 中的分組方式
+
+    Returns:
+        list: 分組結果
+    """
+    return GROUP_BUILDERS[mode](officers, captains, group_size)
+
+
+def flatten_groups(groups):
+    """
+    由分組結果還原依備勤排序排列的警務員與隊長列表
+
+    Args:
+        groups: build_groups 的分組結果
+
+    Returns:
+        tuple: (警務員列表, 隊長列表)
+    """
+    officers, captains = [], []
+    for group in groups:
+        officers.extend(group['officers'])
+        if 'captain' in group:
+            captains.append(group['captain'])
+        else:
+            captains.extend(group['captains'])
+    return officers, captains
+
+
+def apply_delta(groups, group_size=DEFAULT_GROUP_SIZE, added=(), removed=(), mode=DEFAULT_GROUPING_MODE):
+    """
+    將人員的加入與移除套用到既有分組，不需重新掃描人員，結果與重新計算相同
+
+    Args:
+        groups: 既有的分組結果
+        group_size: 每組警務員人數
+        added: 新列入備勤的人員資訊(standby_entry 的結果)
+        removed: 不再列入備勤的警員編號
+        mode: 分組方式
+
+    Returns:
+        list: 新的分組結果
+    """
+    officers, captains = flatten_groups(groups)
+    # 隊別平均分組的組內順序與備勤排序不同；依序分組時已排序，排序只需線性時間
+    officers.sort(key=lambda entry: entry['key'])
+    removed = set(removed) | {entry['S_ID'] for entry in added}
+    if removed:
+        officers = [entry for entry in officers if entry['S_ID'] not in removed]
+        captains = [entry for entry in captains if entry['S_ID'] not in removed]
+
+    for entry in added:
+        members = officers if entry['rank'] == '警務員' else captains
+        members.insert(bisect_left([member['key'] for member in members], entry['key']), entry)
+
+    return group_standby(officers, captains, group_size, mode)
+
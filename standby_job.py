@@ -0,0 +1,32 @@
+import argparse
+from datetime import datetime
+from shift_manager import ShiftManager
+from standby import GROUPING_MODES
+
+
+DEFAULT_DAYS = 30
+
+
+def main():
+    """夜間批次：預先產生今天起數天的備勤分組"""
+    parser = argparse.ArgumentParser(description="預先產生備勤分組")
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help="產生今天起幾天的分組")
+    parser.add_argument('--start', help="起始日期(YYYY-MM-DD)，預設今天")
+    parser.add_argument('--force', action='store_true', help="全部重新產生，輪休週期定義變更後使用")
+    parser.add_argument('--mode', choices=list(GROUPING_MODES), help="分組方式，預設讀取 standby_mode 環境變數")
+    args = parser.parse_args()
+
+    manager = ShiftManager()
+    manager.connect()
+    try:
+        start_date = args.start or datetime.now().date()
+        success, message = manager.pregenerate_standby_groups(start_date, args.days, args.force, args.mode)
+        print(message)
+        if not success:
+            raise SystemExit(1)
+    finally:
+        manager.disconnect()
+
+
+if __name__ == '__main__':
+    main()
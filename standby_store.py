@@ -0,0 +1,176 @@
+import json
+from changes import CHANGE_RETENTION_DAYS
+from standby import DEFAULT_GROUPING_MODE
+
+
+# 影響備勤分組的資料表
+STANDBY_INPUTS = ['Shift', 'Employee_Shift', 'Leave_Record', 'Calendar_Exception']
+# 一天的分組最多以增量方式套用幾筆異動，超過就等重新計算
+MAX_APPLIED_CHANGES = 50
+
+
+class StandbyStore:
+    """
+    Standby_Group 表中預先產生的備勤分組
+
+    每天每種分組方式的分組與產生時已反映的 Change_Log id 一起存放。之後影響該日的異動
+    (當日排班、當日特殊日期、涵蓋該日的請假、任何人員資料)id 都比它大，
+    讀取時據此判斷分組是否過期。異動紀錄只保留 CHANGE_RETENTION_DAYS 天，
+    超過這個時間產生的分組也視為過期。
+
+    單一班別異動時可在同一交易中以增量方式更新分組，該筆異動的 id 記在
+    applied_ids，判斷是否過期時略過。不直接提高 change_id，
+    是因為 id 較小但較晚提交的其他異動仍要能讓分組過期。
+    """
+
+    def load(self, cursor, dates, mode=DEFAULT_GROUPING_MODE):
+        """
+        讀取未過期的分組
+
+        Args:
+            cursor: 資料庫游標
+            dates: 日期列表
+            mode: 分組方式
+
+        Returns:
+            dict: {日期: 分組結果}，只包含未過期的日期
+        """
+        rows = self._stored(cursor, dates, mode, with_groups=True)
+        fresh = self._fresh(cursor, rows)
+        return {group_date: self._decode(rows[group_date][2]) for group_date in fresh}
+
+    def load_entry(self, cursor, group_date, mode=DEFAULT_GROUPING_MODE):
+        """
+        讀取一天未過期的分組與其異動位置，供增量更新使用
+
+        Args:
+            cursor: 資料庫游標
+            group_date: 日期
+            mode: 分組方式
+
+        Returns:
+            tuple: (分組結果, change_id, 已套用的異動id集合)，沒有或已過期為 None
+        """
+        rows = self._stored(cursor, [group_date], mode, with_groups=True)
+        if group_date not in self._fresh(cursor, rows):
+            return None
+        change_id, applied, data = rows[group_date]
+        return self._decode(data), change_id, applied
+
+    def shift_changes_after(self, cursor, group_date, change_id):
+        """
+        列出目前交易看得到的該日排班異動id，含本交易尚未提交的異動
+
+        Args:
+            cursor: 資料庫游標
+            group_date: 日期
+            change_id: 起始的異動id(不含)
+
+        Returns:
+            set: 異動id
+        """
+        cursor.execute("""
+        SELECT id FROM Change_Log
+        WHERE id > %s AND entity = 'Shift' AND ref_date = %s
+        """, (change_id, group_date))
+        return {row[0] for row in cursor.fetchall()}
+
+    def stale_dates(self, cursor, dates, mode=DEFAULT_GROUPING_MODE):
+        """
+        列出需要重新產生分組的日期
+
+        Args:
+            cursor: 資料庫游標
+            dates: 日期列表
+            mode: 分組方式
+
+        Returns:
+            list: 沒有分組或分組已過期的日期
+        """
+        fresh = self._fresh(cursor, self._stored(cursor, dates, mode))
+        return [group_date for group_date in dates if group_date not in fresh]
+
+    def save(self, cursor, group_date, groups, change_id, applied=(), mode=DEFAULT_GROUPING_MODE):
+        """
+        存放一天的分組
+
+        Args:
+            cursor: 資料庫游標
+            group_date: 日期
+            groups: 分組結果
+            change_id: 計算分組時已反映的最後一筆 Change_Log id
+            applied: change_id 之後已以增量方式套用的異動id
+            mode: 分組方式
+        """
+        cursor.execute("""
+        INSERT INTO Standby_Group (group_date, group_mode, group_data, change_id, applied_ids, generated_at)
+        VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+        ON DUPLICATE KEY UPDATE
+            group_data = VALUES(group_data),
+            change_id = VALUES(change_id),
+            applied_ids = VALUES(applied_ids),
+            generated_at = CURRENT_TIMESTAMP
+        """, (group_date, mode, json.dumps(groups, ensure_ascii=False), change_id,
+              ','.join(str(change) for change in sorted(applied)) or None))
+
+    def _stored(self, cursor, dates, mode, with_groups=False):
+        """讀取未超過保留天數的分組，回傳 {日期: (change_id, 已套用的異動id集合, 分組JSON)}"""
+        dates = list(dates)
+        if not dates:
+            return {}
+        cursor.execute(f"""
+        SELECT group_date, change_id, applied_ids, {'group_data' if with_groups else 'NULL'}
+        FROM Standby_Group
+        WHERE group_date IN ({', '.join(['%s'] * len(dates))})
+            AND group_mode = %s
+            AND generated_at >= NOW() - INTERVAL %s DAY
+        """, tuple(dates) + (mode, CHANGE_RETENTION_DAYS))
+        return {
+            group_date: (change_id, {int(change) for change in (applied or '').split(',') if change}, data)
+            for group_date, change_id, applied, data in cursor.fetchall()
+        }
+
+    def _fresh(self, cursor, rows):
+        """找出之後沒有相關異動的日期"""
+        if not rows:
+            return set()
+
+        cursor.execute(f"""
+        SELECT id, entity, action, ref_date, ref_end_date, S_ID, old_S_ID
+        FROM Change_Log
+        WHERE id > %s AND entity IN ({', '.join(['%s'] * len(STANDBY_INPUTS))})
+        """, (min(change_id for change_id, _, _ in rows.values()),) + tuple(STANDBY_INPUTS))
+
+        # 每個日期最後一筆未套用的相關異動 id；人員資料異動影響所有日期
+        latest = {}
+        roster_latest = 0
+        for change_id, entity, action, ref_date, ref_end_date, s_id, old_s_id in cursor.fetchall():
+            if entity == 'Employee_Shift':
+                roster_latest = max(roster_latest, change_id)
+                continue
+            if entity == 'Shift' and action == 'update' and s_id == old_s_id:
+                # 只更新排序，值班人員不變
+                continue
+            if entity == 'Leave_Record':
+                affected = [group_date for group_date in rows
+                            if ref_date <= group_date and (ref_end_date is None or group_date <= ref_end_date)]
+            else:
+                affected = [ref_date] if ref_date in rows else []
+            for group_date in affected:
+                if change_id not in rows[group_date][1]:
+                    latest[group_date] = max(latest.get(group_date, 0), change_id)
+
+        return {
+            group_date for group_date, (change_id, _, _) in rows.items()
+            if max(latest.get(group_date, 0), roster_latest) <= change_id
+        }
+
+    @staticmethod
+    def _decode(data):
+        """還原分組，排序鍵轉回 tuple"""
+        groups = json.loads(data)
+        for group in groups:
+            captains = [group['captain']] if 'captain' in group else group.get('captains', [])
+            for entry in captains + group['officers']:
+                entry['key'] = tuple(entry['key'])
+        return groups
@@ -0,0 +1,157 @@
+from datetime import timedelta
+import pandas as pd
+from rules import NIGHT_DUTY_REST_DAYS
+from utils import format_date, get_rank_restrictions
+
+
+class SwapFinder:
+    """
+    在日期區間內尋找可互換的班別
+
+    建立時一次讀取區間內(前後各多讀 NIGHT_DUTY_REST_DAYS 天)的所有排班，依日期與職級建立索引。
+    是否可交換由排班規則判斷：交換後不能出現交換前沒有的違規，所有對象一次批次檢查。
+    """
+
+    def __init__(self, manager, start_date, end_date):
+        """
+        建立區間內的排班索引
+
+        Args:
+            manager: ShiftManager 實例
+            start_date: 起始日
+            end_date: 結束日(含)
+        """
+        self.roster = manager.get_roster_index()
+        self.validator = manager.get_validator()
+        self.rank_restrictions = get_rank_restrictions()
+        start_date, end_date = format_date(start_date), format_date(end_date)
+
+        margin = timedelta(days=NIGHT_DUTY_REST_DAYS)
+        shifts = manager.get_shifts_between(start_date - margin, end_date + margin)
+        self.shifts = shifts[['shift_date', 'shift_name', 'S_ID']].reset_index(drop=True)
+
+        self.assignments = {}
+        self.by_person = {}
+        self.by_rank = {}
+        for shift_date, shift_name, s_id in self.shifts.itertuples(index=False, name=None):
+            self.assignments[(shift_date, shift_name)] = s_id
+            self.by_person.setdefault(s_id, []).append((shift_date, shift_name))
+            if start_date <= shift_date <= end_date:
+                rank = self.rank_restrictions.get(shift_name)
+                self.by_rank.setdefault(rank, []).append((shift_date, shift_name))
+        self._baseline = None
+
+    def check(self, date_a, shift_a, date_b, shift_b):
+        """
+        檢查兩個班別能否互換
+
+        Returns:
+            tuple: (是否可以, 原因)
+        """
+        s_id_a = self.assignments.get((date_a, shift_a))
+        s_id_b = self.assignments.get((date_b, shift_b))
+        if s_id_a is None or s_id_b is None:
+            return False, "找不到要交換的排班資料"
+        if s_id_a == s_id_b:
+            return False, "同一位警員的班別不需要交換"
+
+        reason = self.check_many(date_a, shift_a, [(date_b, shift_b)])[(date_b, shift_b)]
+        return not reason, reason
+
+    def baseline(self):
+        """
+        交換前已存在的違規，第一次使用時檢查一次
+
+        Returns:
+            set: (日期, 班別, 警員編號, 規則) 的集合
+        """
+        if self._baseline is None:
+            violations = self.validator.validate(self.shifts)
+            self._baseline = set(zip(violations['shift_date'], violations['shift_name'],
+                                     violations['S_ID'], violations['rule']))
+        return self._baseline
+
+    def check_many(self, shift_date, shift_name, others):
+        """
+        一次檢查某班別分別與多個班別互換後是否出現新的違規
+
+        每個交換只會影響雙方兩人在兩個日期前後的排班，將各交換後雙方的這些排班
+        以 scenario 區分後一起檢查一次，再與交換前的違規比對。
+
+        Args:
+            shift_date: 日期
+            shift_name: 班別名稱
+            others: 對方班別 [(日期, 班別名稱), ...]，須與本班別由不同人擔任
+
+        Returns:
+            dict: {(日期, 班別名稱): 第一個新違規的訊息，可交換為空字串}
+        """
+        s_id = self.assignments[(shift_date, shift_name)]
+        rows = []
+        for scenario, (other_date, other_shift) in enumerate(others):
+            other_s_id = self.assignments[(other_date, other_shift)]
+            for person, released, taken in ((s_id, (shift_date, shift_name), (other_date, other_shift)),
+                                            (other_s_id, (other_date, other_shift), (shift_date, shift_name))):
+                rows.extend(
+                    (day, post, person, scenario) for day, post in self.by_person.get(person, ())
+                    if (day, post) != released and (abs((day - shift_date).days) <= NIGHT_DUTY_REST_DAYS or
+                                                    abs((day - other_date).days) <= NIGHT_DUTY_REST_DAYS)
+                )
+                rows.append(taken + (person, scenario))
+
+        swapped = pd.DataFrame(rows, columns=['shift_date', 'shift_name', 'S_ID', 'scenario'])
+        violations = self.validator.validate(swapped)
+        baseline = self.baseline()
+        new = [key not in baseline for key in zip(violations['shift_date'], violations['shift_name'],
+                                                   violations['S_ID'], violations['rule'])]
+
+        reasons = {post: "" for post in others}
+        for scenario, message in zip(violations.loc[new, 'scenario'], violations.loc[new, 'message']):
+            post = others[scenario]
+            reasons[post] = reasons[post] or message
+        return reasons
+
+    def find(self, shift_name, shift_date):
+        """
+        列出指定班別所有可交換的對象
+
+        Args:
+            shift_name: 班別名稱
+            shift_date: 日期
+
+        Returns:
+            list: 可交換對象資訊，依日期接近程度排序
+        """
+        shift_date = format_date(shift_date)
+        s_id = self.assignments.get((shift_date, shift_name))
+        if s_id is None:
+            raise ValueError(f"找不到 {shift_date} {shift_name} 的排班資料")
+
+        member = self.roster.get(s_id)
+        rank = member['rank'] if member else self.rank_restrictions.get(shift_name)
+
+        # 只需比對對方班別職級與本人職級相同的排班
+        posts = [post for post in self.by_rank.get(rank, [])
+                 if post != (shift_date, shift_name) and self.assignments[post] != s_id]
+        reasons = self.check_many(shift_date, shift_name, posts)
+
+        options = []
+        for other_date, other_shift in posts:
+            if not reasons[(other_date, other_shift)]:
+                other = self.roster.get(self.assignments[(other_date, other_shift)])
+                options.append({
+                    'shift_date': other_date,
+                    'shift_name': other_shift,
+                    'S_ID': other['S_ID'],
+                    'name': other['name'],
+                    'team': other['team']
+                })
+
+        options.sort(key=lambda o: (abs((o['shift_date'] - shift_date).days), o['shift_date'], o['shift_name']))
+        return options
+
+
+def window(shift_date, days):
+    """計算以日期為中心的查詢區間"""
+    shift_date = format_date(shift_date)
+    return shift_date - timedelta(days=days), shift_date + timedelta(days=days)
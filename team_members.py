@@ -0,0 +1,172 @@
+# 新編號時相鄰兩人 position 的間隔
+POSITION_GAP = 1024
+
+
+class TeamMemberStore:
+    """
+    Team_Member 表中的隊內人員順序
+
+    每人一筆 (隊別, position)，隊內順序即依 (team, position) 索引的範圍掃描。
+    position 以 POSITION_GAP 為間隔編號，移動一人時取新位置前後兩人之間的值，
+    只需更新該人一筆；間隔用完時才將整隊重新編號。
+    """
+
+    def members(self, cursor, team, for_update=False):
+        """
+        依順序列出隊員
+
+        Args:
+            cursor: 資料庫游標
+            team: 隊伍編號
+            for_update: 是否鎖定讀取的資料列，調整順序前使用
+
+        Returns:
+            list: [(警員編號, position), ...]
+        """
+        cursor.execute(f"""
+        SELECT S_ID, position
+        FROM Team_Member
+        WHERE team = %s
+        ORDER BY position, S_ID
+        {'FOR UPDATE' if for_update else ''}
+        """, (team,))
+        return [(s_id, position) for s_id, position in cursor.fetchall()]
+
+    def move(self, cursor, team, s_id, index):
+        """
+        將隊員移到指定順序
+
+        Args:
+            cursor: 資料庫游標
+            team: 隊伍編號
+            s_id: 警員編號
+            index: 新順序(0 起)，超過人數時排在最後
+
+        Returns:
+            bool: 隊員是否在該隊
+        """
+        members = self.members(cursor, team, for_update=True)
+        positions = dict(members)
+        if s_id not in positions:
+            return False
+        order = [member for member, _ in members]
+        order.remove(s_id)
+        order.insert(min(index, len(order)), s_id)
+        self.reorder(cursor, team, order, positions, {s_id})
+        return True
+
+    def reorder(self, cursor, team, order, positions, moved):
+        """
+        依新的順序寫入移動過的隊員，其他隊員的 position 不變
+
+        連續移動的隊員平均分配前後兩個未移動隊員之間的 position。
+
+        Args:
+            cursor: 資料庫游標
+            team: 隊伍編號
+            order: 全隊新的順序
+            positions: 目前的 {警員編號: position}
+            moved: 位置有變動的警員編號
+        """
+        updates = []
+        i = 0
+        while i < len(order):
+            if order[i] not in moved:
+                i += 1
+                continue
+            j = i
+            while j < len(order) and order[j] in moved:
+                j += 1
+            before = positions[order[i - 1]] if i > 0 else None
+            after = positions[order[j]] if j < len(order) else None
+            count = j - i
+            if before is None and after is None:
+                run = [(k + 1) * POSITION_GAP for k in range(count)]
+            elif before is None:
+                run = [after - (count - k) * POSITION_GAP for k in range(count)]
+            elif after is None:
+                run = [before + (k + 1) * POSITION_GAP for k in range(count)]
+            else:
+                step = (after - before) // (count + 1)
+                if step < 1:
+                    # 間隔已用完，整隊重新編號
+                    self.renumber(cursor, team, order)
+                    return
+                run = [before + (k + 1) * step for k in range(count)]
+            updates.extend(zip(run, order[i:j]))
+            i = j
+
+        if updates:
+            cursor.executemany("UPDATE Team_Member SET position = %s WHERE S_ID = %s", updates)
+
+    def swap(self, cursor, team, s_id1, s_id2):
+        """
+        交換兩個隊員的順序
+
+        Args:
+            cursor: 資料庫游標
+            team: 隊伍編號
+            s_id1: 第一個警員編號
+            s_id2: 第二個警員編號
+
+        Returns:
+            bool: 兩人是否都在該隊
+        """
+        cursor.execute("""
+        SELECT S_ID, position FROM Team_Member
+        WHERE team = %s AND S_ID IN (%s, %s)
+        FOR UPDATE
+        """, (team, s_id1, s_id2))
+        positions = dict(cursor.fetchall())
+        if len(positions) != 2:
+            return False
+        cursor.execute("""
+        UPDATE Team_Member
+        SET position = CASE S_ID WHEN %s THEN %s WHEN %s THEN %s END
+        WHERE S_ID IN (%s, %s)
+        """, (s_id1, positions[s_id2], s_id2, positions[s_id1], s_id1, s_id2))
+        return True
+
+    def renumber(self, cursor, team, order):
+        """
+        依順序將整隊重新以 POSITION_GAP 為間隔編號
+
+        Args:
+            cursor: 資料庫游標
+            team: 隊伍編號
+            order: 全隊的順序
+        """
+        cursor.executemany(
+            "UPDATE Team_Member SET position = %s WHERE S_ID = %s AND team = %s",
+            [((i + 1) * POSITION_GAP, s_id, team) for i, s_id in enumerate(order)]
+        )
+
+    def sync(self, cursor):
+        """
+        依人員資料更新隊員名單：換隊的人移出原隊，沒有順序的人依職級與假檔排在隊伍最後
+
+        Args:
+            cursor: 資料庫游標
+
+        Returns:
+            int: 新加入順序的人數
+        """
+        cursor.execute("""
+        DELETE tm FROM Team_Member tm
+        JOIN Employee_Shift e ON e.S_ID = tm.S_ID
+        WHERE e.team <> tm.team
+        """)
+        cursor.execute(f"""
+        INSERT INTO Team_Member (S_ID, team, position)
+        SELECT e.S_ID, e.team,
+            COALESCE(last.position, 0) + {POSITION_GAP} * ROW_NUMBER() OVER (
+                PARTITION BY e.team ORDER BY e.job_rank DESC, e.current_shift, e.S_ID
+            )
+        FROM Employee_Shift e
+        LEFT JOIN Team_Member tm ON tm.S_ID = e.S_ID
+        LEFT JOIN (
+            SELECT team, MAX(position) AS position FROM Team_Member GROUP BY team
+        ) AS last ON last.team = e.team
+        WHERE tm.S_ID IS NULL
+        """)
+        return cursor.rowcount
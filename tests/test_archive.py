@@ -0,0 +1,113 @@
+import importlib.util
+import os
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from archive import ARCHIVE_COLUMNS, ShiftArchive
+
+requires_pyarrow = pytest.mark.skipif(importlib.util.find_spec('pyarrow') is None,
+                                      reason="讀寫封存檔需要 pyarrow")
+
+
+def year_of_shifts(year, posts=('A班', '夜值日官')):
+    """產生一整年的排班"""
+    start = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - start).days
+    return pd.DataFrame(
+        [(start + timedelta(days=day), post, f"P{day % 7:03d}", day % 3 + 1, day % 5)
+         for day in range(days) for post in posts],
+        columns=ARCHIVE_COLUMNS
+    )
+
+
+class _Cursor:
+    """archive_partition 需要的資料庫游標介面"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append(' '.join(query.split()))
+
+    def fetchall(self):
+        return list(self.rows.itertuples(index=False, name=None))
+
+
+def test_read_without_archived_years_needs_no_pyarrow(tmp_path):
+    archive = ShiftArchive(str(tmp_path / 'missing'))
+    assert archive.years() == []
+    assert not archive.covers(date(2024, 1, 1), date(2024, 12, 31))
+    assert list(archive.read(date(2024, 1, 1), date(2024, 12, 31)).columns) == ARCHIVE_COLUMNS
+
+
+@requires_pyarrow
+def test_write_and_read_round_trip(tmp_path):
+    archive = ShiftArchive(str(tmp_path))
+    shifts = year_of_shifts(2024)
+    assert archive.write(2024, shifts) == len(shifts)
+    assert archive.years() == [2024]
+    assert archive.is_archived(date(2024, 6, 1)) and not archive.is_archived(date(2025, 6, 1))
+
+    read = archive.read(date(2024, 3, 1), date(2024, 3, 31))
+    expected = shifts[(shifts['shift_date'] >= date(2024, 3, 1)) & (shifts['shift_date'] <= date(2024, 3, 31))]
+    pd.testing.assert_frame_equal(
+        read.sort_values(['shift_date', 'shift_name']).reset_index(drop=True),
+        expected.sort_values(['shift_date', 'shift_name']).reset_index(drop=True),
+        check_dtype=False
+    )
+
+
+@requires_pyarrow
+def test_write_merges_with_existing_file(tmp_path):
+    archive = ShiftArchive(str(tmp_path))
+    shifts = year_of_shifts(2024)
+    archive.write(2024, shifts)
+
+    # 同日同班別以新資料為準
+    changed = shifts.head(2).assign(S_ID='P999')
+    assert archive.write(2024, changed) == len(shifts)
+    read = archive.read(changed['shift_date'].min(), changed['shift_date'].max())
+    assert set(read['S_ID']) == {'P999'}
+
+
+@requires_pyarrow
+def test_archive_partition_writes_then_truncates(tmp_path):
+    archive = ShiftArchive(str(tmp_path))
+    assert archive.years() == []
+    shifts = pd.concat([year_of_shifts(2023).tail(4), year_of_shifts(2024)], ignore_index=True)
+    cursor = _Cursor(shifts)
+
+    assert archive.archive_partition(cursor, 'p2024') == {2023: 4, 2024: len(shifts) - 4}
+    assert cursor.executed[-1] == "ALTER TABLE Shift TRUNCATE PARTITION p2024"
+    # 年份快取在封存後更新
+    assert archive.years() == [2023, 2024]
+    assert len(archive.read(date(2023, 12, 1), date(2024, 12, 31))) == len(shifts)
+
+
+def test_years_cache_follows_directory(tmp_path):
+    archive = ShiftArchive(str(tmp_path))
+    assert archive.years() == []
+    # 其他程序新增的封存檔會改變目錄修改時間
+    open(os.path.join(tmp_path, 'shift_2022.parquet'), 'wb').close()
+    stamp = os.stat(tmp_path).st_mtime_ns
+    os.utime(tmp_path, ns=(stamp + 10 ** 9, stamp + 10 ** 9))
+    assert archive.years() == [2022]
+
+
+def test_missing_pyarrow_is_reported(tmp_path, monkeypatch):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def no_pyarrow(name, *args, **kwargs):
+        if name == 'pyarrow':
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, '__import__', no_pyarrow)
+    archive = ShiftArchive(str(tmp_path))
+    with pytest.raises(ImportError, match='pip install pyarrow'):
+        archive.write(2024, year_of_shifts(2024))
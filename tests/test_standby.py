@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from standby import (REGULAR_TEAMS, SPECIAL_TEAMS, STANDBY_RANKS, GROUPING_MODES, GROUP_BUILDERS,
+                     collect_standby_members, standby_entry, group_standby, apply_delta)
+
+TEAMS = REGULAR_TEAMS + SPECIAL_TEAMS
+SHIFTS = ['123檔期', '456檔期', '789檔期']
+ROUNDS = 300
+
+
+def random_day(rng):
+    """隨機產生一天的人員、排序與已排班人員"""
+    members = [
+        {'S_ID': f"P{i:04d}", 'name': f"警員{i}", 'team': rng.choice(TEAMS),
+         'rank': rng.choice(STANDBY_RANKS + ['警務員'] * 6), 'shift': rng.choice(SHIFTS)}
+        for i in range(rng.randint(0, 120))
+    ]
+    shift_orders = {shift: rng.randint(0, 3) for shift in SHIFTS}
+    team_orders = {team: rng.randint(1, 4) for team in TEAMS}
+    working = set(rng.sample(SHIFTS, rng.randint(1, 3)))
+    excluded = {member['S_ID'] for member in members if rng.random() < 0.2}
+    return members, shift_orders, team_orders, working, excluded
+
+
+def random_delta(rng, kind, members, excluded):
+    """
+    隨機產生一次異動
+
+    insert 為一人結束值班回到備勤，delete 為一人開始值班離開備勤，replace 為兩者同時發生
+
+    Returns:
+        tuple: (回到備勤的警員編號, 離開備勤的警員編號)
+    """
+    available = sorted(member['S_ID'] for member in members if member['S_ID'] not in excluded)
+    joined = rng.sample(sorted(excluded), min(1, len(excluded))) if kind in ('insert', 'replace') else []
+    left = rng.sample(available, min(1, len(available))) if kind in ('delete', 'replace') else []
+    return joined, left
+
+
+@pytest.mark.parametrize('mode', list(GROUPING_MODES))
+@pytest.mark.parametrize('kind', ['insert', 'delete', 'replace'])
+def test_apply_delta_matches_recompute(mode, kind):
+    rng = random.Random(f"{mode}-{kind}")
+    for _ in range(ROUNDS):
+        members, shift_orders, team_orders, working, excluded = random_day(rng)
+        group_size = rng.randint(1, 10)
+        before = group_standby(
+            *collect_standby_members(members, shift_orders, team_orders, working, excluded), group_size, mode
+        )
+
+        joined, left = random_delta(rng, kind, members, excluded)
+        added = [
+            entry for entry in (
+                standby_entry(member, shift_orders, team_orders, working)
+                for member in members if member['S_ID'] in joined
+            ) if entry is not None
+        ]
+        after_excluded = (excluded - set(joined)) | set(left)
+        expected = group_standby(
+            *collect_standby_members(members, shift_orders, team_orders, working, after_excluded), group_size, mode
+        )
+
+        assert apply_delta(before, group_size, added=added, removed=left, mode=mode) == expected
+
+
+def test_balanced_groups_keep_sequential_members():
+    rng = random.Random(0)
+    for _ in range(ROUNDS):
+        officers = sorted(
+            ({'S_ID': f"P{i:04d}", 'team': rng.choice(TEAMS), 'key': (rng.random(), i)}
+             for i in range(rng.randint(0, 300))),
+            key=lambda entry: entry['key']
+        )
+        captains = [{'S_ID': f"C{i:03d}", 'team': rng.choice(TEAMS), 'key': (i,)}
+                    for i in range(rng.randint(0, 40))]
+        group_size = rng.randint(1, 12)
+
+        results = {mode: group_standby(officers, captains, group_size, mode) for mode in GROUP_BUILDERS}
+        sequential, balanced = results['sequential'], results['balanced']
+
+        # 各組隊長與人數相同，最後一組不平均分散
+        assert len(sequential) == len(balanced)
+        for a, b in zip(sequential, balanced):
+            assert a.get('captain') == b.get('captain') and a.get('captains') == b.get('captains')
+            assert len(a['officers']) == len(b['officers'])
+            if 'is_last_group' in a:
+                assert a['officers'] == b['officers']
+
+        full = lambda groups: [group for group in groups if 'captain' in group]
+        assert sorted(e['S_ID'] for g in full(sequential) for e in g['officers']) == \
+            sorted(e['S_ID'] for g in full(balanced) for e in g['officers'])
@@ -0,0 +1,112 @@
+import random
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from roster_index import RosterIndex
+from rotation import RotationPattern
+from rules import RuleValidator
+from swap import SwapFinder, window
+from utils import get_rank_restrictions
+
+TEAMS = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '11', '13', '14']
+SHIFT_TYPES = ['123檔期', '456檔期', '789檔期']
+START = date(2024, 1, 1)
+
+
+class _Manager:
+    """SwapFinder 需要的 ShiftManager 介面，資料來自記憶體"""
+
+    def __init__(self, roster, shifts):
+        self.roster = roster
+        self.shifts = shifts
+        self.validator = RuleValidator(roster, RotationPattern.load(None))
+
+    def get_roster_index(self):
+        return RosterIndex(self.roster.itertuples(index=False, name=None))
+
+    def get_validator(self):
+        return self.validator
+
+    def get_shifts_between(self, start_date, end_date):
+        dates = self.shifts['shift_date']
+        return self.shifts[(dates >= start_date) & (dates <= end_date)].reset_index(drop=True)
+
+
+def synthetic_month(seed, officers=120, days=62):
+    """隨機產生 12 隊人員與每天 14 個班別的排班"""
+    rng = random.Random(seed)
+    ranks = get_rank_restrictions()
+    roster = pd.DataFrame(
+        [(f"P{i:03d}", f"警員{i}", rng.choice(TEAMS), rng.choice(['警務員'] * 7 + ['隊長', '副大隊長']),
+          rng.choice(SHIFT_TYPES)) for i in range(officers)],
+        columns=['S_ID', 'name', 'team', 'job_rank', 'current_shift']
+    )
+    by_rank = roster.groupby('job_rank')['S_ID'].apply(list).to_dict()
+    shifts = pd.DataFrame(
+        [(START + timedelta(days=day), shift_name, rng.choice(by_rank[rank]), 1, 1)
+         for day in range(days) for shift_name, rank in ranks.items()],
+        columns=['shift_date', 'shift_name', 'S_ID', 'team_order', 'day_order']
+    )
+    return roster, shifts
+
+
+def brute_force(manager, shift_name, shift_date, window_days):
+    """逐一交換整段排班，列出沒有新違規的對象"""
+    shifts = manager.shifts[['shift_date', 'shift_name', 'S_ID']]
+    ranks = get_rank_restrictions()
+    s_id = shifts.loc[(shifts['shift_date'] == shift_date) & (shifts['shift_name'] == shift_name), 'S_ID'].iloc[0]
+    start_date, end_date = window(shift_date, window_days)
+    found = set()
+    for i, row in shifts.iterrows():
+        if not start_date <= row['shift_date'] <= end_date or row['S_ID'] == s_id:
+            continue
+        if ranks[row['shift_name']] != ranks[shift_name]:
+            continue
+        swapped = shifts.copy()
+        swapped.loc[(swapped['shift_date'] == shift_date) & (swapped['shift_name'] == shift_name), 'S_ID'] = \
+            row['S_ID']
+        swapped.loc[i, 'S_ID'] = s_id
+        if manager.validator.new_violations(shifts, swapped).empty:
+            found.add((row['shift_date'], row['shift_name']))
+    return found
+
+
+def test_find_matches_brute_force():
+    manager = _Manager(*synthetic_month(1, officers=60, days=12))
+    shift_date = START + timedelta(days=6)
+    for shift_name in ['A班', '夜值日官', '日值日官', '值班副大隊長']:
+        finder = SwapFinder(manager, *window(shift_date, 3))
+        found = {(option['shift_date'], option['shift_name']) for option in finder.find(shift_name, shift_date)}
+        assert found == brute_force(manager, shift_name, shift_date, 3)
+
+
+def test_check_rejects_night_duty_rest():
+    manager = _Manager(*synthetic_month(2, officers=60, days=20))
+    finder = SwapFinder(manager, START, START + timedelta(days=19))
+    shifts = manager.shifts
+    for (shift_date, shift_name), s_id in finder.assignments.items():
+        if shift_name != '夜值日官':
+            continue
+        for other_date, other_shift in finder.by_rank['隊長']:
+            other_s_id = finder.assignments[(other_date, other_shift)]
+            # 對方隔天已有排班，換來夜值日官必定違規
+            next_day = shifts[(shifts['shift_date'] == shift_date + timedelta(days=1)) &
+                              (shifts['S_ID'] == other_s_id)]
+            if other_s_id != s_id and other_date != shift_date + timedelta(days=1) and not next_day.empty:
+                ok, reason = finder.check(shift_date, shift_name, other_date, other_shift)
+                assert not ok and reason
+                return
+    raise AssertionError("隨機資料中沒有可檢查的夜值日官交換")
+
+
+def test_find_is_interactive_for_a_month():
+    manager = _Manager(*synthetic_month(3))
+    shift_date = START + timedelta(days=31)
+    started = time.perf_counter()
+    for shift_name in get_rank_restrictions():
+        SwapFinder(manager, *window(shift_date, 15)).find(shift_name, shift_date)
+    elapsed = (time.perf_counter() - started) / len(get_rank_restrictions())
+    # 批次檢查前每次約需數秒
+    assert elapsed < 0.2, f"find 平均耗時 {elapsed:.2f} 秒"
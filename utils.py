@@ -88,6 +88,50 @@ def get_shifts_config():
     ]
 
 
+def get_valid_teams():
+    """
+    獲取有效的隊伍編號
+
+    Returns:
+        list: 隊伍編號列表
+    """
+    return ['1', '2', '3', '4', '5', '6', '7', '8', '9', '11', '13', '14']
+
+
+def get_valid_shift_types():
+    """
+    獲取有效的假檔
+
+    Returns:
+        list: 假檔列表
+    """
+    return ['123檔期', '456檔期', '789檔期']
+
+
+def get_valid_ranks():
+    """
+    獲取有效的職級
+
+    Returns:
+        list: 職級列表
+    """
+    return ['警務員', '隊長', '副大隊長']
+
+
+def get_shift_display_order():
+    """
+    獲取班表顯示時的班別順序
+
+    Returns:
+        list: 依顯示順序排列的班別名稱
+    """
+    return [
+        'A班', 'B班', 'C班', 'D班', 'E班', '上值日', '下值日',
+        '日值日官', '夜值日官', '值班副大隊長',
+        '日勤務管理員', '夜勤務管理員', '日械彈管理員', '夜械彈管理員'
+    ]
+
+
 def get_rank_restrictions():
     """
     獲取職級限制配置
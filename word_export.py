@@ -0,0 +1,143 @@
+from copy import deepcopy
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.table import Table
+
+
+DUTY_HEADERS = ["班別", "姓名", "隊別"]
+
+
+class TableTemplate:
+    """
+    預先建立好樣式與標題列的表格，需要時直接複製XML
+
+    python-docx 每次以名稱設定樣式都要掃描全部樣式，
+    大量表格時改用複製範本表格可省下重複的樣式查詢與儲存格建立。
+    """
+
+    def __init__(self, doc, headers, body_rows=0):
+        """
+        建立範本表格
+
+        Args:
+            doc: 要加入表格的 Document
+            headers: 標題列文字
+            body_rows: 預先建立的空白資料列數
+        """
+        table = doc.add_table(rows=1 + body_rows, cols=len(headers))
+        table.style = 'Table Grid'
+        for cell, text in zip(table.rows[0].cells, headers):
+            cell.text = text
+
+        # 範本只保留XML，不留在文件內容中
+        self._tbl = deepcopy(table._tbl)
+        table._tbl.getparent().remove(table._tbl)
+
+    def add_to(self, doc):
+        """
+        在文件末端加入一個範本表格
+
+        Args:
+            doc: Document
+
+        Returns:
+            Table: 新加入的表格
+        """
+        tbl = deepcopy(self._tbl)
+        doc.element.body._insert_tbl(tbl)
+        return Table(tbl, doc._body)
+
+
+class DayDocumentBuilder:
+    """產生每日值班與備勤表格，同一份文件內共用表格範本"""
+
+    def __init__(self, doc=None):
+        """
+        初始化文件與表格範本
+
+        Args:
+            doc: Document(可選，預設建立新文件)
+        """
+        self.doc = doc or Document()
+        self.duty_template = TableTemplate(self.doc, DUTY_HEADERS)
+        self.group_template = TableTemplate(self.doc, ["帶班隊長", "警務員", ""], body_rows=1)
+
+    def add_day(self, check_date, duties, groups, heading_level=0):
+        """
+        加入一天的值班人員與備勤分組
+
+        Args:
+            check_date: 日期
+            duties: (班別, 姓名, 隊別) 的序列，已依班別順序排列
+            groups: 分組結果
+            heading_level: 日期標題層級
+        """
+        doc = self.doc
+        doc.add_heading(f'{check_date.strftime("%Y-%m-%d")} 人員列表', heading_level)
+
+        # 值班人員部分
+        doc.add_heading('值班人員', level=1)
+        if duties:
+            table = self.duty_template.add_to(doc)
+            for shift_name, name, team in duties:
+                row_cells = table.add_row().cells
+                row_cells[0].text = shift_name
+                row_cells[1].text = name
+                row_cells[2].text = f"{team}隊"
+
+        doc.add_paragraph()
+
+        # 備勤人員部分
+        doc.add_heading('備勤人員', level=1)
+        for group in groups:
+            table = self.group_template.add_to(doc)
+            header_cells = table.rows[0].cells
+            header_cells[2].text = f"備勤{group['group_num']}組"
+
+            row_cells = table.rows[1].cells
+            if 'is_last_group' in group:
+                row_cells[0].text = "\n".join([
+                    f"{c['name']}({c['team']}隊)"
+                    for c in group['captains']
+                ])
+            else:
+                captain = group['captain']
+                row_cells[0].text = f"{captain['name']}({captain['team']}隊)"
+
+            row_cells[1].text = " ".join([
+                f"{o['name']}({o['team']}隊)"
+                for o in group['officers']
+            ])
+            row_cells[2].text = f"備勤{group['group_num']}組"
+
+            doc.add_paragraph()
+
+    def add_page_break(self):
+        """換頁"""
+        self.doc.add_paragraph().add_run().add_break(WD_BREAK.PAGE)
+
+    def save(self, filename):
+        """儲存文件"""
+        self.doc.save(filename)
+        return filename
+
+
+def render_document(days, filename):
+    """
+    將多天的值班與備勤表格輸出為一份文件，每天一頁
+
+    只使用可序列化的資料，可在其他行程中執行。
+
+    Args:
+        days: (日期, 值班人員, 分組結果, 標題層級) 的序列
+        filename: 輸出檔名
+
+    Returns:
+        str: 輸出檔名
+    """
+    builder = DayDocumentBuilder()
+    for i, (check_date, duties, groups, heading_level) in enumerate(days):
+        if i:
+            builder.add_page_break()
+        builder.add_day(check_date, duties, groups, heading_level)
+    return builder.save(filename)